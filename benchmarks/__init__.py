@@ -0,0 +1 @@
+"""Benchmarks reproducibles de los pasos del pipeline 3D (ejecutar con `python -m benchmarks.<nombre>`)."""
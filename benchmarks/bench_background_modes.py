@@ -0,0 +1,101 @@
+# benchmarks/bench_background_modes.py
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from mesh_app.config import RunConfig
+from mesh_app.pipeline.run_pipeline import _background_size_max, _build_temp_adapt_geo, run_end_to_end
+from mesh_app.services.gmsh_service import GmshService
+from mesh_app.services.pipeline_steps_service import PipelineStepsService
+from src3d.read_mesh_3d import read_msh2_3d
+
+MODES = ["points", "nodes", "tets", "grid"]
+
+
+def bench_case(cfg: RunConfig, modes: list[str], repeat: int, grid_n: int = 64) -> list[dict]:
+    gmsh = GmshService(cfg.gmsh_exe)
+    steps = PipelineStepsService(cfg.python_exe, runs_dir=cfg.runs_dir)
+    rows = []
+    for mode in modes:
+        mode_cfg = RunConfig(**{**cfg.__dict__, "bg_mode": mode, "bg_grid_n": grid_n})
+
+        t0 = time.perf_counter()
+        steps.export_background(cfg.case, write_csv=False, mode=mode, grid_n=grid_n)
+        t_export = time.perf_counter() - t0
+
+        bg = mode_cfg.background_field_file()
+        temp_geo = cfg.gmsh_dir() / f"temp_adapt_{mode}.geo"
+        temp_geo.write_text(
+            _build_temp_adapt_geo(
+                cfg.geo.resolve(),
+                bg_local_name=bg.name,
+                bg_mode=mode,
+                size_max=_background_size_max(cfg) if mode == "tets" else None,
+            ),
+            encoding="utf-8",
+        )
+        out_name = f"adapt_{mode}.msh"
+        best = float("inf")
+        for _ in range(max(1, repeat)):
+            t0 = time.perf_counter()
+            gmsh.mesh_adapt_with_pos(temp_geo=temp_geo, workdir=cfg.gmsh_dir(), out_name=out_name)
+            best = min(best, time.perf_counter() - t0)
+
+        rows.append(
+            {
+                "geo": cfg.geo.name,
+                "mode": mode,
+                "export_s": t_export,
+                "bg_MB": bg.stat().st_size / 2**20,
+                "adapt_s": best,
+                "adapt_tets": len(read_msh2_3d(cfg.gmsh_dir() / out_name).tets),
+            }
+        )
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Tiempo de remallado adapt por modo de campo de fondo (geo/ de ejemplo)")
+    ap.add_argument("--geo", nargs="*", type=Path, default=sorted(Path("geo").glob("*.geo")))
+    ap.add_argument("--modes", default=",".join(MODES))
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--grid-n", type=int, default=64)
+    ap.add_argument("--gmsh-exe", default="gmsh")
+    ap.add_argument("--runs-dir", type=Path, default=None, help="Default: carpeta temporal")
+    args = ap.parse_args()
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = sorted(set(modes) - set(MODES))
+    if unknown:
+        raise ValueError(f"Modos desconocidos: {unknown}. Disponibles: {MODES}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        runs_dir = args.runs_dir or Path(tmp)
+        rows = []
+        for geo in args.geo:
+            cfg = RunConfig(
+                case=f"bench_{geo.stem}",
+                geo=geo,
+                runs_dir=runs_dir,
+                gmsh_exe=args.gmsh_exe,
+                python_exe=sys.executable,
+                sigma_mode="dummy",
+            )
+            run_end_to_end(cfg)
+            rows.extend(bench_case(cfg, modes, args.repeat, grid_n=args.grid_n))
+
+    print("\n=== background modes ===")
+    print(f"{'geo':<28} {'mode':<8} {'export_s':>9} {'bg_MB':>8} {'adapt_s':>8} {'adapt_tets':>11}")
+    for r in rows:
+        print(
+            f"{r['geo']:<28} {r['mode']:<8} {r['export_s']:>9.3f} {r['bg_MB']:>8.3f} "
+            f"{r['adapt_s']:>8.3f} {r['adapt_tets']:>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
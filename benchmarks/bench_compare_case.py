@@ -0,0 +1,61 @@
+# benchmarks/bench_compare_case.py
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.bench_compare_stats import write_msh2
+from benchmarks.synthetic_mesh import cube_tet_mesh
+from compare_meshes import CASE_MESHES, compute_stats, compute_stats_from_case
+from src3d.compute_element_geometry_3d import save_geometry, tet_geometry_frame
+
+
+def _write_case(runs_dir: Path, case: str, n_elements: int) -> None:
+    """Caso sintético como lo deja el pipeline: .msh + element_geometry/node_coords por tag."""
+    gmsh = runs_dir / case / "gmsh"
+    gmsh.mkdir(parents=True, exist_ok=True)
+    for (_, tag, name), n in zip(CASE_MESHES, (n_elements // 4, n_elements)):
+        write_msh2(n, gmsh / name)
+        nodes, geom = cube_tet_mesh(n)
+        df = tet_geometry_frame(
+            nodes["node_id"].to_numpy(),
+            nodes[["x", "y", "z"]].to_numpy(),
+            geom["elem_id"].to_numpy(),
+            geom[["n0", "n1", "n2", "n3"]].to_numpy(),
+        )
+        save_geometry(df, pd.DataFrame(nodes[["node_id", "x", "y", "z"]]), case, tag, runs_dir)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="compare-meshes: parsear .msh vs --case (Parquets + tabla de aristas cacheada)")
+    ap.add_argument("--sizes", default="300000,1000000", help="Tets de la malla adapt (la coarse tiene 1/4)")
+    args = ap.parse_args()
+
+    print(f"{'n_adapt':>9} {'mode':>14} {'time_s':>8} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        runs_dir = Path(tmp)
+        for n in [int(v) for v in args.sizes.split(",") if v.strip()]:
+            case = f"bench_{n}"
+            _write_case(runs_dir, case, n)
+            gmsh = runs_dir / case / "gmsh"
+
+            t0 = time.perf_counter()
+            for _, _, name in CASE_MESHES:
+                compute_stats(gmsh / name)
+            t_msh = time.perf_counter() - t0
+            print(f"{n:>9} {'parse msh':>14} {t_msh:>8.2f} {'':>8}")
+
+            for label in ("case (build)", "case (cached)"):
+                t0 = time.perf_counter()
+                for _, tag, name in CASE_MESHES:
+                    compute_stats_from_case(case, tag, gmsh / name, runs_dir)
+                dt = time.perf_counter() - t0
+                print(f"{n:>9} {label:>14} {dt:>8.2f} {t_msh / dt:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_compare_edges.py
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.synthetic_mesh import cube_tet_mesh
+from compare_meshes import unique_edge_lengths
+
+
+def _unique_edge_lengths_legacy(pts: np.ndarray, tets: np.ndarray, max_edges: int | None = 2_000_000) -> np.ndarray:
+    """Implementación previa (np.unique(axis=0) sobre pares, submuestreo sobre max_edges), solo como referencia."""
+    edges = np.stack(
+        [tets[:, [0, 1]], tets[:, [0, 2]], tets[:, [0, 3]], tets[:, [1, 2]], tets[:, [1, 3]], tets[:, [2, 3]]], axis=1
+    ).reshape(-1, 2)
+    edges = np.sort(edges, axis=1)
+    if max_edges is not None and edges.shape[0] > max_edges:
+        idx = np.random.choice(edges.shape[0], size=max_edges, replace=False)
+        edges = edges[idx]
+    edges = np.unique(edges, axis=0)
+    return np.linalg.norm(pts[edges[:, 0]] - pts[edges[:, 1]], axis=1)
+
+
+def _measure(fn) -> tuple[float, float, np.ndarray]:
+    """Tiempo sin instrumentar y pico de memoria (tracemalloc) en una segunda pasada."""
+    t0 = time.perf_counter()
+    out = fn()
+    dt = time.perf_counter() - t0
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return dt, peak / 2**20, out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Aristas únicas de mallas tet (compare_meshes): claves int64 por chunks vs np.unique(axis=0)")
+    ap.add_argument("--sizes", default="1000000,3000000")
+    ap.add_argument("--memory-mb", type=float, default=512.0, help="Presupuesto de unique_edge_lengths")
+    ap.add_argument("--max-legacy", type=int, default=3_000_000, help="No corre la versión previa sobre este tamaño")
+    args = ap.parse_args()
+
+    print(f"{'n_tets':>9} {'method':>14} {'edges':>10} {'time_s':>8} {'peak_MB':>8} {'speedup':>8} {'exact':>6}")
+    for n in [int(v) for v in args.sizes.split(",") if v.strip()]:
+        nodes, geom = cube_tet_mesh(n)
+        pts = nodes[["x", "y", "z"]].to_numpy()
+        tets = geom[["n0", "n1", "n2", "n3"]].to_numpy() - 1
+
+        dt, peak, new = _measure(lambda: unique_edge_lengths(pts, tets, memory_mb=args.memory_mb))
+        print(f"{len(tets):>9} {'int64 chunks':>14} {len(new):>10} {dt:>8.3f} {peak:>8.0f} {'':>8} {'':>6}")
+        if len(tets) > args.max_legacy:
+            continue
+
+        for label, cap in (("legacy", 2_000_000), ("legacy exact", None)):
+            dt_old, peak_old, old = _measure(lambda: _unique_edge_lengths_legacy(pts, tets, cap))
+            exact = len(old) == len(new) and np.array_equal(np.sort(old), np.sort(new))
+            print(
+                f"{len(tets):>9} {label:>14} {len(old):>10} {dt_old:>8.3f} {peak_old:>8.0f} "
+                f"{dt_old / dt:>7.1f}x {'sí' if exact else 'no':>6}"
+            )
+
+
+if __name__ == "__main__":
+    main()
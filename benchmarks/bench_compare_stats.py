@@ -0,0 +1,76 @@
+# benchmarks/bench_compare_stats.py
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.synthetic_mesh import cube_tet_mesh
+from compare_meshes import compute_stats
+
+
+def write_msh2(n_elements: int, out: Path) -> int:
+    """Malla sintética en MSH2 ASCII (nodos + tets tipo 4); devuelve el número de tets."""
+    nodes, geom = cube_tet_mesh(n_elements)
+    ids = np.arange(1, len(geom) + 1)
+    with out.open("w", encoding="utf-8") as f:
+        f.write("$MeshFormat\n2.2 0 8\n$EndMeshFormat\n")
+        f.write(f"$Nodes\n{len(nodes)}\n")
+        np.savetxt(f, nodes[["node_id", "x", "y", "z"]].to_numpy(), fmt=["%d", "%.9g", "%.9g", "%.9g"])
+        f.write(f"$EndNodes\n$Elements\n{len(geom)}\n")
+        conn = np.column_stack([ids, np.full_like(ids, 4), np.full_like(ids, 2), np.ones_like(ids), np.ones_like(ids)])
+        np.savetxt(f, np.column_stack([conn, geom[["n0", "n1", "n2", "n3"]].to_numpy()]), fmt="%d")
+        f.write("$EndElements\n")
+    return len(geom)
+
+
+def _measure(fn) -> tuple[float, float, object]:
+    """Tiempo sin instrumentar y pico de memoria (tracemalloc) en una segunda pasada."""
+    t0 = time.perf_counter()
+    out = fn()
+    dt = time.perf_counter() - t0
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return dt, peak / 2**20, out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="compare_meshes.compute_stats: exacto vs streaming (sketches + histogramas fijos)")
+    ap.add_argument("--sizes", default="300000,1000000")
+    ap.add_argument("--edge-memory-mb", type=float, default=64.0, help="Presupuesto por chunk (define el tamaño de chunk en streaming)")
+    ap.add_argument("--sketch-alpha", type=float, default=0.005)
+    args = ap.parse_args()
+
+    print(f"{'n_tets':>9} {'mode':>10} {'time_s':>8} {'peak_MB':>8} {'max_rel_err':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in [int(v) for v in args.sizes.split(",") if v.strip()]:
+            msh = Path(tmp) / "mesh.msh"
+            n_tets = write_msh2(n, msh)
+            results = {}
+            for mode in ("exact", "streaming"):
+                dt, peak, (stats, _) = _measure(
+                    lambda: compute_stats(msh, args.edge_memory_mb, mode == "streaming", args.sketch_alpha)
+                )
+                results[mode] = stats
+                err = ""
+                if mode == "streaming":
+                    exact = results["exact"]
+                    rel = [
+                        abs(stats_d[k] - exact_d[k]) / abs(exact_d[k])
+                        for stats_d, exact_d in ((stats.tet_quality, exact.tet_quality), (stats.edge_lengths, exact.edge_lengths))
+                        for k in exact_d
+                        if exact_d[k]
+                    ]
+                    err = f"{max(rel):.2e}"
+                print(f"{n_tets:>9} {mode:>10} {dt:>8.2f} {peak:>8.0f} {err:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# benchmarks/bench_element_features_3d.py
+from __future__ import annotations
+
+import argparse
+import time
+
+from benchmarks.synthetic_mesh import cube_tet_mesh, hotspot_sigma
+from src3d.compute_element_features_3d import compute_features
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Costo de las features de vecindario por millón de elementos")
+    ap.add_argument("--sizes", default="100000,1000000", help="Tamaños de malla (n° de tets) separados por coma")
+    ap.add_argument("--repeat", type=int, default=1)
+    args = ap.parse_args()
+
+    print(f"{'n_tets':>10} {'build_s':>9} {'feat_s':>9} {'s/Mtets':>9}")
+    for n_target in [int(v) for v in args.sizes.split(",") if v.strip()]:
+        t0 = time.perf_counter()
+        nodes, geom = cube_tet_mesh(n_target)
+        sigma = hotspot_sigma(geom)
+        t_build = time.perf_counter() - t0
+
+        best = float("inf")
+        for _ in range(max(1, args.repeat)):
+            t0 = time.perf_counter()
+            compute_features(geom, nodes, sigma)
+            best = min(best, time.perf_counter() - t0)
+
+        n = len(geom)
+        print(f"{n:>10} {t_build:>9.3f} {best:>9.3f} {best / n * 1e6:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# benchmarks/bench_frd_reader.py
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.synthetic_mesh import cube_tet_mesh
+from src3d.fem.frd_reader import STRESS_COMPONENTS, read_frd_nodal_von_mises, von_mises
+
+
+def _stress_field(xyz: np.ndarray) -> np.ndarray:
+    """Tensor suave y no trivial (todas las componentes distintas de cero) por nodo."""
+    x, y, z = xyz.T
+    return np.column_stack(
+        [100 * x + 5, -40 * y + 3 * z, 60 * z**2 - 10, 15 * x * y, -8 * y * z + 1, 12 * z * x - 2]
+    )
+
+
+def write_frd(out: Path, node_ids: np.ndarray, xyz: np.ndarray, conn: np.ndarray, stress: np.ndarray, binary: bool) -> None:
+    """FRD mínimo al estilo de ccx: nodos, elementos te4, bloque DISP y bloque STRESS (formato largo o binario)."""
+    n, m = len(node_ids), len(conn)
+    fmt = 2 if binary else 1
+    disp = np.column_stack([xyz[:, 0] * 1e-3, xyz[:, 1] * 1e-3, xyz[:, 2] * -1e-3])
+    with out.open("wb") as f:
+        f.write(b"    1C\n    1UUSER\n")
+
+        f.write(f"    2C{n:>24d}{fmt:>37d}\n".encode())
+        if binary:
+            rec = np.empty(n, dtype=[("id", "<i4"), ("xyz", "<f8", (3,))])
+            rec["id"], rec["xyz"] = node_ids, xyz
+            f.write(rec.tobytes())
+        else:
+            np.savetxt(f, np.column_stack([node_ids, xyz]), fmt=" -1%10d%12.5E%12.5E%12.5E")
+            f.write(b" -3\n")
+
+        elem_ids = np.arange(1, m + 1)
+        f.write(f"    3C{m:>24d}{fmt:>37d}\n".encode())
+        if binary:
+            rec = np.empty((m, 8), dtype="<i4")
+            rec[:, 0], rec[:, 1], rec[:, 2], rec[:, 3], rec[:, 4:] = elem_ids, 3, 0, 1, conn
+            f.write(rec.tobytes())
+        else:
+            for row in np.column_stack([elem_ids, conn]):
+                f.write(b" -1%10d    3    0    1\n -2%10d%10d%10d%10d\n" % tuple(row))
+            f.write(b" -3\n")
+
+        f.write(b"    1PSTEP                1           1           1\n")
+        for name, comps, vals in (("DISP", ["D1", "D2", "D3", "ALL"], disp), ("STRESS", STRESS_COMPONENTS, stress)):
+            f.write(f"  100CL  101 1.00000E+00{n:>12d}{'':20s} 0{1:>5d}{'':10s}{fmt:>2d}\n".encode())
+            f.write(f" -4  {name:<8s}{len(comps):>5d}    1\n".encode())
+            for k, c in enumerate(comps):
+                exist = 1 if c == "ALL" else 0
+                f.write(f" -5  {c:<8s}{1:>5d}{4 if name == 'STRESS' else 2:>5d}{k + 1:>5d}{0:>5d}{exist:>5d}\n".encode())
+            if binary:
+                rec = np.empty(n, dtype=[("id", "<i4"), ("v", "<f4", (vals.shape[1],))])
+                rec["id"], rec["v"] = node_ids, vals
+                f.write(rec.tobytes())
+            else:
+                np.savetxt(f, np.column_stack([node_ids, vals]), fmt=" -1%10d" + "%12.5E" * vals.shape[1])
+                f.write(b" -3\n")
+        f.write(b" 9999\n")
+
+
+def read_frd_lines(frd: Path) -> tuple[np.ndarray, np.ndarray]:
+    """Lectura ingenua (línea a línea, todo el archivo en memoria) del último bloque STRESS ASCII, solo como referencia."""
+    ids, vals = [], []
+    in_stress = False
+    for line in frd.read_text().splitlines():
+        if line.startswith(" -4"):
+            in_stress = line.split()[1] == "STRESS"
+            if in_stress:
+                ids, vals = [], []
+        elif in_stress and line.startswith(" -1"):
+            ids.append(int(line[3:13]))
+            vals.append([float(line[13 + 12 * k : 25 + 12 * k]) for k in range(6)])
+        elif line.startswith(" -3"):
+            in_stress = False
+    return np.array(ids), von_mises(np.array(vals))
+
+
+def _measure(fn, path: Path):
+    t0 = time.perf_counter()
+    out = fn(path)
+    dt = time.perf_counter() - t0
+    tracemalloc.start()
+    fn(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return dt, peak / 2**20, out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Lectura de von Mises nodal desde FRD (ASCII y binario) en mallas sintéticas")
+    ap.add_argument("--sizes", default="1000000,3000000", help="Elementos (te4) de la malla sintética")
+    ap.add_argument("--max-legacy", type=int, default=1_000_000, help="No corre la lectura línea a línea sobre este nº de nodos")
+    args = ap.parse_args()
+
+    print(f"{'n_nodes':>9} {'format':>6} {'file_MB':>8} {'reader':>8} {'time_s':>8} {'nodes/s':>11} {'peak_MB':>8} {'max_err':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in [int(v) for v in args.sizes.split(",") if v.strip()]:
+            nodes, geom = cube_tet_mesh(n)
+            node_ids = nodes["node_id"].to_numpy()
+            xyz = nodes[["x", "y", "z"]].to_numpy()
+            conn = geom[["n0", "n1", "n2", "n3"]].to_numpy()
+            stress = _stress_field(xyz)
+            exact = von_mises(stress)
+
+            for binary in (False, True):
+                frd = Path(tmp) / f"job_{n}_{'bin' if binary else 'asc'}.frd"
+                write_frd(frd, node_ids, xyz, conn, stress, binary)
+                size_mb = frd.stat().st_size / 2**20
+                label = "bin" if binary else "ascii"
+
+                rows = []
+                if not binary and len(node_ids) <= args.max_legacy:
+                    dt, peak, (ids, vm) = _measure(read_frd_lines, frd)
+                    rows.append(("lines", dt, peak, np.abs(vm - exact).max()))
+                dt, peak, res = _measure(read_frd_nodal_von_mises, frd)
+                assert np.array_equal(res.node_ids, node_ids)
+                rows.append(("numpy", dt, peak, np.abs(res.sigma_vm - exact).max()))
+
+                for name, t, pk, err in rows:
+                    print(
+                        f"{len(node_ids):>9} {label:>6} {size_mb:>8.1f} {name:>8} {t:>8.3f} "
+                        f"{len(node_ids) / t:>11.0f} {pk:>8.1f} {err:>9.2e}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# benchmarks/bench_gmsh_backends.py
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from mesh_app.config import RunConfig
+from mesh_app.pipeline.run_pipeline import (
+    _build_temp_adapt_geo,
+    _mesh_adapt_api,
+    _save_mesh_geometry,
+    run_end_to_end,
+)
+from mesh_app.services.gmsh_api_service import GmshApiService
+from mesh_app.services.gmsh_service import GmshService
+from mesh_app.services.pipeline_steps_service import PipelineStepsService
+
+BACKENDS = ["cli", "api"]
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench_case(cfg: RunConfig, repeat: int) -> list[dict]:
+    """Coarse y adapt (campo points) con cada backend, incluyendo la tabla de geometría."""
+    gmsh = GmshService(cfg.gmsh_exe)
+    api = GmshApiService(verbose=False)
+    steps = PipelineStepsService(cfg.python_exe, runs_dir=cfg.runs_dir)
+
+    def coarse_cli():
+        gmsh.mesh_coarse(cfg.geo, cfg.coarse_msh())
+        steps.compute_geometry(cfg.case, cfg.coarse_msh())
+
+    def coarse_api():
+        _save_mesh_geometry(cfg, api.mesh_coarse(cfg.geo, cfg.coarse_msh()))
+
+    def adapt_cli():
+        steps.export_background(cfg.case, write_csv=False)
+        temp_geo = cfg.gmsh_dir() / "temp_adapt_bench.geo"
+        temp_geo.write_text(_build_temp_adapt_geo(cfg.geo.resolve()), encoding="utf-8")
+        gmsh.mesh_adapt_with_pos(temp_geo=temp_geo, workdir=cfg.gmsh_dir(), out_name=cfg.adapt_name)
+        steps.compute_geometry(cfg.case, cfg.adapt_msh(), tag="adapt")
+
+    def adapt_api():
+        _save_mesh_geometry(cfg, _mesh_adapt_api(api, cfg, "post"), tag="adapt")
+
+    fns = {"cli": (coarse_cli, adapt_cli), "api": (coarse_api, adapt_api)}
+    rows = []
+    for backend in BACKENDS:
+        coarse_fn, adapt_fn = fns[backend]
+        rows.append(
+            {
+                "geo": cfg.geo.name,
+                "backend": backend,
+                "coarse_s": _best(coarse_fn, repeat),
+                "adapt_s": _best(adapt_fn, repeat),
+            }
+        )
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Tiempo coarse/adapt (malla + geometría) con gmsh cli vs api (geo/ de ejemplo)")
+    ap.add_argument("--geo", nargs="*", type=Path, default=sorted(Path("geo").glob("*.geo")))
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--gmsh-exe", default="gmsh")
+    ap.add_argument("--runs-dir", type=Path, default=None, help="Default: carpeta temporal")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        runs_dir = args.runs_dir or Path(tmp)
+        rows = []
+        for geo in args.geo:
+            cfg = RunConfig(
+                case=f"bench_{geo.stem}",
+                geo=geo,
+                runs_dir=runs_dir,
+                gmsh_exe=args.gmsh_exe,
+                python_exe=sys.executable,
+                sigma_mode="dummy",
+            )
+            run_end_to_end(cfg)
+            rows.extend(bench_case(cfg, args.repeat))
+
+    print("\n=== gmsh backends (malla + geometría) ===")
+    print(f"{'geo':<28} {'backend':<8} {'coarse_s':>9} {'adapt_s':>8}")
+    for r in rows:
+        print(f"{r['geo']:<28} {r['backend']:<8} {r['coarse_s']:>9.3f} {r['adapt_s']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
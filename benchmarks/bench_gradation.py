@@ -0,0 +1,88 @@
+# benchmarks/bench_gradation.py
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from mesh_app.config import RunConfig
+from mesh_app.pipeline.run_pipeline import _build_temp_adapt_geo, run_end_to_end
+from mesh_app.services.gmsh_service import GmshService
+from mesh_app.services.pipeline_steps_service import PipelineStepsService
+from src3d.paths3d import element_estimate_json
+from src3d.read_mesh_3d import read_msh2_3d
+
+
+def bench_case(cfg: RunConfig, ratios: list[float | None], repeat: int) -> list[dict]:
+    """Postproceso con cada razón de gradación, export points y remallado adapt."""
+    gmsh = GmshService(cfg.gmsh_exe)
+    steps = PipelineStepsService(cfg.python_exe, runs_dir=cfg.runs_dir)
+    temp_geo = cfg.gmsh_dir() / "temp_adapt_grad.geo"
+    temp_geo.write_text(_build_temp_adapt_geo(cfg.geo.resolve()), encoding="utf-8")
+
+    rows = []
+    for ratio in ratios:
+        steps.postprocess(cfg.case, geo_name=cfg.geo.name, grad_ratio=ratio)
+        est = json.loads(element_estimate_json(cfg.case, cfg.runs_dir).read_text(encoding="utf-8"))
+        steps.export_background(cfg.case, write_csv=False)
+
+        out_name = "adapt_grad.msh"
+        best = float("inf")
+        for _ in range(max(1, repeat)):
+            t0 = time.perf_counter()
+            gmsh.mesh_adapt_with_pos(temp_geo=temp_geo, workdir=cfg.gmsh_dir(), out_name=out_name)
+            best = min(best, time.perf_counter() - t0)
+
+        rows.append(
+            {
+                "geo": cfg.geo.name,
+                "ratio": "off" if ratio is None else f"{ratio:g}",
+                "iters": est["grad_iters"],
+                "adjusted": est["grad_adjusted"],
+                "adapt_s": best,
+                "adapt_tets": len(read_msh2_3d(cfg.gmsh_dir() / out_name).tets),
+            }
+        )
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Efecto de la gradación de h_post en el remallado adapt (geo/ de ejemplo)")
+    ap.add_argument("--geo", nargs="*", type=Path, default=sorted(Path("geo").glob("*.geo")))
+    ap.add_argument("--ratios", default="off,1.5,1.3,1.15")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--gmsh-exe", default="gmsh")
+    ap.add_argument("--runs-dir", type=Path, default=None, help="Default: carpeta temporal")
+    args = ap.parse_args()
+
+    ratios = [None if r.strip() == "off" else float(r) for r in args.ratios.split(",") if r.strip()]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        runs_dir = args.runs_dir or Path(tmp)
+        rows = []
+        for geo in args.geo:
+            cfg = RunConfig(
+                case=f"bench_{geo.stem}",
+                geo=geo,
+                runs_dir=runs_dir,
+                gmsh_exe=args.gmsh_exe,
+                python_exe=sys.executable,
+                sigma_mode="dummy",
+            )
+            run_end_to_end(cfg)
+            rows.extend(bench_case(cfg, ratios, args.repeat))
+
+    print("\n=== gradación de h_post ===")
+    print(f"{'geo':<28} {'ratio':>6} {'iters':>6} {'adjusted':>9} {'adapt_s':>8} {'adapt_tets':>11}")
+    for r in rows:
+        print(
+            f"{r['geo']:<28} {r['ratio']:>6} {r['iters']:>6} {r['adjusted']:>9} "
+            f"{r['adapt_s']:>8.3f} {r['adapt_tets']:>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
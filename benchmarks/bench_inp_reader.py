@@ -0,0 +1,114 @@
+# benchmarks/bench_inp_reader.py
+from __future__ import annotations
+
+import argparse
+import re
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_mesh import cube_tet_mesh
+from src3d.fem.inp_reader import read_inp
+
+_NUM = r"([+-]?\d*\.?\d+(?:[eE][+-]?\d+)?)"
+_NODE_LINE_RE = re.compile(rf"^\s*(\d+)\s*,\s*{_NUM}\s*,\s*{_NUM}\s*,\s*{_NUM}\s*$")
+_ELEM_LINE_RE = re.compile(r"^\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*$")
+
+
+def _read_block_regex(mesh_inp: Path, keyword: str, pattern: re.Pattern, cast) -> list[tuple]:
+    """Implementación previa (regex por línea, primer bloque del keyword), solo como referencia."""
+    rows = []
+    inside = False
+    for line in mesh_inp.read_text(encoding="utf-8", errors="ignore").splitlines():
+        row = line.strip()
+        if not row:
+            continue
+        if row.upper().startswith(keyword):
+            inside = True
+            continue
+        if inside and row.startswith("*"):
+            break
+        if inside:
+            m = pattern.match(row)
+            if m:
+                rows.append(tuple(f(g) for f, g in zip(cast, m.groups())))
+    return rows
+
+
+def read_inp_regex(mesh_inp: Path) -> tuple[pd.DataFrame, pd.DataFrame]:
+    nodes = _read_block_regex(mesh_inp, "*NODE", _NODE_LINE_RE, (int, float, float, float))
+    elems = _read_block_regex(mesh_inp, "*ELEMENT", _ELEM_LINE_RE, (int,) * 5)
+    return (
+        pd.DataFrame(nodes, columns=["node_id", "x", "y", "z"]),
+        pd.DataFrame(elems, columns=["elem_id", "n1", "n2", "n3", "n4"]),
+    )
+
+
+def write_deck(n_elems: int, out: Path) -> tuple[int, int]:
+    """Deck estilo Gmsh (*NODE, *ELEMENT C3D4, *ELSET) con ~n_elems tets."""
+    nodes, geom = cube_tet_mesh(n_elems)
+    with out.open("w", encoding="utf-8") as f:
+        f.write("*Heading\n bench\n*NODE\n")
+        nodes.to_csv(f, header=False, index=False, float_format="%.10g")
+        f.write("******* E L E M E N T S *************\n*ELEMENT, type=C3D4, ELSET=Volume1\n")
+        geom[["elem_id", "n0", "n1", "n2", "n3"]].to_csv(f, header=False, index=False)
+        f.write("*ELSET,ELSET=SOLID\n")
+        ids = geom["elem_id"].to_numpy()
+        pad = np.full(-len(ids) % 10, -1)
+        rows = pd.DataFrame(np.concatenate([ids, pad]).reshape(-1, 10))
+        text = rows.to_csv(header=False, index=False).replace(",-1", "")
+        f.write(text.replace("\n", ", \n"))
+    return len(nodes), len(geom)
+
+
+def _measure(fn, path: Path) -> tuple[float, float, object]:
+    t0 = time.perf_counter()
+    out = fn(path)
+    dt = time.perf_counter() - t0
+
+    tracemalloc.start()
+    fn(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return dt, peak / 2**20, out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Lectura de mesh.inp: regex por línea (2 pasadas) vs lector NumPy de una pasada")
+    ap.add_argument("--sizes", default="1000000,3000000")
+    ap.add_argument("--max-legacy", type=int, default=3_000_000, help="No corre la versión regex sobre este tamaño")
+    args = ap.parse_args()
+
+    print(f"{'n_elems':>10} {'file_MB':>8} {'reader':>7} {'time_s':>8} {'elems/s':>12} {'peak_MB':>8} {'same':>5}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in [int(v) for v in args.sizes.split(",") if v.strip()]:
+            deck = Path(tmp) / f"mesh_{n}.inp"
+            _, n_elems = write_deck(n, deck)
+            size_mb = deck.stat().st_size / 2**20
+
+            dt, peak, mesh = _measure(read_inp, deck)
+            rows = []
+            same = ""
+            if n_elems <= args.max_legacy:
+                dt_old, peak_old, (nodes_old, elems_old) = _measure(read_inp_regex, deck)
+                block = mesh.blocks[0]
+                same = (
+                    np.array_equal(nodes_old["node_id"].to_numpy(), mesh.node_ids)
+                    and np.array_equal(nodes_old[["x", "y", "z"]].to_numpy(), mesh.node_xyz)
+                    and np.array_equal(elems_old["elem_id"].to_numpy(), block.ids)
+                    and np.array_equal(elems_old[["n1", "n2", "n3", "n4"]].to_numpy(), block.conn)
+                )
+                rows.append(("regex", dt_old, peak_old, ""))
+                same = "yes" if same else "NO"
+            rows.append(("numpy", dt, peak, same))
+
+            for name, t, pk, flag in rows:
+                print(f"{n_elems:>10} {size_mb:>8.1f} {name:>7} {t:>8.3f} {n_elems / t:>12.0f} {pk:>8.1f} {flag:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# benchmarks/bench_mesh_profiles.py
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from compare_meshes import compute_stats
+from mesh_app.config import RunConfig
+from mesh_app.mesh_profiles import MESH_PROFILES, mesh_options
+from mesh_app.pipeline.run_pipeline import _build_temp_adapt_geo, run_end_to_end
+from mesh_app.services.gmsh_service import GmshService
+
+QUALITY_KEYS = ["min", "p01", "p05", "median"]
+
+
+def bench_case(cfg: RunConfig, profiles: list[str], threads: int) -> list[dict]:
+    """Coarse + adapt (campo points ya exportado) con cada perfil; calidad según compare_meshes."""
+    gmsh = GmshService(cfg.gmsh_exe)
+    bg = cfg.background_field_file()
+    rows = []
+    for profile in profiles:
+        opts = mesh_options(profile, threads)
+
+        coarse = cfg.gmsh_dir() / f"coarse_{profile}.msh"
+        t0 = time.perf_counter()
+        gmsh.mesh_coarse(cfg.geo, coarse, options=opts)
+        t_coarse = time.perf_counter() - t0
+
+        temp_geo = cfg.gmsh_dir() / f"temp_adapt_{profile}.geo"
+        temp_geo.write_text(
+            _build_temp_adapt_geo(cfg.geo.resolve(), bg_local_name=bg.name, mesh_options=opts),
+            encoding="utf-8",
+        )
+        out_name = f"adapt_{profile}.msh"
+        t0 = time.perf_counter()
+        gmsh.mesh_adapt_with_pos(temp_geo=temp_geo, workdir=cfg.gmsh_dir(), out_name=out_name)
+        t_adapt = time.perf_counter() - t0
+
+        stats, _ = compute_stats(cfg.gmsh_dir() / out_name)
+        rows.append(
+            {
+                "geo": cfg.geo.name,
+                "profile": profile,
+                "threads": opts["General.NumThreads"],
+                "coarse_s": t_coarse,
+                "adapt_s": t_adapt,
+                "adapt_tets": stats.elem_counts.get("type_4", 0),
+                **{f"q_{k}": stats.tet_quality[k] for k in QUALITY_KEYS},
+            }
+        )
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Tiempo y calidad (compare_meshes) por perfil de mallado (geo/ de ejemplo)")
+    ap.add_argument("--geo", nargs="*", type=Path, default=sorted(Path("geo").glob("*.geo")))
+    ap.add_argument("--profiles", default=",".join(MESH_PROFILES))
+    ap.add_argument("--threads", type=int, default=0, help="0 = default de cada perfil")
+    ap.add_argument("--gmsh-exe", default="gmsh")
+    ap.add_argument("--runs-dir", type=Path, default=None, help="Default: carpeta temporal")
+    args = ap.parse_args()
+
+    profiles = [p.strip() for p in args.profiles.split(",") if p.strip()]
+    unknown = sorted(set(profiles) - set(MESH_PROFILES))
+    if unknown:
+        raise ValueError(f"Perfiles desconocidos: {unknown}. Disponibles: {sorted(MESH_PROFILES)}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        runs_dir = args.runs_dir or Path(tmp)
+        rows = []
+        for geo in args.geo:
+            cfg = RunConfig(
+                case=f"bench_{geo.stem}",
+                geo=geo,
+                runs_dir=runs_dir,
+                gmsh_exe=args.gmsh_exe,
+                python_exe=sys.executable,
+                sigma_mode="dummy",
+            )
+            run_end_to_end(cfg)
+            rows.extend(bench_case(cfg, profiles, args.threads))
+
+    print("\n=== mesh profiles (calidad mean-ratio de la malla adapt) ===")
+    print(
+        f"{'geo':<28} {'profile':<9} {'thr':>3} {'coarse_s':>9} {'adapt_s':>8} {'adapt_tets':>11} "
+        + " ".join(f"{'q_' + k:>8}" for k in QUALITY_KEYS)
+    )
+    for r in rows:
+        print(
+            f"{r['geo']:<28} {r['profile']:<9} {r['threads']:>3} {r['coarse_s']:>9.3f} {r['adapt_s']:>8.3f} "
+            f"{r['adapt_tets']:>11} " + " ".join(f"{r['q_' + k]:>8.4f}" for k in QUALITY_KEYS)
+        )
+
+
+if __name__ == "__main__":
+    main()
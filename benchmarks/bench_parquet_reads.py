@@ -0,0 +1,163 @@
+# benchmarks/bench_parquet_reads.py
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from benchmarks.synthetic_mesh import cube_tet_mesh, hotspot_sigma
+from src3d.compute_element_geometry_3d import save_geometry, tet_geometry_frame
+from src3d.parquet_io_3d import read_columns
+from src3d.paths3d import (
+    dataset_hstar_parquet,
+    geometry_parquet,
+    h_pred_element_parquet,
+    h_pred_post_parquet,
+    node_coords_parquet,
+    sigma_vm_parquet,
+)
+
+CASE = "bench"
+BASE_FEATS = ["cx", "cy", "cz", "h_cbrtV", "sigma_vm_coarse"]
+
+# Lecturas de cada paso: (archivo, columnas leídas, .copy()) antes y columnas con read_columns después.
+# None = todas las columnas.
+STEPS = {
+    "postprocess_h_pred_3d": (
+        [("pred", None, True), ("geom", None, True)],
+        [("pred", ["elem_id", "cx", "cy", "cz", "h_pred"]), ("geom", ["elem_id", "h_cbrtV", "volume"])],
+    ),
+    "plot_hist_h3d": (
+        [("geom", None, False), ("geom_adapt", None, False)],
+        [("geom", ["h_cbrtV"]), ("geom_adapt", ["h_cbrtV"])],
+    ),
+    "make_dummy_sigma_vm_3d": ([("geom", None, True)], [("geom", ["elem_id", "cx", "cy", "cz"])]),
+    "solve_and_extract (fallback)": ([("geom", None, True)], [("geom", ["elem_id", "cx", "cy", "cz"])]),
+    "compute_hstar_3d": (
+        [("geom", None, True), ("sigma_c", None, False), ("sigma_r", None, False)],
+        [("geom", None), ("sigma_c", ["elem_id", "sigma_vm"]), ("sigma_r", ["elem_id", "sigma_vm"])],
+    ),
+    "train_ml_hstar_3d": ([("dataset", None, True)], [("dataset", ["elem_id", "h_star", *BASE_FEATS])]),
+    "predict_hstar_3d": ([("dataset", None, True)], [("dataset", ["elem_id", *BASE_FEATS])]),
+    "compute_element_features_3d": (
+        [("geom", ["elem_id", "n0", "n1", "n2", "n3", "cx", "cy", "cz"], False), ("nodes", None, False), ("sigma_c", None, False)],
+        [("geom", ["elem_id", "n0", "n1", "n2", "n3", "cx", "cy", "cz"]), ("nodes", None), ("sigma_c", ["elem_id", "sigma_vm"])],
+    ),
+    "export_background (points)": (
+        [("post", None, True)],
+        [("post", ["cx", "cy", "cz", "h_post"])],
+    ),
+}
+
+
+def _write_case(runs_dir: Path, n_coarse: int, n_adapt: int) -> dict[str, Path]:
+    """Caso sintético con los Parquets que leen los pasos (mismas columnas que el pipeline)."""
+    frames = {}
+    for tag, n in (("", n_coarse), ("adapt", n_adapt)):
+        nodes, geom = cube_tet_mesh(n)
+        df = tet_geometry_frame(
+            nodes["node_id"].to_numpy(),
+            nodes[["x", "y", "z"]].to_numpy(),
+            geom["elem_id"].to_numpy(),
+            geom[["n0", "n1", "n2", "n3"]].to_numpy(),
+        )
+        save_geometry(df, pd.DataFrame(nodes[["node_id", "x", "y", "z"]]), CASE, tag, runs_dir)
+        frames[tag] = df
+
+    geom = frames[""]
+    sc, sr = hotspot_sigma(geom), hotspot_sigma(geom, amp=48.0, r0=0.112)
+    pd.DataFrame({"elem_id": geom["elem_id"], "sigma_vm": sc}).to_parquet(sigma_vm_parquet(CASE, "coarse", runs_dir), index=False)
+    pd.DataFrame({"elem_id": geom["elem_id"], "sigma_vm": sr}).to_parquet(sigma_vm_parquet(CASE, "ref", runs_dir), index=False)
+
+    ds = geom.assign(sigma_vm_coarse=sc, sigma_vm_ref=sr, e_rel=np.abs(sc - sr) / sr)
+    ds["h_star"] = np.clip(ds["h_cbrtV"] * (0.05 / ds["e_rel"]) ** 0.5, 0.6 * ds["h_cbrtV"].median(), 1.2 * ds["h_cbrtV"].median())
+    ds.to_parquet(dataset_hstar_parquet(CASE, runs_dir), index=False)
+    pred = ds[["elem_id", "cx", "cy", "cz", "h_cbrtV", "sigma_vm_coarse"]].assign(h_pred=ds["h_star"])
+    pred.to_parquet(h_pred_element_parquet(CASE, runs_dir), index=False)
+    pred[["elem_id", "cx", "cy", "cz", "h_pred"]].assign(h_post=pred["h_pred"]).to_parquet(
+        h_pred_post_parquet(CASE, runs_dir), index=False
+    )
+    return {
+        "geom": geometry_parquet(CASE, "", runs_dir),
+        "geom_adapt": geometry_parquet(CASE, "adapt", runs_dir),
+        "nodes": node_coords_parquet(CASE, "", runs_dir),
+        "sigma_c": sigma_vm_parquet(CASE, "coarse", runs_dir),
+        "sigma_r": sigma_vm_parquet(CASE, "ref", runs_dir),
+        "dataset": dataset_hstar_parquet(CASE, runs_dir),
+        "pred": h_pred_element_parquet(CASE, runs_dir),
+        "post": h_pred_post_parquet(CASE, runs_dir),
+    }
+
+
+def _chunk_bytes(path: Path, columns: list[str] | None) -> int:
+    """Bytes de column chunks (comprimidos) que hay que leer del archivo para esas columnas."""
+    meta = pq.ParquetFile(path).metadata
+    total = 0
+    for rg in range(meta.num_row_groups):
+        group = meta.row_group(rg)
+        for i in range(group.num_columns):
+            col = group.column(i)
+            if columns is None or col.path_in_schema in columns:
+                total += col.total_compressed_size
+    return total
+
+
+def _rss_kb(field: str) -> int:
+    for line in Path("/proc/self/status").read_text().splitlines():
+        if line.startswith(field + ":"):
+            return int(line.split()[1])
+    raise RuntimeError(f"{field} no está en /proc/self/status (se necesita Linux)")
+
+
+def _run_reads(job: tuple[str, list, dict[str, Path]]) -> tuple[float, float]:
+    """En un proceso nuevo: (segundos, MB de pico de RSS por sobre el proceso ya importado)."""
+    mode, reads, paths = job
+    Path("/proc/self/clear_refs").write_text("5")  # reinicia VmHWM (pico de RSS) al RSS actual
+    base = _rss_kb("VmRSS")
+    t0 = time.perf_counter()
+    held = []
+    for spec in reads:
+        if mode == "before":
+            key, cols, copy = spec
+            df = pd.read_parquet(paths[key], columns=cols)
+            held.append(df.copy() if copy else df)
+        else:
+            key, cols = spec
+            held.append(read_columns(paths[key], cols))
+    dt = time.perf_counter() - t0
+    peak = _rss_kb("VmHWM")
+    return dt, (peak - base) / 1024.0
+
+
+def _measure(mode: str, reads: list, paths: dict[str, Path]) -> tuple[float, float]:
+    ctx = mp.get_context("spawn")
+    with ctx.Pool(1, maxtasksperchild=1) as pool:
+        return pool.apply(_run_reads, ((mode, reads, paths),))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Lecturas Parquet por paso de src3d: archivo completo + .copy() vs read_columns (proyección)")
+    ap.add_argument("--coarse", type=int, default=1_000_000, help="Tets coarse (geometría, sigma, dataset, h_pred)")
+    ap.add_argument("--adapt", type=int, default=3_000_000, help="Tets adapt (solo plot_hist_h3d)")
+    args = ap.parse_args()
+
+    print(f"{'step':>29} {'MB_read':>15} {'peak_MB':>15} {'time_s':>13}")
+    print(f"{'':>29} {'antes':>7} {'después':>7} {'antes':>7} {'después':>7} {'antes':>6} {'después':>6}")
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = _write_case(Path(tmp), args.coarse, args.adapt)
+        for step, (before, after) in STEPS.items():
+            mb_b = sum(_chunk_bytes(paths[k], c) for k, c, _ in before) / 2**20
+            mb_a = sum(_chunk_bytes(paths[k], c) for k, c in after) / 2**20
+            t_b, peak_b = _measure("before", before, paths)
+            t_a, peak_a = _measure("after", after, paths)
+            print(f"{step:>29} {mb_b:>7.1f} {mb_a:>7.1f} {peak_b:>7.0f} {peak_a:>7.0f} {t_b:>6.2f} {t_a:>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
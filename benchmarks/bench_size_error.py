@@ -0,0 +1,63 @@
+# benchmarks/bench_size_error.py
+from __future__ import annotations
+
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_mesh import cube_tet_mesh
+from src3d.compute_element_geometry_3d import save_geometry, tet_geometry_frame
+from src3d.paths3d import h_pred_post_parquet
+from src3d.size_error_map_3d import size_error_map
+
+
+def _save_mesh(n_elements: int, case: str, tag: str, runs_dir: Path) -> pd.DataFrame:
+    nodes, geom = cube_tet_mesh(n_elements)
+    df = tet_geometry_frame(
+        nodes["node_id"].to_numpy(),
+        nodes[["x", "y", "z"]].to_numpy(),
+        geom["elem_id"].to_numpy(),
+        geom[["n0", "n1", "n2", "n3"]].to_numpy(),
+    )
+    save_geometry(df, pd.DataFrame(nodes[["node_id", "x", "y", "z"]]), case, tag, runs_dir)
+    return df
+
+
+def _write_case(runs_dir: Path, case: str, n_coarse: int, n_adapt: int) -> None:
+    """Caso sintético: coarse + h_pred_post (h suave en el cubo unitario) + geometría adapt."""
+    coarse = _save_mesh(n_coarse, case, "", runs_dir)
+    c = coarse[["cx", "cy", "cz"]].to_numpy()
+    h = 0.01 + 0.05 * np.linalg.norm(c - 0.5, axis=1)
+    hp = pd.DataFrame({"elem_id": coarse["elem_id"], "cx": c[:, 0], "cy": c[:, 1], "cz": c[:, 2], "h_pred": h, "h_post": h})
+    hp.to_parquet(h_pred_post_parquet(case, runs_dir), index=False)
+    _save_mesh(n_adapt, case, "adapt", runs_dir)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="size_error_map_3d: throughput del mapa de error de tamaño por campo objetivo")
+    ap.add_argument("--coarse", type=int, default=200_000, help="Tets coarse (puntos del campo)")
+    ap.add_argument("--sizes", default="1000000,3000000", help="Tets adapt a evaluar")
+    ap.add_argument("--targets", default="points,nodes,tets")
+    ap.add_argument("--workers", type=int, default=0)
+    args = ap.parse_args()
+
+    print(f"{'n_adapt':>9} {'target':>7} {'build_s':>8} {'map_s':>8} {'elem/s':>10} {'p50':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        runs_dir = Path(tmp)
+        for n in [int(v) for v in args.sizes.split(",") if v.strip()]:
+            case = f"bench_{n}"
+            _write_case(runs_dir, case, args.coarse, n)
+            for target in [t.strip() for t in args.targets.split(",") if t.strip()]:
+                s = size_error_map(case, runs_dir, target=target, workers=args.workers)
+                n_el = s["all"]["n"]
+                print(
+                    f"{n_el:>9} {target:>7} {s['build_s']:>8.2f} {s['map_s']:>8.2f} "
+                    f"{n_el / s['map_s']:>10.0f} {s['all']['p50']:>8.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
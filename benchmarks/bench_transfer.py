@@ -0,0 +1,63 @@
+# benchmarks/bench_transfer.py
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from benchmarks.bench_inp_reader import write_deck
+from benchmarks.synthetic_mesh import cube_tet_mesh
+from src3d.fem.transfer import transfer_to_points
+
+
+def _linear_sigma(xyz: np.ndarray) -> np.ndarray:
+    """Campo lineal: la interpolación baricéntrica lo reproduce exacto dentro de la malla."""
+    return 100.0 + 40.0 * xyz[:, 0] - 25.0 * xyz[:, 1] + 60.0 * xyz[:, 2]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Transferencia de sigma nodal desde una malla de referencia a puntos (centroides coarse)")
+    ap.add_argument("--ref-elements", type=int, default=1_000_000, help="Tets de la malla de referencia sintética")
+    ap.add_argument("--points", default="100000,1000000,3000000", help="Puntos a interpolar")
+    ap.add_argument("--k", type=int, default=8)
+    ap.add_argument("--batch", type=int, default=100_000)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ref_inp = Path(tmp) / "ref.inp"
+        write_deck(args.ref_elements, ref_inp)
+        nodes, geom = cube_tet_mesh(args.ref_elements)
+        xyz = nodes[["x", "y", "z"]].to_numpy()
+        ref_sigma = Path(tmp) / "ref_sigma.parquet"
+        pd.DataFrame({"node_id": nodes["node_id"], "sigma_vm": _linear_sigma(xyz)}).to_parquet(ref_sigma, index=False)
+        centroid_tree = cKDTree(geom[["cx", "cy", "cz"]].to_numpy())
+
+        print(f"{'n_ref':>9} {'n_pts':>9} {'method':>9} {'build_s':>8} {'query_s':>8} {'pts/s':>11} {'outside':>8} {'max_err':>9}")
+        rng = np.random.default_rng(0)
+        for n in [int(v) for v in args.points.split(",") if v.strip()]:
+            pts = rng.uniform(0.02, 0.98, size=(n, 3))
+            exact = _linear_sigma(pts)
+
+            # Referencia: valor del tet de centroide más cercano (sin baricéntricas)
+            t0 = time.perf_counter()
+            _, nearest = centroid_tree.query(pts, workers=-1)
+            tet_sigma = _linear_sigma(geom[["cx", "cy", "cz"]].to_numpy())
+            err = np.abs(tet_sigma[nearest] - exact).max()
+            dt = time.perf_counter() - t0
+            print(f"{len(geom):>9} {n:>9} {'nearest':>9} {'-':>8} {dt:>8.3f} {n / dt:>11.0f} {'-':>8} {err:>9.2e}")
+
+            vals, stats = transfer_to_points(ref_inp, ref_sigma, pts, k=args.k, batch=args.batch)
+            err = np.abs(vals - exact).max()
+            print(
+                f"{stats.n_ref_tets:>9} {n:>9} {'bary':>9} {stats.build_s:>8.3f} {stats.query_s:>8.3f} "
+                f"{n / stats.query_s:>11.0f} {stats.n_outside:>8} {err:>9.2e}"
+            )
+
+
+if __name__ == "__main__":
+    main()
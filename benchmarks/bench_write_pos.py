@@ -0,0 +1,63 @@
+# benchmarks/bench_write_pos.py
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src3d.export_background_points_3d import write_pos
+
+
+def write_pos_iterrows(points_df: pd.DataFrame, out_pos: Path) -> None:
+    """Implementación previa (iterrows + lista de líneas), solo como referencia."""
+    lines = []
+    lines.append('View "background_points_3d" {')
+    for _, r in points_df.iterrows():
+        x = float(r["x"]); y = float(r["y"]); z = float(r["z"]); h = float(r["h"])
+        lines.append(f"  SP({x},{y},{z}){{{h}}};")
+    lines.append("};")
+    out_pos.write_text("\n".join(lines), encoding="utf-8")
+
+
+def _measure(fn, pts: pd.DataFrame, out: Path) -> tuple[float, float]:
+    """Tiempo sin instrumentar y pico de memoria (tracemalloc) en una segunda pasada."""
+    t0 = time.perf_counter()
+    fn(pts, out)
+    dt = time.perf_counter() - t0
+
+    tracemalloc.start()
+    fn(pts, out)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return dt, peak / 2**20
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Throughput (puntos/s) del writer .pos de fondo")
+    ap.add_argument("--sizes", default="100000,1000000")
+    ap.add_argument("--max-legacy", type=int, default=200_000, help="No corre la versión iterrows sobre este tamaño")
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'n_points':>10} {'writer':>9} {'time_s':>8} {'pts/s':>12} {'peak_MB':>8} {'same':>5}")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for n in [int(v) for v in args.sizes.split(",") if v.strip()]:
+            pts = pd.DataFrame(rng.random((n, 4)), columns=["x", "y", "z", "h"])
+
+            dt, peak = _measure(write_pos, pts, tmp / "new.pos")
+            print(f"{n:>10} {'chunked':>9} {dt:>8.3f} {n / dt:>12.0f} {peak:>8.1f} {'-':>5}")
+
+            if n <= args.max_legacy:
+                dt, peak = _measure(write_pos_iterrows, pts, tmp / "old.pos")
+                same = (tmp / "new.pos").read_bytes() == (tmp / "old.pos").read_bytes()
+                print(f"{n:>10} {'iterrows':>9} {dt:>8.3f} {n / dt:>12.0f} {peak:>8.1f} {str(same):>5}")
+
+
+if __name__ == "__main__":
+    main()
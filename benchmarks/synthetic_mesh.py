@@ -0,0 +1,70 @@
+# benchmarks/synthetic_mesh.py
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+# Partición de Kuhn: 6 tets por cubo, conformes entre cubos vecinos
+_KUHN = np.array(
+    [
+        [0, 1, 3, 7],
+        [0, 1, 5, 7],
+        [0, 2, 3, 7],
+        [0, 2, 6, 7],
+        [0, 4, 5, 7],
+        [0, 4, 6, 7],
+    ],
+    dtype=np.int64,
+)
+
+
+def cube_tet_mesh(n_target: int, seed: int = 0) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Malla estructurada de tets en [0,1]^3 con ~n_target elementos.
+
+    Devuelve (nodes, geom) con el mismo contrato que compute_element_geometry_3d:
+      nodes: node_id,x,y,z
+      geom : elem_id,n0..n3,cx,cy,cz,volume,h_cbrtV
+    """
+    n = max(1, int(round((n_target / 6.0) ** (1.0 / 3.0))))
+    g = np.linspace(0.0, 1.0, n + 1)
+    X, Y, Z = np.meshgrid(g, g, g, indexing="ij")
+    xyz = np.column_stack([X.ravel(), Y.ravel(), Z.ravel()])
+
+    rng = np.random.default_rng(seed)
+    xyz += rng.uniform(-0.1, 0.1, size=xyz.shape) / n  # rompe la regularidad
+
+    ii, jj, kk = np.meshgrid(np.arange(n), np.arange(n), np.arange(n), indexing="ij")
+    base = (ii.ravel() * (n + 1) + jj.ravel()) * (n + 1) + kk.ravel()
+    offs = np.array(
+        [0, 1, n + 1, n + 2, (n + 1) ** 2, (n + 1) ** 2 + 1, (n + 1) ** 2 + n + 1, (n + 1) ** 2 + n + 2],
+        dtype=np.int64,
+    )
+    # orden de offs: bit0=z, bit1=y, bit2=x
+    corners = base[:, None] + offs[None, :]
+    conn = corners[:, _KUHN].reshape(-1, 4) + 1  # ids 1-based como Gmsh
+
+    p = xyz[conn - 1]
+    vol = np.abs(np.einsum("ij,ij->i", p[:, 1] - p[:, 0], np.cross(p[:, 2] - p[:, 0], p[:, 3] - p[:, 0]))) / 6.0
+    c = p.mean(axis=1)
+
+    nodes = pd.DataFrame(
+        {"node_id": np.arange(1, xyz.shape[0] + 1), "x": xyz[:, 0], "y": xyz[:, 1], "z": xyz[:, 2]}
+    )
+    geom = pd.DataFrame(
+        {
+            "elem_id": np.arange(1, conn.shape[0] + 1),
+            "n0": conn[:, 0], "n1": conn[:, 1], "n2": conn[:, 2], "n3": conn[:, 3],
+            "cx": c[:, 0], "cy": c[:, 1], "cz": c[:, 2],
+            "volume": vol,
+            "h_cbrtV": np.cbrt(vol),
+        }
+    )
+    return nodes, geom
+
+
+def hotspot_sigma(geom: pd.DataFrame, tip=(0.25, 0.5, 0.5), sigma0: float = 100.0, amp: float = 80.0, r0: float = 0.08) -> np.ndarray:
+    """Sigma sintético gaussiano (mismo modelo que make_dummy_sigma_vm_3d)."""
+    c = geom[["cx", "cy", "cz"]].to_numpy(dtype=float)
+    r = np.linalg.norm(c - np.asarray(tip, dtype=float)[None, :], axis=1)
+    return sigma0 + amp * np.exp(-(r / r0) ** 2)
@@ -1,13 +1,23 @@
 from __future__ import annotations
 
 import argparse
+import csv
+import glob
+import itertools
 import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Tuple
 
 import matplotlib.pyplot as plt
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src3d.paths3d import edge_lengths_parquet, geometry_parquet, node_coords_parquet
 
 
 def read_msh2_ascii(path: Path) -> Tuple[np.ndarray, Dict[int, np.ndarray]]:
@@ -36,19 +46,7 @@ def read_msh2_ascii(path: Path) -> Tuple[np.ndarray, Dict[int, np.ndarray]]:
     except StopIteration:
         raise ValueError(f"{path} missing $Nodes section.")
     n_nodes = int(lines[n_start + 1].strip())
-    node_block = lines[n_start + 2 : n_start + 2 + n_nodes]
-    node_ids = np.empty(n_nodes, dtype=np.int64)
-    nodes = np.empty((n_nodes, 3), dtype=np.float64)
-    for i, ln in enumerate(node_block):
-        parts = ln.strip().split()
-        node_ids[i] = int(parts[0])
-        nodes[i, 0] = float(parts[1])
-        nodes[i, 1] = float(parts[2])
-        nodes[i, 2] = float(parts[3])
-
-    max_id = int(node_ids.max())
-    id_to_idx = np.full(max_id + 1, -1, dtype=np.int64)
-    id_to_idx[node_ids] = np.arange(n_nodes, dtype=np.int64)
+    nodes, id_to_idx = _parse_nodes(lines[n_start + 2 : n_start + 2 + n_nodes], n_nodes)
 
     try:
         e_start = next(i for i, ln in enumerate(lines) if ln.strip() == "$Elements")
@@ -75,17 +73,107 @@ def read_msh2_ascii(path: Path) -> Tuple[np.ndarray, Dict[int, np.ndarray]]:
     for t, conn in elems.items():
         if conn.size == 0:
             continue
-        if conn.max() > max_id:
-            raise ValueError(f"{path}: element connectivity refers to node id > max node id.")
-        idx = id_to_idx[conn]
-        if (idx < 0).any():
-            bad = conn[idx < 0][0]
-            raise ValueError(f"{path}: element refers to missing node id {bad}.")
-        elems[t] = idx
+        elems[t] = _node_index(path, conn, id_to_idx)
 
     return nodes, elems
 
 
+def _parse_nodes(node_lines: Iterable[str], n_nodes: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Node block lines -> (coords (N,3), id_to_idx lookup from gmsh node id to row)."""
+    node_ids = np.empty(n_nodes, dtype=np.int64)
+    nodes = np.empty((n_nodes, 3), dtype=np.float64)
+    for i, ln in enumerate(node_lines):
+        parts = ln.strip().split()
+        node_ids[i] = int(parts[0])
+        nodes[i, 0] = float(parts[1])
+        nodes[i, 1] = float(parts[2])
+        nodes[i, 2] = float(parts[3])
+
+    max_id = int(node_ids.max())
+    id_to_idx = np.full(max_id + 1, -1, dtype=np.int64)
+    id_to_idx[node_ids] = np.arange(n_nodes, dtype=np.int64)
+    return nodes, id_to_idx
+
+
+def _node_index(path: Path, conn: np.ndarray, id_to_idx: np.ndarray) -> np.ndarray:
+    """1-based gmsh node ids -> 0-based rows of the node array (validated)."""
+    if conn.max() >= id_to_idx.size:
+        raise ValueError(f"{path}: element connectivity refers to node id > max node id.")
+    idx = id_to_idx[conn]
+    if (idx < 0).any():
+        bad = conn[idx < 0][0]
+        raise ValueError(f"{path}: element refers to missing node id {bad}.")
+    return idx
+
+
+class Msh2Stream:
+    """
+    One pass over an MSH2 ASCII file without loading its lines: nodes are read up
+    front (every element needs their coordinates), elements are then parsed in
+    chunks by tet_chunks(). Use as a context manager.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.elem_counts: Dict[int, int] = {}
+        self._fh = path.open("r", encoding="utf-8", errors="ignore")
+        try:
+            self._read_header_and_nodes()
+        except BaseException:
+            self._fh.close()
+            raise
+
+    def __enter__(self) -> "Msh2Stream":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._fh.close()
+
+    def _skip_to(self, section: str) -> None:
+        for ln in self._lines:
+            if ln.strip() == section:
+                return
+        raise ValueError(f"{self.path} missing {section} section.")
+
+    def _read_header_and_nodes(self) -> None:
+        head = [ln.strip() for ln in itertools.islice(self._fh, 10)]
+        if "$MeshFormat" not in head:
+            raise ValueError(f"{self.path} doesn't look like a .msh file (missing $MeshFormat).")
+        i = head.index("$MeshFormat")
+        fmt_line = head[i + 1].split()
+        if len(fmt_line) >= 2 and fmt_line[1] != "0":
+            raise ValueError(
+                f"{self.path} looks binary (MSH2 file_type={fmt_line[1]}). "
+                f"Re-export as ASCII:\n"
+                f"  gmsh {self.path} -save -format msh2 -bin 0 -o {self.path.with_suffix('.ascii.msh')}"
+            )
+        # The first 10 lines may already reach into $Nodes: replay them
+        self._lines = itertools.chain(head[i + 2 :], self._fh)
+        self._skip_to("$Nodes")
+        n_nodes = int(next(self._lines).strip())
+        self.nodes, self._id_to_idx = _parse_nodes(itertools.islice(self._lines, n_nodes), n_nodes)
+        self._skip_to("$Elements")
+        self.n_elems = int(next(self._lines).strip())
+
+    def tet_chunks(self, chunk_tets: int) -> Iterator[np.ndarray]:
+        """Tets (gmsh type 4) as 0-based node rows, up to chunk_tets per chunk; counts every element type on the way."""
+        buf: List[List[int]] = []
+        for ln in itertools.islice(self._lines, self.n_elems):
+            parts = ln.split()
+            if len(parts) < 4:
+                continue
+            elem_type = int(parts[1])
+            self.elem_counts[elem_type] = self.elem_counts.get(elem_type, 0) + 1
+            if elem_type != 4:
+                continue
+            buf.append([int(x) for x in parts[3 + int(parts[2]) :]])
+            if len(buf) == chunk_tets:
+                yield _node_index(self.path, np.array(buf, dtype=np.int64), self._id_to_idx)
+                buf = []
+        if buf:
+            yield _node_index(self.path, np.array(buf, dtype=np.int64), self._id_to_idx)
+
+
 def tetra_volume(a: np.ndarray, b: np.ndarray, c: np.ndarray, d: np.ndarray) -> np.ndarray:
     v = np.einsum("ij,ij->i", (b - a), np.cross((c - a), (d - a)))
     return np.abs(v) / 6.0
@@ -121,30 +209,237 @@ def tetra_mean_ratio_quality(pts: np.ndarray, tets: np.ndarray) -> np.ndarray:
     return np.clip(q, 0.0, 1.0)
 
 
-def unique_edge_lengths(pts: np.ndarray, tets: np.ndarray, max_edges: int = 2_000_000) -> np.ndarray:
-    edges = np.stack(
-        [
-            tets[:, [0, 1]],
-            tets[:, [0, 2]],
-            tets[:, [0, 3]],
-            tets[:, [1, 2]],
-            tets[:, [1, 3]],
-            tets[:, [2, 3]],
-        ],
-        axis=1,
-    ).reshape(-1, 2)
+# Local vertex pairs of the 6 tet edges
+_TET_EDGES = np.array([[0, 1], [0, 2], [0, 3], [1, 2], [1, 3], [2, 3]], dtype=np.int64)
+# Working bytes per tet in a chunk: 6 int64 keys x (min, max, key, sort buffer, dedup output)
+_BYTES_PER_TET = 6 * 8 * 5
+
+
+def edge_keys(tets: np.ndarray, n_nodes: int) -> np.ndarray:
+    """Encode each of the 6 edges per tet as one int64 key min*n_nodes + max (undirected, exact)."""
+    a = tets[:, _TET_EDGES[:, 0]].astype(np.int64)
+    b = tets[:, _TET_EDGES[:, 1]].astype(np.int64)
+    lo = np.minimum(a, b)
+    np.maximum(a, b, out=b)
+    del a
+    lo *= np.int64(n_nodes)
+    lo += b
+    return lo.ravel()
+
+
+def _sorted_unique(keys: np.ndarray) -> np.ndarray:
+    """
+    In-place 1-D dedup. Stable sort (timsort) exploits the runs left by spatially
+    ordered meshes and by concatenating already-sorted chunks: several times
+    faster than np.unique's quicksort here.
+    """
+    if keys.size == 0:
+        return keys
+    keys.sort(kind="stable")
+    keep = np.empty(keys.size, dtype=bool)
+    keep[0] = True
+    np.not_equal(keys[1:], keys[:-1], out=keep[1:])
+    return keys[keep]
+
+
+class EdgeKeyBuckets:
+    """
+    Exact unique edge keys accumulated chunk by chunk (add() may be called once per
+    mesh chunk while streaming). Each chunk of up to chunk_tets tets is deduplicated
+    with a 1-D sort and its keys are split into disjoint key-range buckets; buckets()
+    then deduplicates each bucket on its own, so no step ever sorts all 6*M raw
+    edge keys at once. Only unique keys are kept between chunks (~8 bytes per edge).
+    """
+
+    def __init__(self, n_nodes: int, n_tets: int, memory_mb: float = 512.0):
+        if n_nodes >= 2**31:
+            raise ValueError("edge keys need n_nodes < 2**31 (min*N + max must fit in int64)")
+        self.n_nodes = n_nodes
+        self.chunk_tets = max(1, int(memory_mb * 2**20) // _BYTES_PER_TET)
+        # ~1.2 unique edges per tet: enough buckets that one bucket fits the same budget
+        n_buckets = max(1, int(np.ceil(1.2 * n_tets * 8 * 3 / (memory_mb * 2**20))))
+        self._bounds = np.linspace(0, n_nodes * n_nodes, n_buckets + 1).astype(np.int64)[1:-1]
+        self._parts: list[list[np.ndarray]] = [[] for _ in range(n_buckets)]
+
+    def add(self, tets: np.ndarray) -> None:
+        for s in range(0, int(tets.shape[0]), self.chunk_tets):
+            keys = _sorted_unique(edge_keys(tets[s : s + self.chunk_tets], self.n_nodes))
+            for b, piece in enumerate(np.split(keys, np.searchsorted(keys, self._bounds))):
+                if piece.size:
+                    self._parts[b].append(piece)
+
+    def buckets(self) -> Iterator[np.ndarray]:
+        """Sorted unique keys, one disjoint key range at a time (concatenated: the full sorted set). Consumes the parts."""
+        for b, bucket in enumerate(self._parts):
+            self._parts[b] = []
+            if bucket:
+                yield bucket[0] if len(bucket) == 1 else _sorted_unique(np.concatenate(bucket))
+
+
+def unique_edge_keys(tets: np.ndarray, n_nodes: int, memory_mb: float = 512.0) -> list[np.ndarray]:
+    """Exact unique edge keys as sorted, disjoint key ranges (see EdgeKeyBuckets)."""
+    acc = EdgeKeyBuckets(n_nodes, int(tets.shape[0]), memory_mb)
+    acc.add(tets)
+    return list(acc.buckets())
+
+
+def edge_lengths_from_keys(pts: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    a, b = np.divmod(keys, np.int64(pts.shape[0]))
+    return np.linalg.norm(pts[a] - pts[b], axis=1)
+
+
+def unique_edge_lengths(pts: np.ndarray, tets: np.ndarray, memory_mb: float = 512.0) -> np.ndarray:
+    """Lengths of every unique edge (exact, deterministic; ordered by edge key)."""
+    lengths = [edge_lengths_from_keys(pts, keys) for keys in unique_edge_keys(tets, pts.shape[0], memory_mb)]
+    return np.concatenate(lengths) if lengths else np.empty(0)
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with relative accuracy (DDSketch-style log buckets).
+
+    A value x > 0 is counted in bucket i = ceil(log_gamma(x)), gamma = (1+alpha)/(1-alpha),
+    and quantiles are answered with the bucket's midpoint, so every quantile is
+    within a relative error alpha. Memory depends on the value range and alpha,
+    not on the number of values; sketches with the same alpha merge by adding
+    counts, so chunks or partitions can be sketched independently (in parallel)
+    and combined. Zeros get their own bucket; n, min, max and mean are exact.
+    """
+
+    def __init__(self, alpha: float = 0.005):
+        if not 0.0 < alpha < 1.0:
+            raise ValueError("alpha must be in (0, 1)")
+        self.alpha = alpha
+        self._gamma = (1.0 + alpha) / (1.0 - alpha)
+        self._log_gamma = np.log(self._gamma)
+        self.offset = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.zero_count = 0
+        self.n = 0
+        self.total = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def _add_counts(self, offset: int, counts: np.ndarray) -> None:
+        if self.counts.size == 0:
+            self.offset, self.counts = offset, counts.astype(np.int64)
+            return
+        lo = min(self.offset, offset)
+        hi = max(self.offset + self.counts.size, offset + counts.size)
+        if lo != self.offset or hi != self.offset + self.counts.size:
+            grown = np.zeros(hi - lo, dtype=np.int64)
+            grown[self.offset - lo : self.offset - lo + self.counts.size] = self.counts
+            self.offset, self.counts = lo, grown
+        self.counts[offset - lo : offset - lo + counts.size] += counts
+
+    def update(self, values: np.ndarray) -> "QuantileSketch":
+        x = np.asarray(values, dtype=np.float64).ravel()
+        if x.size == 0:
+            return self
+        if x.min() < 0.0:
+            raise ValueError("QuantileSketch only takes values >= 0")
+        pos = x[x > 0.0]
+        if pos.size:
+            idx = np.ceil(np.log(pos) / self._log_gamma).astype(np.int64)
+            lo = int(idx.min())
+            self._add_counts(lo, np.bincount(idx - lo))
+        self.zero_count += int(x.size - pos.size)
+        self.n += int(x.size)
+        self.total += float(x.sum())
+        self.min = min(self.min, float(x.min()))
+        self.max = max(self.max, float(x.max()))
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if other.alpha != self.alpha:
+            raise ValueError(f"cannot merge sketches with different alpha ({self.alpha} vs {other.alpha})")
+        if other.counts.size:
+            self._add_counts(other.offset, other.counts)
+        self.zero_count += other.zero_count
+        self.n += other.n
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.n if self.n else float("nan")
+
+    def quantile(self, q: float) -> float:
+        if self.n == 0:
+            raise ValueError("quantile of an empty sketch")
+        rank = q * (self.n - 1)
+        if rank < self.zero_count:
+            return 0.0
+        cum = np.cumsum(self.counts) + self.zero_count
+        i = min(int(np.searchsorted(cum, rank, side="right")), self.counts.size - 1)
+        value = 2.0 * self._gamma ** (self.offset + i) / (self._gamma + 1.0)
+        return float(np.clip(value, self.min, self.max))
+
+
+class FixedHistogram:
+    """
+    Counts on fixed bin edges: histograms of chunks, partitions or different meshes
+    add up (mergeable) and overlay directly. Values outside the edges go to the
+    first/last bin.
+    """
+
+    def __init__(self, edges: np.ndarray):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.counts = np.zeros(self.edges.size - 1, dtype=np.int64)
+
+    @classmethod
+    def linear(cls, lo: float, hi: float, bins: int) -> "FixedHistogram":
+        return cls(np.linspace(lo, hi, bins + 1))
+
+    @classmethod
+    def log(cls, lo: float, hi: float, bins_per_decade: int) -> "FixedHistogram":
+        n = int(round(np.log10(hi / lo) * bins_per_decade))
+        return cls(np.logspace(np.log10(lo), np.log10(hi), n + 1))
+
+    def update(self, values: np.ndarray) -> "FixedHistogram":
+        idx = np.searchsorted(self.edges, np.asarray(values, dtype=np.float64).ravel(), side="right") - 1
+        np.clip(idx, 0, self.counts.size - 1, out=idx)
+        self.counts += np.bincount(idx, minlength=self.counts.size)
+        return self
+
+    def merge(self, other: "FixedHistogram") -> "FixedHistogram":
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("cannot merge histograms with different bin edges")
+        self.counts += other.counts
+        return self
 
-    edges = np.sort(edges, axis=1)
 
-    if edges.shape[0] > max_edges:
-        idx = np.random.choice(edges.shape[0], size=max_edges, replace=False)
-        edges = edges[idx]
+def quality_histogram() -> FixedHistogram:
+    return FixedHistogram.linear(0.0, 1.0, 40)
 
-    edges = np.unique(edges, axis=0)
 
-    p_a = pts[edges[:, 0]]
-    p_b = pts[edges[:, 1]]
-    return np.linalg.norm(p_a - p_b, axis=1)
+def edge_length_histogram() -> FixedHistogram:
+    # Unit-agnostic log grid (1e-9..1e9, ~2.3% wide bins): the same edges for every mesh
+    return FixedHistogram.log(1e-9, 1e9, 100)
+
+
+@dataclass
+class MeshDistributions:
+    """What the plots need, without per-element arrays: small, picklable and mergeable."""
+
+    quality_hist: FixedHistogram
+    quality_sketch: QuantileSketch
+    edge_hist: FixedHistogram
+    edge_sketch: QuantileSketch
+
+    @classmethod
+    def empty(cls, alpha: float = 0.005) -> "MeshDistributions":
+        return cls(quality_histogram(), QuantileSketch(alpha), edge_length_histogram(), QuantileSketch(alpha))
+
+    def update_quality(self, q: np.ndarray) -> None:
+        self.quality_hist.update(q)
+        self.quality_sketch.update(q)
+
+    def update_edges(self, lengths: np.ndarray) -> None:
+        self.edge_hist.update(lengths)
+        self.edge_sketch.update(lengths)
 
 
 @dataclass
@@ -157,107 +452,400 @@ class MeshStats:
     bbox_max: List[float]
     tet_quality: Dict[str, float] | None
     edge_lengths: Dict[str, float] | None
+    stats_mode: str = "exact"  # "streaming": quantiles from sketches, within sketch_alpha relative error
+    sketch_alpha: float | None = None
+    compute_s: float | None = None  # wall time of compute_stats for this mesh
+    source: str = "msh"  # "parquet": from the case's geometry/edge Parquets (elem counts are tets only)
 
 
-def compute_stats(path: Path) -> Tuple[MeshStats, Dict[str, np.ndarray]]:
-    pts, elems = read_msh2_ascii(path)
+QUALITY_KEYS = ("min", "p01", "p05", "median", "mean", "p95", "p99")
+EDGE_KEYS = ("n", "min", "p05", "median", "mean", "p95", "max")
 
-    elem_counts: Dict[str, int] = {}
-    total_elems = 0
-    for etype, conn in elems.items():
-        total_elems += int(conn.shape[0])
-        elem_counts[f"type_{etype}"] = int(conn.shape[0])
 
-    bbox_min = pts.min(axis=0).tolist()
-    bbox_max = pts.max(axis=0).tolist()
+def _summary(keys: Iterable[str], n: int, vmin: float, vmax: float, mean: float, quantile) -> Dict[str, float]:
+    fixed = {"n": int(n), "min": float(vmin), "max": float(vmax), "mean": float(mean)}
+    return {k: fixed[k] if k in fixed else float(quantile(0.5 if k == "median" else int(k[1:]) / 100)) for k in keys}
+
+
+def _exact_summary(keys: Iterable[str], values: np.ndarray) -> Dict[str, float]:
+    return _summary(keys, values.size, values.min(), values.max(), values.mean(), lambda p: np.quantile(values, p))
+
+
+def _sketch_summary(keys: Iterable[str], sketch: QuantileSketch) -> Dict[str, float] | None:
+    if sketch.n == 0:
+        return None
+    return _summary(keys, sketch.n, sketch.min, sketch.max, sketch.mean, sketch.quantile)
+
+
+def compute_stats(
+    path: Path, edge_memory_mb: float = 512.0, streaming: bool = False, sketch_alpha: float = 0.005
+) -> Tuple[MeshStats, MeshDistributions]:
+    """
+    Exact mode parses the whole mesh and summarizes full quality / edge-length arrays.
+    Streaming mode (bounded memory) parses it in chunks and summarizes sketches;
+    both return the same fixed-bin histograms for the plots.
+    """
+    if streaming:
+        return _compute_stats_streaming(path, edge_memory_mb, sketch_alpha)
+
+    pts, elems = read_msh2_ascii(path)
+    dists = MeshDistributions.empty(sketch_alpha)
+    elem_counts = {f"type_{etype}": int(conn.shape[0]) for etype, conn in elems.items()}
 
     tet_quality_summary = None
     edge_len_summary = None
-    arrays_out: Dict[str, np.ndarray] = {"points": pts}
-
     if 4 in elems and elems[4].shape[0] > 0:
         tets = elems[4]
         q = tetra_mean_ratio_quality(pts, tets)
-        arrays_out["tet_quality"] = q
-        arrays_out["tets"] = tets
-
-        tet_quality_summary = {
-            "min": float(q.min()),
-            "p01": float(np.quantile(q, 0.01)),
-            "p05": float(np.quantile(q, 0.05)),
-            "median": float(np.quantile(q, 0.50)),
-            "mean": float(q.mean()),
-            "p95": float(np.quantile(q, 0.95)),
-            "p99": float(np.quantile(q, 0.99)),
-        }
+        dists.update_quality(q)
+        tet_quality_summary = _exact_summary(QUALITY_KEYS, q)
 
-        edge_lengths = unique_edge_lengths(pts, tets)
-        arrays_out["edge_lengths"] = edge_lengths
-        edge_len_summary = {
-            "min": float(edge_lengths.min()),
-            "p05": float(np.quantile(edge_lengths, 0.05)),
-            "median": float(np.quantile(edge_lengths, 0.50)),
-            "mean": float(edge_lengths.mean()),
-            "p95": float(np.quantile(edge_lengths, 0.95)),
-            "max": float(edge_lengths.max()),
-        }
+        edge_lengths = unique_edge_lengths(pts, tets, memory_mb=edge_memory_mb)
+        dists.update_edges(edge_lengths)
+        edge_len_summary = _exact_summary(EDGE_KEYS, edge_lengths)
 
     stats = MeshStats(
         path=str(path),
         n_nodes=int(pts.shape[0]),
-        n_elems=int(total_elems),
+        n_elems=int(sum(elem_counts.values())),
         elem_counts=elem_counts,
-        bbox_min=bbox_min,
-        bbox_max=bbox_max,
+        bbox_min=pts.min(axis=0).tolist(),
+        bbox_max=pts.max(axis=0).tolist(),
         tet_quality=tet_quality_summary,
         edge_lengths=edge_len_summary,
     )
-    return stats, arrays_out
+    return stats, dists
+
+
+def _compute_stats_streaming(path: Path, edge_memory_mb: float, sketch_alpha: float) -> Tuple[MeshStats, MeshDistributions]:
+    """
+    Memory: node coordinates + one chunk of tets + the unique edge keys (8 bytes per
+    edge, needed to count each edge once); quality and lengths never exist as full arrays.
+    """
+    dists = MeshDistributions.empty(sketch_alpha)
+    with Msh2Stream(path) as mesh:
+        pts = mesh.nodes
+        edges = EdgeKeyBuckets(pts.shape[0], mesh.n_elems, edge_memory_mb)
+        for tets in mesh.tet_chunks(edges.chunk_tets):
+            dists.update_quality(tetra_mean_ratio_quality(pts, tets))
+            edges.add(tets)
+        elem_counts = {f"type_{etype}": n for etype, n in mesh.elem_counts.items()}
+    for keys in edges.buckets():
+        dists.update_edges(edge_lengths_from_keys(pts, keys))
+
+    stats = MeshStats(
+        path=str(path),
+        n_nodes=int(pts.shape[0]),
+        n_elems=int(sum(elem_counts.values())),
+        elem_counts=elem_counts,
+        bbox_min=pts.min(axis=0).tolist(),
+        bbox_max=pts.max(axis=0).tolist(),
+        tet_quality=_sketch_summary(QUALITY_KEYS, dists.quality_sketch),
+        edge_lengths=_sketch_summary(EDGE_KEYS, dists.edge_sketch),
+        stats_mode="streaming",
+        sketch_alpha=sketch_alpha,
+    )
+    return stats, dists
+
+
+# compare_meshes mean-ratio = 12 * 3^(2/3) * element_geometry "quality" (V^(2/3) / sum e^2)
+_PARQUET_QUALITY_SCALE = 12.0 * 3.0 ** (2.0 / 3.0)
+# (label, geometry tag, mesh file) of the two meshes of a case
+CASE_MESHES = (("coarse", "", "coarse_3d.msh"), ("adapt", "adapt", "adapt_3d.msh"))
+
+
+def _fresh(path: Path, *deps: Path) -> bool:
+    """path exists and is not older than any of the deps that exist."""
+    if not path.exists():
+        return False
+    mtime = path.stat().st_mtime
+    return all(mtime >= d.stat().st_mtime for d in deps if d.exists())
+
+
+def _column_chunks(path: Path, column: str, streaming: bool, batch_rows: int = 1_000_000) -> Iterator[np.ndarray]:
+    """One Parquet column: whole (exact mode) or in record batches (streaming)."""
+    if not streaming:
+        yield pq.read_table(path, columns=[column]).column(0).to_numpy()
+        return
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_rows, columns=[column]):
+        yield batch.column(0).to_numpy()
+
+
+def _xyz_bounds(nodes_path: Path) -> Tuple[List[float], List[float]]:
+    """Bounding box from the row-group statistics (no data read), or from the x/y/z columns."""
+    meta = pq.ParquetFile(nodes_path).metadata
+    names = meta.schema.names
+    lo, hi = [], []
+    for col in ("x", "y", "z"):
+        j = names.index(col)
+        stats = [meta.row_group(i).column(j).statistics for i in range(meta.num_row_groups)]
+        if not stats or not all(st is not None and st.has_min_max for st in stats):
+            xyz = pq.read_table(nodes_path, columns=["x", "y", "z"])
+            return (
+                [float(np.min(xyz.column(c).to_numpy())) for c in range(3)],
+                [float(np.max(xyz.column(c).to_numpy())) for c in range(3)],
+            )
+        lo.append(float(min(st.min for st in stats)) + 0.0)  # + 0.0: no "-0" from the stats
+        hi.append(float(max(st.max for st in stats)) + 0.0)
+    return lo, hi
+
+
+def build_edge_table(geom_path: Path, nodes_path: Path, out: Path, memory_mb: float = 512.0) -> int:
+    """
+    Unique edge lengths of the tets in geom_path (n0..n3 + node_coords) -> out
+    (column "length", ordered by edge key). Connectivity is read in record batches
+    and lengths are written bucket by bucket (EdgeKeyBuckets), so memory stays bounded.
+    """
+    nodes = pq.read_table(nodes_path, columns=["node_id", "x", "y", "z"])
+    node_ids = nodes.column("node_id").to_numpy().astype(np.int64)
+    pts = np.column_stack([nodes.column(c).to_numpy() for c in ("x", "y", "z")]).astype(np.float64)
+    id_to_idx = np.full(int(node_ids.max()) + 1, -1, dtype=np.int64)
+    id_to_idx[node_ids] = np.arange(node_ids.size, dtype=np.int64)
+
+    geom = pq.ParquetFile(geom_path)
+    acc = EdgeKeyBuckets(pts.shape[0], geom.metadata.num_rows, memory_mb)
+    for batch in geom.iter_batches(batch_size=acc.chunk_tets, columns=["n0", "n1", "n2", "n3"]):
+        conn = np.column_stack([batch.column(k).to_numpy() for k in range(4)]).astype(np.int64)
+        acc.add(_node_index(geom_path, conn, id_to_idx))
+
+    tmp = out.with_suffix(".tmp.parquet")
+    n = 0
+    with pq.ParquetWriter(tmp, pa.schema([("length", pa.float64())])) as writer:
+        for keys in acc.buckets():
+            writer.write_table(pa.table({"length": edge_lengths_from_keys(pts, keys)}))
+            n += keys.size
+    os.replace(tmp, out)
+    return n
+
+
+def compute_stats_from_case(
+    case: str,
+    tag: str,
+    msh: Path,
+    runs_dir: Path | str = "runs",
+    edge_memory_mb: float = 512.0,
+    streaming: bool = False,
+    sketch_alpha: float = 0.005,
+) -> Tuple[MeshStats, MeshDistributions]:
+    """
+    Stats of one mesh of a case from the Parquets the pipeline already wrote:
+    quality from element_geometry_3d[_tag] (one column), bbox from node_coords
+    statistics and edge lengths from the cached edge table (built once from
+    n0..n3 + node coords). Parses `msh` only when a geometry Parquet is missing
+    or older than the mesh.
+    """
+    geom = geometry_parquet(case, tag, runs_dir)
+    nodes = node_coords_parquet(case, tag, runs_dir)
+    if not (_fresh(geom, msh) and _fresh(nodes, msh)):
+        print(f"Info: {case}: {geom.name}/{nodes.name} missing or older than {msh.name}; parsing the mesh")
+        return compute_stats(msh, edge_memory_mb, streaming, sketch_alpha)
+
+    edges = edge_lengths_parquet(case, tag, runs_dir)
+    if not _fresh(edges, geom, nodes):
+        t0 = time.perf_counter()
+        n_edges = build_edge_table(geom, nodes, edges, edge_memory_mb)
+        print(f"Info: {case}: edge table with {n_edges} edges cached in {edges} ({time.perf_counter() - t0:.2f} s)")
+
+    dists = MeshDistributions.empty(sketch_alpha)
+    summaries = []
+    for path, column, scale, update, sketch, keys in (
+        (geom, "quality", _PARQUET_QUALITY_SCALE, dists.update_quality, dists.quality_sketch, QUALITY_KEYS),
+        (edges, "length", 1.0, dists.update_edges, dists.edge_sketch, EDGE_KEYS),
+    ):
+        kept = []
+        for values in _column_chunks(path, column, streaming):
+            values = np.clip(scale * values, 0.0, 1.0) if column == "quality" else values
+            update(values)
+            if not streaming:
+                kept.append(values)
+        if streaming:
+            summaries.append(_sketch_summary(keys, sketch))
+        else:
+            values = np.concatenate(kept) if kept else np.empty(0)
+            summaries.append(_exact_summary(keys, values) if values.size else None)
+
+    n_tets = pq.ParquetFile(geom).metadata.num_rows
+    bbox_min, bbox_max = _xyz_bounds(nodes)
+    stats = MeshStats(
+        path=str(geom),
+        n_nodes=int(pq.ParquetFile(nodes).metadata.num_rows),
+        n_elems=int(n_tets),
+        elem_counts={"type_4": int(n_tets)},
+        bbox_min=bbox_min,
+        bbox_max=bbox_max,
+        tet_quality=summaries[0],
+        edge_lengths=summaries[1],
+        stats_mode="streaming" if streaming else "exact",
+        sketch_alpha=sketch_alpha if streaming else None,
+        source="parquet",
+    )
+    return stats, dists
 
 
-def save_histograms(
-    outdir: Path,
-    coarse_name: str,
-    adapt_name: str,
-    qc: np.ndarray | None,
-    qa: np.ndarray | None,
-    lc: np.ndarray | None,
-    la: np.ndarray | None,
+def _plot_hist(
+    hist: FixedHistogram,
+    label: str,
+    lo: float | None = None,
+    hi: float | None = None,
+    max_bins: int = 60,
+    step: bool = False,
 ) -> None:
+    """
+    Histogram from fixed-bin counts, optionally restricted to the bins overlapping
+    [lo, hi]; consecutive bins are grouped so at most ~max_bins are drawn.
+    """
+    i0, i1 = 0, hist.counts.size
+    if lo is not None and hi is not None:
+        i0 = max(int(np.searchsorted(hist.edges, lo, side="right")) - 1, 0)
+        i1 = max(int(np.searchsorted(hist.edges, hi, side="left")), i0 + 1)
+    edges, counts = hist.edges[i0 : i1 + 1], hist.counts[i0:i1]
+    if counts.sum() == 0:
+        return
+    group = int(np.ceil(counts.size / max_bins))
+    if group > 1:
+        starts = np.arange(0, counts.size, group)
+        counts = np.add.reduceat(counts, starts)
+        edges = np.append(edges[starts], edges[-1])
+    if step:
+        plt.hist(edges[:-1], bins=edges, weights=counts, histtype="step", linewidth=1.2, label=label, density=True)
+    else:
+        plt.hist(edges[:-1], bins=edges, weights=counts, alpha=0.6, label=label, density=True)
+
+
+def save_histograms(outdir: Path, named: List[Tuple[str, MeshDistributions]]) -> None:
+    """Overlaid quality / edge-length histograms of every mesh (filled for two meshes, outlines for more)."""
     outdir.mkdir(parents=True, exist_ok=True)
+    step = len(named) > 2
 
-    if qc is not None and qa is not None:
+    if all(d.quality_sketch.n for _, d in named):
         plt.figure()
-        bins = np.linspace(0.0, 1.0, 41)
-        plt.hist(qc, bins=bins, alpha=0.6, label=coarse_name, density=True)
-        plt.hist(qa, bins=bins, alpha=0.6, label=adapt_name, density=True)
+        for label, d in named:
+            _plot_hist(d.quality_hist, label, step=step)
         plt.xlabel("Tetra quality (mean-ratio, 0..1)")
         plt.ylabel("Density")
-        plt.legend()
+        plt.legend(fontsize="small" if step else None)
         plt.tight_layout()
         plt.savefig(outdir / "quality_hist.png", dpi=200)
         plt.close()
 
-    if lc is not None and la is not None:
+    if all(d.edge_sketch.n for _, d in named):
         plt.figure()
-        l_all = np.concatenate([lc, la])
-        lo = np.quantile(l_all, 0.001)
-        hi = np.quantile(l_all, 0.999)
+        both = QuantileSketch(named[0][1].edge_sketch.alpha)
+        for _, d in named:
+            both.merge(d.edge_sketch)
+        lo = both.quantile(0.001)
+        hi = both.quantile(0.999)
         if hi <= lo:
-            lo = float(l_all.min())
-            hi = float(l_all.max())
-        bins = np.linspace(lo, hi, 60)
+            lo = both.min
+            hi = both.max
 
-        plt.hist(lc, bins=bins, alpha=0.6, label=coarse_name, density=True)
-        plt.hist(la, bins=bins, alpha=0.6, label=adapt_name, density=True)
+        for label, d in named:
+            _plot_hist(d.edge_hist, label, lo, hi, step=step)
         plt.xlabel("Unique edge length")
         plt.ylabel("Density")
-        plt.legend()
+        plt.legend(fontsize="small" if step else None)
         plt.tight_layout()
         plt.savefig(outdir / "edge_length_hist.png", dpi=200)
         plt.close()
 
 
+def _stats_job(task: Tuple[str, str, str, str, float, bool, float]) -> Tuple[MeshStats, MeshDistributions]:
+    path, case, tag, runs_dir, edge_memory_mb, streaming, sketch_alpha = task
+    t0 = time.perf_counter()
+    if case:
+        stats, dists = compute_stats_from_case(case, tag, Path(path), runs_dir, edge_memory_mb, streaming, sketch_alpha)
+    else:
+        stats, dists = compute_stats(Path(path), edge_memory_mb, streaming, sketch_alpha)
+    stats.compute_s = time.perf_counter() - t0
+    return stats, dists
+
+
+def compute_stats_many(
+    paths: List[Path],
+    edge_memory_mb: float = 512.0,
+    streaming: bool = False,
+    sketch_alpha: float = 0.005,
+    workers: int = 0,
+    case: str = "",
+    tags: List[str] | None = None,
+    runs_dir: Path | str = "runs",
+) -> List[Tuple[MeshStats, MeshDistributions]]:
+    """
+    compute_stats for every mesh in a process pool (results in input order).
+    Only MeshStats and the small MeshDistributions travel back from the workers.
+    With `case`, each path is that case's mesh for the matching geometry tag and
+    stats come from its Parquets (compute_stats_from_case).
+    """
+    tags = tags or [""] * len(paths)
+    tasks = [(str(p), case, tag, str(runs_dir), edge_memory_mb, streaming, sketch_alpha) for p, tag in zip(paths, tags)]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        return [_stats_job(t) for t in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_stats_job, tasks))
+
+
+def expand_mesh_args(patterns: List[str]) -> List[Path]:
+    """Paths and/or glob patterns -> mesh paths (globs sorted, duplicates dropped, order kept)."""
+    paths: List[Path] = []
+    for pat in patterns:
+        if any(c in pat for c in "*?["):
+            hits = sorted(glob.glob(pat, recursive=True))
+            if not hits:
+                raise ValueError(f"No mesh matches {pat!r}")
+            paths.extend(Path(h) for h in hits)
+        else:
+            paths.append(Path(pat))
+    return list(dict.fromkeys(paths))
+
+
+def mesh_labels(paths: List[Path]) -> List[str]:
+    """Short unique labels: file stem, else <case>/<stem> (runs/<case>/gmsh/<stem>.msh), else the full path."""
+    for make in (lambda p: p.stem, lambda p: f"{p.parent.parent.name}/{p.stem}"):
+        labels = [make(p) for p in paths]
+        if len(set(labels)) == len(labels):
+            return labels
+    return [str(p) for p in paths]
+
+
+def summary_rows(named: List[Tuple[str, MeshStats]]) -> List[Dict[str, object]]:
+    """One flat row per mesh (summary.csv)."""
+    rows = []
+    for label, st in named:
+        row: Dict[str, object] = {
+            "label": label,
+            "path": st.path,
+            "stats_mode": st.stats_mode,
+            "source": st.source,
+            "compute_s": st.compute_s,
+            "n_nodes": st.n_nodes,
+            "n_elems": st.n_elems,
+            "n_tets": st.elem_counts.get("type_4", 0),
+        }
+        for k in QUALITY_KEYS:
+            row[f"quality_{k}"] = st.tet_quality[k] if st.tet_quality else None
+        for k in EDGE_KEYS:
+            row[f"edge_{k}"] = st.edge_lengths[k] if st.edge_lengths else None
+        rows.append(row)
+    return rows
+
+
+def print_table(named: List[Tuple[str, MeshStats]]) -> None:
+    def fmt(x) -> str:
+        return "-" if x is None else f"{x:.4g}"
+
+    width = max(8, *(len(label) for label, _ in named))
+    print(f"\n{'mesh':<{width}} {'nodes':>10} {'tets':>10} {'q_min':>8} {'q_p05':>8} {'q_med':>8} {'len_med':>10} {'time_s':>8}")
+    for row in summary_rows(named):
+        print(
+            f"{row['label']:<{width}} {row['n_nodes']:>10} {row['n_tets']:>10} {fmt(row['quality_min']):>8} "
+            f"{fmt(row['quality_p05']):>8} {fmt(row['quality_median']):>8} {fmt(row['edge_median']):>10} {fmt(row['compute_s']):>8}"
+        )
+    if named and named[0][1].stats_mode == "streaming":
+        print(f"(streaming stats: quantiles within {named[0][1].sketch_alpha:.2%} relative error)")
+    print()
+
+
 def print_report(coarse: MeshStats, adapt: MeshStats) -> None:
     def fmt(x: float) -> str:
         return f"{x:.6g}"
@@ -268,6 +856,8 @@ def print_report(coarse: MeshStats, adapt: MeshStats) -> None:
 
     print(f"Coarse: {coarse.path}")
     print(f"Adapt : {adapt.path}\n")
+    if coarse.stats_mode == "streaming":
+        print(f"(streaming stats: quantiles within {coarse.sketch_alpha:.2%} relative error)\n")
 
     print("Counts:")
     print(f"  Nodes      : {coarse.n_nodes}  ->  {adapt.n_nodes}   (x{adapt.n_nodes/max(coarse.n_nodes,1):.2f})")
@@ -296,40 +886,83 @@ def print_report(coarse: MeshStats, adapt: MeshStats) -> None:
 
 def main() -> None:
     ap = argparse.ArgumentParser()
-    ap.add_argument("--coarse", required=True, help="Path to coarse_3d.msh (MSH2 ASCII recommended)")
-    ap.add_argument("--adapt", required=True, help="Path to adapt_3d.msh (MSH2 ASCII recommended)")
+    ap.add_argument("--coarse", help="Path to coarse_3d.msh (MSH2 ASCII recommended)")
+    ap.add_argument("--adapt", help="Path to adapt_3d.msh (MSH2 ASCII recommended)")
+    ap.add_argument(
+        "--meshes",
+        nargs="+",
+        default=[],
+        help="Any number of meshes and/or globs (e.g. 'runs/*/gmsh/adapt_3d.msh'), instead of --coarse/--adapt",
+    )
+    ap.add_argument(
+        "--case",
+        help="Compare coarse vs adapt of a pipeline case from its geometry Parquets + cached edge table "
+        "(parses the .msh only when those are missing or stale)",
+    )
+    ap.add_argument("--runs-dir", default="runs", help="Runs folder of --case")
     ap.add_argument("--outdir", default="mesh_compare_out", help="Output folder for plots + json")
+    ap.add_argument("--workers", type=int, default=0, help="Processes computing mesh stats in parallel (0 = number of CPUs)")
+    ap.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Bounded memory: parse meshes in chunks and summarize with mergeable quantile sketches "
+        "(quantiles within --sketch-alpha relative error; min/max/mean stay exact)",
+    )
+    ap.add_argument("--sketch-alpha", type=float, default=0.005, help="Relative accuracy of the streaming quantiles")
+    ap.add_argument(
+        "--edge-memory-mb",
+        type=float,
+        default=512.0,
+        help="Working-memory budget for the exact unique-edge pass (tets are processed in chunks)",
+    )
     args = ap.parse_args()
 
-    coarse_path = Path(args.coarse)
-    adapt_path = Path(args.adapt)
+    tags = None
+    if sum(bool(x) for x in (args.meshes, args.case, args.coarse or args.adapt)) > 1:
+        ap.error("use only one of --meshes, --case or --coarse/--adapt")
+    if args.meshes:
+        paths = expand_mesh_args(args.meshes)
+        labels = mesh_labels(paths)
+    elif args.case:
+        gmsh_dir = Path(args.runs_dir) / args.case / "gmsh"
+        if not gmsh_dir.is_dir():
+            ap.error(f"case folder not found: {gmsh_dir}")
+        labels = [label for label, _, _ in CASE_MESHES]
+        tags = [tag for _, tag, _ in CASE_MESHES]
+        paths = [gmsh_dir / name for _, _, name in CASE_MESHES]
+    elif args.coarse and args.adapt:
+        paths = [Path(args.coarse), Path(args.adapt)]
+        labels = ["coarse", "adapt"]
+    else:
+        ap.error("--coarse and --adapt (or --meshes / --case) are required")
     outdir = Path(args.outdir)
 
-    coarse_stats, coarse_arrays = compute_stats(coarse_path)
-    adapt_stats, adapt_arrays = compute_stats(adapt_path)
+    t0 = time.perf_counter()
+    results = compute_stats_many(
+        paths, args.edge_memory_mb, args.streaming, args.sketch_alpha, args.workers, args.case or "", tags, args.runs_dir
+    )
+    wall = time.perf_counter() - t0
+    named_stats = [(label, st) for label, (st, _) in zip(labels, results)]
 
-    print_report(coarse_stats, adapt_stats)
+    if args.meshes:
+        print_table(named_stats)
+    else:
+        print_report(named_stats[0][1], named_stats[1][1])
+    busy = sum(st.compute_s or 0.0 for _, st in named_stats)
+    print(f"Stats of {len(paths)} meshes in {wall:.2f} s ({busy:.2f} s of per-mesh compute)\n")
 
     outdir.mkdir(parents=True, exist_ok=True)
     with (outdir / "summary.json").open("w", encoding="utf-8") as f:
-        json.dump({"coarse": coarse_stats.__dict__, "adapt": adapt_stats.__dict__}, f, indent=2)
-
-    qc = coarse_arrays.get("tet_quality", None)
-    qa = adapt_arrays.get("tet_quality", None)
-    lc = coarse_arrays.get("edge_lengths", None)
-    la = adapt_arrays.get("edge_lengths", None)
-
-    save_histograms(
-        outdir=outdir,
-        coarse_name="coarse",
-        adapt_name="adapt",
-        qc=qc,
-        qa=qa,
-        lc=lc,
-        la=la,
-    )
+        json.dump({label: st.__dict__ for label, st in named_stats}, f, indent=2)
+    rows = summary_rows(named_stats)
+    with (outdir / "summary.csv").open("w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    save_histograms(outdir, [(label, dists) for label, (_, dists) in zip(labels, results)])
 
-    print(f"Saved:\n  {outdir / 'summary.json'}")
+    print(f"Saved:\n  {outdir / 'summary.json'}\n  {outdir / 'summary.csv'}")
     if (outdir / "quality_hist.png").exists():
         print(f"  {outdir / 'quality_hist.png'}")
     if (outdir / "edge_length_hist.png").exists():
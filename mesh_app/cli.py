@@ -24,6 +24,11 @@ def build_parser() -> argparse.ArgumentParser:
     run.add_argument("--case", required=True, help="Nombre del caso (runs/<case>)")
     run.add_argument("--sigma-mode", default="auto", choices=["auto", "dummy", "fem"], help="Fuente de sigma: auto (usa FEM si está disponible, si no dummy), dummy o fem")
     run.add_argument("--gmsh-exe", default="gmsh")
+    run.add_argument("--gmsh-backend", default="cli", choices=["cli", "api"], help="cli: ejecutable gmsh + .geo/.pos temporales | api: módulo Python gmsh en proceso (malla como arreglos, campo de fondo en memoria)")
+    run.add_argument("--mesh-profile", default=None, choices=["fast", "balanced", "quality"], help="Perfil de mallado 3D para coarse y adapt: quality (Algorithm3D 4 + Netgen, 1 hilo), balanced (HXT multihilo + Optimize) o fast (HXT multihilo sin optimización). Sin perfil: ajustes históricos")
+    run.add_argument("--mesh-threads", type=int, default=0, help="Hilos Gmsh (General.NumThreads/Mesh.MaxNumThreads3D); 0 = todas las CPUs en fast/balanced, 1 en quality")
+    run.add_argument("--mesh-cache-dir", type=Path, default=None, help="Cache global de mallas coarse (clave: hash del .geo + Merge/Include, versión de Gmsh y opciones de mallado); los casos reciben hardlinks del .msh y su geometría")
+    run.add_argument("--mesh-cache-max-gb", type=float, default=5.0, help="Tamaño máximo del cache de mallas; desaloja por LRU")
     run.add_argument("--python-exe", default="python")
     run.add_argument("--runs-dir", type=Path, default=Path("runs"))
     run.add_argument("--tipx", type=float, default=0.25)
@@ -37,8 +42,28 @@ def build_parser() -> argparse.ArgumentParser:
     run.add_argument("--fem-ccx-job", default="job")
     run.add_argument("--fem-ccx-workdir-coarse", type=Path, default=None)
     run.add_argument("--fem-ccx-workdir-ref", type=Path, default=None)
+    run.add_argument("--fem-ccx-threads", type=int, default=0, help="Cores para los jobs ccx (0 = todos); se fijan OMP_NUM_THREADS y CCX_NPROC_EQUATION_SOLVER por job")
+    run.add_argument("--fem-ccx-policy", default="even", choices=["even", "weighted", "sequential"], help="Con --fem-ccx-run: coarse y ref corren a la vez repartiendo los cores en partes iguales (even) o según el tamaño de malla (weighted); sequential corre uno tras otro con todos los cores")
     run.add_argument("--fem-cgx-exe", default="cgx")
     run.add_argument("--fem-cgx-run", action=argparse.BooleanOptionalAction, default=True)
+    run.add_argument("--fem-cache-dir", type=Path, default=None, help="Cache persistente de resultados FEM (clave: hash de job.inp con su malla incluida, ejecutable de ccx y extractor); un acierto entrega sigma_vm sin correr ccx")
+    run.add_argument("--fem-cache-max-gb", type=float, default=5.0, help="Tamaño máximo del cache FEM; desaloja por LRU")
+    run.add_argument("--fem-ref-mesh", type=Path, default=None, help="Malla de referencia ya resuelta (.msh v2 o .inp, p.ej. más fina); con --fem-ref-sigma, sigma ref se interpola en los centroides en vez de resolverse")
+    run.add_argument("--fem-ref-sigma", type=Path, default=None, help="sigma_vm de --fem-ref-mesh: .frd (nodal) o .csv/.parquet con node_id|elem_id,sigma_vm")
+    run.add_argument("--fem-ref-surrogate-max-err", type=float, default=None, help="Usa el surrogate de sigma ref (src3d.train_sigma_ref_surrogate_3d, entrenado con el corpus de runs-dir) en vez del solve ref si su error de validación es <= este valor")
+    run.add_argument("--fem-ref-submodel-quantile", type=float, default=None, help="Con --fem-ccx-run: resuelve ref solo en los elementos con sigma coarse >= este cuantil (más buffer), con desplazamientos del FRD coarse en el borde de corte; el resto toma sigma coarse")
+    run.add_argument("--fem-ref-submodel-layers", type=int, default=2, help="Capas de vecinos de buffer alrededor de la región del submodelo")
+    run.add_argument("--fem-sigma-extractor", default="frd", choices=["frd", "cgx"], help="Cómo obtener sigma_vm.csv desde los resultados de ccx: frd (lector nativo del .frd, von Mises nodal promediado por elemento) o cgx")
+    run.add_argument("--ml-feature-set", default="base", choices=["base", "neighbors"], help="Features del modelo: base o neighbors (agrega estadísticas de vecindario de sigma, gradiente y distancia al borde)")
+    run.add_argument("--ml-tune", action=argparse.BooleanOptionalAction, default=False, help="Reemplaza el entrenamiento por búsqueda de hiperparámetros (successive halving, folds espaciales) y guarda el ganador")
+    run.add_argument("--target-elements", type=int, default=None, help="Presupuesto de tets de la malla adapt: reescala h_post (respetando hmin/hmax) según la estimación sum(V/h^3) calibrada con corridas previas")
+    run.add_argument("--grad-ratio", type=float, default=None, help="Limita la razón de tamaños entre tets coarse vecinos: h_i <= ratio * h_j (ej: 1.3)")
+    run.add_argument("--grad-lipschitz", type=float, default=None, help="Limita la gradación en el espacio: h_i <= h_j + L * distancia entre centroides")
+    run.add_argument("--bg-mode", default="points", choices=["points", "nodes", "tets", "grid"], help="Campo de fondo: points (SP en centroides), nodes (SP en nodos coarse, h ponderado por volumen), tets (SS sobre los tets coarse, h nodal promedio) o grid (grilla binaria para Field Structured)")
+    run.add_argument("--bg-grid-n", type=int, default=64, help="(bg-mode grid) Nodos de la grilla en el eje más largo")
+    run.add_argument("--bg-csv", action=argparse.BooleanOptionalAction, default=True, help="Escribe background_points_3d.csv junto al .pos (Gmsh solo usa el .pos)")
+    run.add_argument("--size-error-map", action=argparse.BooleanOptionalAction, default=False, help="Después del adapt, mapa de error de tamaño: h logrado por elemento vs h objetivo del campo de fondo (size_error_3d.parquet, percentiles por región)")
+    run.add_argument("--bg-decimate-tol", type=float, default=None, help="Si se da, decima el campo de fondo con un octree fusionando celdas con variación relativa de h_post <= tol")
 
     run.add_argument(
         "--fem-auto-fallback",
@@ -69,10 +94,28 @@ def build_parser() -> argparse.ArgumentParser:
     # -------------------------
     # compare-meshes
     # -------------------------
-    compare = sub.add_parser("compare-meshes", help="Compara coarse vs adapt (msh)")
-    compare.add_argument("--coarse", required=True, type=Path, help="Path a coarse_3d.msh")
-    compare.add_argument("--adapt", required=True, type=Path, help="Path a adapt_3d.msh")
+    compare = sub.add_parser("compare-meshes", help="Compara coarse vs adapt, o N mallas (msh)")
+    compare.add_argument("--coarse", type=Path, help="Path a coarse_3d.msh")
+    compare.add_argument("--adapt", type=Path, help="Path a adapt_3d.msh")
+    compare.add_argument(
+        "--meshes",
+        nargs="+",
+        default=[],
+        help="N mallas y/o globs (ej. 'runs/*/gmsh/adapt_3d.msh') en lugar de --coarse/--adapt",
+    )
+    compare.add_argument(
+        "--case",
+        help="Compara coarse vs adapt del caso desde sus Parquets de geometría (+ tabla de aristas cacheada); "
+        "solo parsea los .msh si faltan o están desactualizados",
+    )
+    compare.add_argument("--runs-dir", default="runs")
     compare.add_argument("--outdir", type=Path, default=Path("mesh_compare_out"))
+    compare.add_argument("--workers", type=int, default=0, help="Procesos del pool (0 = n° de CPUs)")
+    compare.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Memoria acotada: lee las mallas por chunks y resume con sketches de cuantiles (error relativo ~0.5%%)",
+    )
     compare.add_argument("--python-exe", default="python")
 
     return p
@@ -89,6 +132,11 @@ def main() -> None:
                 geo=args.geo,
                 runs_dir=args.runs_dir,
                 gmsh_exe=args.gmsh_exe,
+                gmsh_backend=args.gmsh_backend,
+                mesh_profile=args.mesh_profile,
+                mesh_threads=args.mesh_threads,
+                mesh_cache_dir=args.mesh_cache_dir,
+                mesh_cache_max_gb=args.mesh_cache_max_gb,
                 python_exe=args.python_exe,
                 sigma_mode=args.sigma_mode,
                 fem_backend=args.fem_backend,
@@ -101,6 +149,26 @@ def main() -> None:
                 fem_ccx_workdir_ref=args.fem_ccx_workdir_ref,
                 fem_cgx_exe=args.fem_cgx_exe,
                 fem_cgx_run=args.fem_cgx_run,
+                fem_sigma_extractor=args.fem_sigma_extractor,
+                fem_ccx_threads=args.fem_ccx_threads,
+                fem_ccx_policy=args.fem_ccx_policy,
+                fem_cache_dir=args.fem_cache_dir,
+                fem_cache_max_gb=args.fem_cache_max_gb,
+                fem_ref_mesh=args.fem_ref_mesh,
+                fem_ref_sigma=args.fem_ref_sigma,
+                fem_ref_surrogate_max_err=args.fem_ref_surrogate_max_err,
+                fem_ref_submodel_quantile=args.fem_ref_submodel_quantile,
+                fem_ref_submodel_layers=args.fem_ref_submodel_layers,
+                ml_feature_set=args.ml_feature_set,
+                ml_tune=args.ml_tune,
+                target_elements=args.target_elements,
+                grad_ratio=args.grad_ratio,
+                grad_lipschitz=args.grad_lipschitz,
+                bg_mode=args.bg_mode,
+                bg_grid_n=args.bg_grid_n,
+                bg_write_csv=args.bg_csv,
+                bg_decimate_tol=args.bg_decimate_tol,
+                size_error_map=args.size_error_map,
             )
             run_end_to_end(
                 cfg,
@@ -140,18 +208,19 @@ def main() -> None:
             run_cmd(cmd)
 
         elif args.command == "compare-meshes":
-            run_cmd(
-                [
-                    args.python_exe,
-                    str(Path("compare_meshes.py")),
-                    "--coarse",
-                    str(args.coarse),
-                    "--adapt",
-                    str(args.adapt),
-                    "--outdir",
-                    str(args.outdir),
-                ]
-            )
+            cmd = [args.python_exe, str(Path("compare_meshes.py"))]
+            if args.meshes:
+                cmd += ["--meshes", *args.meshes]
+            elif args.case:
+                cmd += ["--case", args.case, "--runs-dir", str(args.runs_dir)]
+            else:
+                if args.coarse is None or args.adapt is None:
+                    raise SystemExit("compare-meshes: indica --coarse y --adapt, --case o --meshes")
+                cmd += ["--coarse", str(args.coarse), "--adapt", str(args.adapt)]
+            cmd += ["--outdir", str(args.outdir), "--workers", str(args.workers)]
+            if args.streaming:
+                cmd.append("--streaming")
+            run_cmd(cmd)
     except KeyboardInterrupt:
         print("\nCancelado por usuario (Ctrl+C).")
         raise SystemExit(130) from None
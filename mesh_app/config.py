@@ -4,6 +4,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
 
+from mesh_app.mesh_profiles import MESH_PROFILES, mesh_options
+
 
 @dataclass(frozen=True)
 class RunConfig:
@@ -11,6 +13,11 @@ class RunConfig:
     geo: Path
     runs_dir: Path = Path("runs")
     gmsh_exe: str = "gmsh"
+    gmsh_backend: str = "cli"  # cli | api
+    mesh_profile: str | None = None  # None (ajustes históricos) | fast | balanced | quality
+    mesh_threads: int = 0  # 0 = default del perfil
+    mesh_cache_dir: Path | None = None  # None = sin cache de mallas coarse
+    mesh_cache_max_gb: float = 5.0
     python_exe: str = "python"
     sigma_mode: str = "auto"  # auto | dummy | fem
     fem_backend: str = "fallback"  # fallback | calculix
@@ -24,6 +31,29 @@ class RunConfig:
     fem_ccx_workdir_ref: Path | None = None
     fem_cgx_exe: str = "cgx"
     fem_cgx_run: bool = True
+    fem_sigma_extractor: str = "frd"  # frd | cgx
+    fem_ccx_threads: int = 0  # 0 = os.cpu_count()
+    fem_ccx_policy: str = "even"  # even | weighted | sequential
+    fem_cache_dir: Path | None = None  # None = sin cache de resultados FEM
+    fem_cache_max_gb: float = 5.0
+    fem_ref_mesh: Path | None = None  # con fem_ref_sigma: sigma ref transferido desde una malla más fina
+    fem_ref_sigma: Path | None = None
+    fem_ref_surrogate_max_err: float | None = None  # None = siempre se calcula sigma ref
+    fem_ref_submodel_quantile: float | None = None  # None = solve ref del modelo completo
+    fem_ref_submodel_layers: int = 2
+
+    ml_feature_set: str = "base"  # base | neighbors
+    ml_tune: bool = False
+
+    target_elements: int | None = None
+    grad_ratio: float | None = None
+    grad_lipschitz: float | None = None
+
+    bg_mode: str = "points"  # points | nodes | tets | grid
+    bg_grid_n: int = 64
+    bg_write_csv: bool = True
+    bg_decimate_tol: float | None = None
+    size_error_map: bool = False  # mapa h logrado vs objetivo después del adapt
 
     coarse_name: str = "coarse_3d.msh"
     adapt_name: str = "adapt_3d.msh"
@@ -44,8 +74,22 @@ class RunConfig:
         return self.gmsh_dir() / self.adapt_name
 
     def background_pos(self) -> Path:
+        if self.bg_mode == "tets":
+            return self.gmsh_dir() / "background_tets_3d.pos"
+        if self.bg_mode == "nodes":
+            return self.gmsh_dir() / "background_nodes_3d.pos"
         return self.gmsh_dir() / "background_points_3d.pos"
 
+    def background_field_file(self) -> Path:
+        if self.bg_mode == "grid":
+            return self.gmsh_dir() / "background_grid_3d.bin"
+        return self.background_pos()
+
+    def mesh_options(self) -> dict[str, int] | None:
+        if self.mesh_profile is None:
+            return None
+        return mesh_options(self.mesh_profile, self.mesh_threads)
+
     def ensure_dirs(self) -> None:
         self.case_dir().mkdir(parents=True, exist_ok=True)
         self.gmsh_dir().mkdir(parents=True, exist_ok=True)
@@ -58,3 +102,46 @@ class RunConfig:
             raise ValueError("sigma_mode debe ser 'auto', 'dummy' o 'fem'")
         if self.fem_backend not in {"fallback", "calculix"}:
             raise ValueError("fem_backend debe ser 'fallback' o 'calculix'")
+        if self.fem_sigma_extractor not in {"frd", "cgx"}:
+            raise ValueError("fem_sigma_extractor debe ser 'frd' o 'cgx'")
+        if self.fem_ccx_threads < 0:
+            raise ValueError("fem_ccx_threads debe ser >= 0")
+        if self.fem_ccx_policy not in {"even", "weighted", "sequential"}:
+            raise ValueError("fem_ccx_policy debe ser 'even', 'weighted' o 'sequential'")
+        if self.fem_cache_max_gb <= 0:
+            raise ValueError("fem_cache_max_gb debe ser > 0")
+        if (self.fem_ref_mesh is None) != (self.fem_ref_sigma is None):
+            raise ValueError("fem_ref_mesh y fem_ref_sigma van juntos (ambos o ninguno)")
+        if self.fem_ref_surrogate_max_err is not None and self.fem_ref_surrogate_max_err <= 0:
+            raise ValueError("fem_ref_surrogate_max_err debe ser > 0")
+        if self.fem_ref_submodel_quantile is not None:
+            if not 0.0 < self.fem_ref_submodel_quantile < 1.0:
+                raise ValueError("fem_ref_submodel_quantile debe estar en (0, 1)")
+            if not self.fem_ccx_run:
+                raise ValueError("fem_ref_submodel_quantile requiere fem_ccx_run (el submodelo usa el FRD coarse)")
+        if self.fem_ref_submodel_layers < 0:
+            raise ValueError("fem_ref_submodel_layers debe ser >= 0")
+        if self.gmsh_backend not in {"cli", "api"}:
+            raise ValueError("gmsh_backend debe ser 'cli' o 'api'")
+        if self.mesh_profile is not None and self.mesh_profile not in MESH_PROFILES:
+            raise ValueError(f"mesh_profile debe ser uno de {sorted(MESH_PROFILES)}")
+        if self.mesh_threads < 0:
+            raise ValueError("mesh_threads debe ser >= 0")
+        if self.mesh_cache_max_gb <= 0:
+            raise ValueError("mesh_cache_max_gb debe ser > 0")
+        if self.target_elements is not None and self.target_elements <= 0:
+            raise ValueError("target_elements debe ser > 0")
+        if self.grad_ratio is not None and self.grad_ratio < 1.0:
+            raise ValueError("grad_ratio debe ser >= 1")
+        if self.grad_lipschitz is not None and self.grad_lipschitz < 0:
+            raise ValueError("grad_lipschitz debe ser >= 0")
+        if self.bg_mode not in {"points", "nodes", "tets", "grid"}:
+            raise ValueError("bg_mode debe ser 'points', 'nodes', 'tets' o 'grid'")
+        if self.bg_grid_n < 2:
+            raise ValueError("bg_grid_n debe ser >= 2")
+        if self.bg_decimate_tol is not None and self.bg_decimate_tol < 0:
+            raise ValueError("bg_decimate_tol debe ser >= 0")
+        if self.bg_decimate_tol is not None and self.bg_mode != "points":
+            raise ValueError("bg_decimate_tol solo aplica con bg_mode='points'")
+        if self.ml_feature_set not in {"base", "neighbors"}:
+            raise ValueError("ml_feature_set debe ser 'base' o 'neighbors'")
@@ -0,0 +1,48 @@
+# mesh_profiles.py
+from __future__ import annotations
+
+import os
+
+# Perfiles de mallado 3D (opciones Gmsh). "quality" son los ajustes históricos del
+# remallado adapt; "balanced" y "fast" usan HXT (Delaunay paralelo, Algorithm3D = 10).
+MESH_PROFILES: dict[str, dict[str, int]] = {
+    "quality": {
+        "Mesh.Algorithm3D": 4,
+        "Mesh.Optimize": 1,
+        "Mesh.OptimizeNetgen": 1,
+    },
+    "balanced": {
+        "Mesh.Algorithm3D": 10,
+        "Mesh.Optimize": 1,
+        "Mesh.OptimizeNetgen": 0,
+    },
+    "fast": {
+        "Mesh.Algorithm3D": 10,
+        "Mesh.Optimize": 0,
+        "Mesh.OptimizeNetgen": 0,
+    },
+}
+
+# Perfiles que corren multihilo (HXT); "quality" queda en 1 hilo como antes
+_THREADED = {"balanced", "fast"}
+
+
+def mesh_options(profile: str, threads: int = 0) -> dict[str, int]:
+    """
+    Opciones Gmsh del perfil, con hilos explícitos: threads=0 usa todas las CPUs
+    en los perfiles multihilo y 1 en "quality".
+    """
+    if profile not in MESH_PROFILES:
+        raise ValueError(f"Perfil de mallado desconocido: {profile}. Disponibles: {sorted(MESH_PROFILES)}")
+    if threads <= 0:
+        threads = (os.cpu_count() or 1) if profile in _THREADED else 1
+    return {
+        **MESH_PROFILES[profile],
+        "General.NumThreads": threads,
+        "Mesh.MaxNumThreads3D": threads,
+    }
+
+
+def options_script(options: dict[str, int | float]) -> str:
+    """Opciones como sentencias .geo ("Mesh.Algorithm3D = 10;"), una por línea."""
+    return "".join(f"{k} = {v!r};\n" for k, v in options.items())
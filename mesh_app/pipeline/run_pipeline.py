@@ -1,11 +1,27 @@
 # run_pipeline.py
 from __future__ import annotations
 
+import time
 from pathlib import Path
 
+import pandas as pd
+
 from mesh_app.config import RunConfig
+from mesh_app.mesh_profiles import MESH_PROFILES, options_script
+from mesh_app.services.gmsh_api_service import GmshApiService, MeshArrays
 from mesh_app.services.gmsh_service import GmshService
+from mesh_app.services.mesh_cache_service import CoarseMeshCache
 from mesh_app.services.pipeline_steps_service import PipelineStepsService
+from src3d.compute_element_geometry_3d import save_geometry, tet_geometry_frame
+from src3d.export_background_points_3d import centroid_background, nodal_background, tet_background
+from src3d.element_count_3d import log_estimate_vs_actual
+from src3d.parquet_io_3d import parquet_num_rows, read_columns
+from src3d.paths3d import (
+    element_count_log_csv,
+    element_estimate_json,
+    geometry_parquet,
+    h_pred_post_parquet,
+)
 
 def _default_ccx_sigma_paths(cfg: RunConfig) -> tuple[Path, Path]:
     base = cfg.runs_dir / cfg.case / "ccx"
@@ -18,24 +34,79 @@ def _can_run_calculix_with_inputs(cfg: RunConfig) -> bool:
     ref = cfg.fem_sigma_ref_file or ref_default
     return coarse.exists() and ref.exists()
 
-def _build_temp_adapt_geo(geo_abs: Path, bg_local_name: str = "background_points_3d.pos") -> str:
+def _background_size_max(cfg: RunConfig) -> float:
+    path = h_pred_post_parquet(cfg.case, cfg.runs_dir)
+    return float(read_columns(path, ["h_post"])["h_post"].max())
+
+
+def _save_mesh_geometry(cfg: RunConfig, mesh: MeshArrays, tag: str = "") -> None:
+    """Equivalente en proceso de compute_element_geometry_3d (sin releer el .msh)."""
+    df = tet_geometry_frame(mesh.node_ids, mesh.node_xyz, mesh.elem_ids, mesh.conn)
+    nodes_df = pd.DataFrame(
+        {"node_id": mesh.node_ids, "x": mesh.node_xyz[:, 0], "y": mesh.node_xyz[:, 1], "z": mesh.node_xyz[:, 2]}
+    )
+    out, out_nodes = save_geometry(df, nodes_df, cfg.case, tag, cfg.runs_dir)
+    print(f"OK: guardado {len(df)} tets en: {out}")
+    print(f"OK: guardado {len(nodes_df)} nodos en: {out_nodes}")
+
+
+def _mesh_adapt_api(api: GmshApiService, cfg: RunConfig, bg_source: str) -> MeshArrays:
+    """Remallado adapt con el campo de fondo pasado en memoria (grid sigue leyendo su .bin)."""
+    options = cfg.mesh_options()
+    if cfg.bg_mode == "grid":
+        return api.mesh_adapt_grid(cfg.geo, cfg.background_field_file(), cfg.adapt_msh(), options=options)
+    if cfg.bg_mode == "tets":
+        node_xyz, conn_idx, h_node = tet_background(cfg.case, cfg.runs_dir)
+        return api.mesh_adapt_tets(
+            cfg.geo,
+            node_xyz,
+            conn_idx,
+            h_node,
+            cfg.adapt_msh(),
+            size_max=_background_size_max(cfg),
+            options=options,
+        )
+    if cfg.bg_mode == "nodes":
+        xyz, h, _ = nodal_background(cfg.case, cfg.runs_dir)
+    else:
+        xyz, h = centroid_background(cfg.case, cfg.runs_dir, source=bg_source)
+    return api.mesh_adapt_points(cfg.geo, xyz, h, cfg.adapt_msh(), options=options)
+
+
+def _build_temp_adapt_geo(
+    geo_abs: Path,
+    bg_local_name: str = "background_points_3d.pos",
+    bg_mode: str = "points",
+    size_max: float | None = None,
+    mesh_options: dict[str, int | float] | None = None,
+) -> str:
+    if bg_mode == "grid":
+        # Grilla binaria: Gmsh la lee directo, sin vista ni búsqueda de elementos
+        merge_bg = ""
+        field = f'''Field[1] = Structured;
+Field[1].FileName = "{bg_local_name}";
+Field[1].TextFormat = 0;
+'''
+    else:
+        merge_bg = f'Merge "{bg_local_name}";\n'
+        field = "Field[1] = PostView;\nField[1].ViewIndex = 0;\n"
+        # Vista SS (tets): interpolar dentro del tet en vez de tomar el nodo más cercano.
+        # Puntos de borde curvo fuera de los tets facetados no encuentran elemento:
+        # size_max acota el tamaño que Gmsh usa en ese caso.
+        if bg_mode == "tets":
+            field += "Field[1].UseClosest = 0;\n"
+    clamp = f"Mesh.MeshSizeMax = {size_max!r};\n" if size_max is not None else ""
     return f'''SetFactory("OpenCASCADE");
 
 Merge "{geo_abs.as_posix()}";
-Merge "{bg_local_name}";
-
-Field[1] = PostView;
-Field[1].ViewIndex = 0;
-Background Field = 1;
+{merge_bg}
+{field}Background Field = 1;
 
 Mesh.MeshSizeExtendFromBoundary = 0;
 Mesh.MeshSizeFromPoints = 0;
 Mesh.MeshSizeFromCurvature = 0;
-
-Mesh.Algorithm3D = 4;
-Mesh.Optimize = 1;
-Mesh.OptimizeNetgen = 1;
-'''
+{clamp}
+{options_script(mesh_options or MESH_PROFILES["quality"])}'''
 
 
 def run_end_to_end(
@@ -51,18 +122,46 @@ def run_end_to_end(
 
 
     gmsh = GmshService(cfg.gmsh_exe)
+    api = GmshApiService() if cfg.gmsh_backend == "api" else None
     steps = PipelineStepsService(cfg.python_exe, runs_dir=cfg.runs_dir)
 
     print("=== PIPELINE 3D START ===")
     print(f"case      : {cfg.case}")
     print(f"geo       : {cfg.geo}")
     print(f"sigma_mode: {cfg.sigma_mode}")
+    print(f"gmsh      : {cfg.gmsh_backend} (perfil: {cfg.mesh_profile or 'default'})")
 
-    # 1) coarse
-    gmsh.mesh_coarse(cfg.geo, cfg.coarse_msh())
+    # 1) coarse (+ 2) geometría) desde el cache global si está habilitado
+    mesh_cache = (
+        CoarseMeshCache(cfg.mesh_cache_dir, int(cfg.mesh_cache_max_gb * 2**30))
+        if cfg.mesh_cache_dir is not None
+        else None
+    )
+    cache_key = mesh_cache.key(cfg) if mesh_cache is not None else ""
+    if mesh_cache is not None and mesh_cache.restore(cache_key, cfg):
+        print(f"Cache coarse: HIT {cache_key[:12]} ({cfg.mesh_cache_dir})")
+    else:
+        if mesh_cache is not None:
+            mesh_cache.clear_outputs(cfg)
 
-    # 2) features
-    steps.compute_geometry(cfg.case, cfg.coarse_msh())
+        # 1) coarse
+        t0 = time.perf_counter()
+        if api is not None:
+            coarse = api.mesh_coarse(cfg.geo, cfg.coarse_msh(), options=cfg.mesh_options())
+        else:
+            gmsh.mesh_coarse(cfg.geo, cfg.coarse_msh(), options=cfg.mesh_options())
+        t_mesh = time.perf_counter() - t0
+
+        # 2) features
+        t0 = time.perf_counter()
+        if api is not None:
+            _save_mesh_geometry(cfg, coarse)
+        else:
+            steps.compute_geometry(cfg.case, cfg.coarse_msh())
+        print(f"Tiempo coarse (gmsh {cfg.gmsh_backend}): mallado {t_mesh:.2f} s | geometría {time.perf_counter() - t0:.2f} s")
+        if mesh_cache is not None:
+            mesh_cache.store(cache_key, cfg)
+            print(f"Cache coarse: MISS {cache_key[:12]} -> guardado en {cfg.mesh_cache_dir}")
 
     # 3) sigma source
     if cfg.sigma_mode == "dummy":
@@ -80,6 +179,16 @@ def run_end_to_end(
             ccx_run=cfg.fem_ccx_run,
             cgx_exe=cfg.fem_cgx_exe,
             cgx_run=cfg.fem_cgx_run,
+            sigma_extractor=cfg.fem_sigma_extractor,
+            ccx_threads=cfg.fem_ccx_threads,
+            ccx_policy=cfg.fem_ccx_policy,
+            fem_cache_dir=cfg.fem_cache_dir,
+            fem_cache_max_gb=cfg.fem_cache_max_gb,
+            ref_mesh=cfg.fem_ref_mesh,
+            ref_sigma=cfg.fem_ref_sigma,
+            surrogate_max_err=cfg.fem_ref_surrogate_max_err,
+            ref_submodel_quantile=cfg.fem_ref_submodel_quantile,
+            ref_submodel_layers=cfg.fem_ref_submodel_layers,
             auto_fallback_if_missing=fem_auto_fallback,
         )
     else:  # auto
@@ -97,6 +206,16 @@ def run_end_to_end(
                 ccx_run=cfg.fem_ccx_run,
                 cgx_exe=cfg.fem_cgx_exe,
                 cgx_run=cfg.fem_cgx_run,
+                sigma_extractor=cfg.fem_sigma_extractor,
+                ccx_threads=cfg.fem_ccx_threads,
+                ccx_policy=cfg.fem_ccx_policy,
+                fem_cache_dir=cfg.fem_cache_dir,
+                fem_cache_max_gb=cfg.fem_cache_max_gb,
+                ref_mesh=cfg.fem_ref_mesh,
+                ref_sigma=cfg.fem_ref_sigma,
+                surrogate_max_err=cfg.fem_ref_surrogate_max_err,
+                ref_submodel_quantile=cfg.fem_ref_submodel_quantile,
+                ref_submodel_layers=cfg.fem_ref_submodel_layers,
                 auto_fallback_if_missing=False,
             )
         else:
@@ -104,28 +223,90 @@ def run_end_to_end(
             steps.compute_sigma_dummy(cfg.case, tipx, tipy, tipz) 
 
     # 4) ML chain
+    if cfg.ml_feature_set != "base":
+        steps.compute_features(cfg.case)
     steps.compute_hstar(cfg.case)
-    steps.train_model(cfg.case)
+    if cfg.ml_tune:
+        steps.tune_model(cfg.case, feature_set=cfg.ml_feature_set)
+    else:
+        steps.train_model(cfg.case, feature_set=cfg.ml_feature_set)
     steps.predict_hstar(cfg.case)
-    steps.postprocess(cfg.case)
-    steps.export_background(cfg.case)
+    steps.postprocess(
+        cfg.case,
+        target_elements=cfg.target_elements,
+        geo_name=cfg.geo.name,
+        grad_ratio=cfg.grad_ratio,
+        grad_lipschitz=cfg.grad_lipschitz,
+    )
+    bg_source = "post"
+    if cfg.bg_decimate_tol is not None:
+        steps.decimate_background(cfg.case, cfg.bg_decimate_tol)
+        bg_source = "decimated"
+    # Con gmsh api el campo (salvo grid) se pasa en memoria: no hace falta el .pos
+    in_memory_bg = api is not None and cfg.bg_mode != "grid"
+    if not in_memory_bg:
+        steps.export_background(
+            cfg.case,
+            write_csv=cfg.bg_write_csv,
+            source=bg_source,
+            mode=cfg.bg_mode,
+            grid_n=cfg.bg_grid_n,
+        )
 
-    # 5) adaptive remesh from generated POS
-    bg_path = cfg.background_pos()
-    if not bg_path.exists():
-        raise FileNotFoundError(f"No existe background .pos: {bg_path}")
+    # 5) adaptive remesh from generated background field
+    bg_path = cfg.background_field_file()
+    if not in_memory_bg and not bg_path.exists():
+        raise FileNotFoundError(f"No existe background field: {bg_path}")
+
+    t0 = time.perf_counter()
+    if api is not None:
+        adapt = _mesh_adapt_api(api, cfg, bg_source)
+    else:
+        temp_geo = cfg.gmsh_dir() / "temp_adapt_3d.geo"
+        temp_geo.write_text(
+            _build_temp_adapt_geo(
+                cfg.geo.resolve(),
+                bg_local_name=bg_path.name,
+                bg_mode=cfg.bg_mode,
+                size_max=_background_size_max(cfg) if cfg.bg_mode == "tets" else None,
+                mesh_options=cfg.mesh_options(),
+            ),
+            encoding="utf-8",
+        )
+        try:
+            gmsh.mesh_adapt_with_pos(temp_geo=temp_geo, workdir=cfg.gmsh_dir(), out_name=cfg.adapt_name)
+        finally:
+            temp_geo.unlink(missing_ok=True)
+    t_mesh = time.perf_counter() - t0
 
-    temp_geo = cfg.gmsh_dir() / "temp_adapt_3d.geo"
-    temp_geo.write_text(_build_temp_adapt_geo(cfg.geo.resolve()), encoding="utf-8")
+    t0 = time.perf_counter()
+    if api is not None:
+        _save_mesh_geometry(cfg, adapt, tag="adapt")
+    else:
+        steps.compute_geometry(cfg.case, cfg.adapt_msh(), tag="adapt")
+    t_geom = time.perf_counter() - t0
 
-    try:
-        gmsh.mesh_adapt_with_pos(temp_geo=temp_geo, workdir=cfg.gmsh_dir(), out_name=cfg.adapt_name)
-    finally:
-        temp_geo.unlink(missing_ok=True)
+    n_adapt = parquet_num_rows(geometry_parquet(cfg.case, "adapt", cfg.runs_dir))
+    count = log_estimate_vs_actual(
+        element_count_log_csv(cfg.runs_dir),
+        element_estimate_json(cfg.case, cfg.runs_dir),
+        n_adapt,
+        bg_mode=cfg.bg_mode,
+        mesh_profile=cfg.mesh_profile or "default",
+    )
+    print(
+        f"Elementos adapt: estimado {count['n_est']:.0f} | real {n_adapt} "
+        f"(real/estimado {n_adapt / max(count['n_est'], 1e-30):.3f})"
+    )
+    print(f"Tiempo adapt (gmsh {cfg.gmsh_backend}): mallado {t_mesh:.2f} s | geometría {t_geom:.2f} s")
 
-    steps.compute_geometry(cfg.case, cfg.adapt_msh(), tag="adapt")
+    if cfg.size_error_map:
+        # grid se remuestrea con IDW (k=8) desde h_post en los centroides: points con k=8 lo aproxima
+        target = "points" if cfg.bg_mode == "grid" else cfg.bg_mode
+        source = bg_source if cfg.bg_mode == "points" else "post"
+        steps.size_error_map(cfg.case, target=target, source=source, k=8 if cfg.bg_mode == "grid" else 1)
 
     print("\n✅ DONE")
     print(f"Coarse: {cfg.coarse_msh()}")
     print(f"Adapt : {cfg.adapt_msh()}")
-    print(f"BG POS: {cfg.background_pos()}")
+    print(f"BG    : {'en memoria (gmsh api)' if in_memory_bg else bg_path}")
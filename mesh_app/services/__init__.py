@@ -1,4 +1,6 @@
+from mesh_app.services.gmsh_api_service import GmshApiService, MeshArrays
 from mesh_app.services.gmsh_service import GmshService
+from mesh_app.services.mesh_cache_service import CoarseMeshCache
 from mesh_app.services.pipeline_steps_service import PipelineStepsService
 
-__all__ = ["GmshService", "PipelineStepsService"]
\ No newline at end of file
+__all__ = ["CoarseMeshCache", "GmshApiService", "GmshService", "MeshArrays", "PipelineStepsService"]
\ No newline at end of file
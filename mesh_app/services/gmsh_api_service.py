@@ -0,0 +1,202 @@
+# gmsh_api_service.py
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator
+
+import numpy as np
+
+from mesh_app.mesh_profiles import MESH_PROFILES
+
+# Tipos de elemento Gmsh 3D que se convierten a tets (mismo criterio que read_msh2_3d)
+_TET4, _PRISM6, _TET10 = 4, 6, 11
+# Partición estándar de un prisma (a,b,c,d,e,f) en 3 tets
+_PRISM_TETS = np.array([[0, 1, 2, 3], [1, 2, 4, 3], [2, 4, 5, 3]], dtype=np.int64)
+
+
+@dataclass
+class MeshArrays:
+    """Malla de tets como arreglos: nodos (N,), (N,3) y elementos (M,), (M,4) con ids de nodo."""
+    node_ids: np.ndarray
+    node_xyz: np.ndarray
+    elem_ids: np.ndarray
+    conn: np.ndarray
+
+
+def _import_gmsh():
+    try:
+        import gmsh
+    except ImportError as exc:  # pragma: no cover - depende del entorno
+        raise RuntimeError(
+            "gmsh_backend='api' requiere el módulo Python de Gmsh (pip install gmsh)."
+        ) from exc
+    return gmsh
+
+
+class GmshApiService:
+    """
+    Backend de Gmsh en proceso (módulo `gmsh`): mismo flujo que GmshService, pero
+    sin .geo temporal ni .pos intermedio y devolviendo la malla como arreglos NumPy.
+    El .msh (MSH2) se sigue escribiendo porque lo usan FEM, plots y compare-meshes.
+    """
+
+    def __init__(self, verbose: bool = True):
+        self.verbose = verbose
+
+    @contextmanager
+    def _session(self) -> Iterator:
+        gmsh = _import_gmsh()
+        gmsh.initialize(readConfigFiles=False, interruptible=False)
+        try:
+            gmsh.option.setNumber("General.Terminal", 1 if self.verbose else 0)
+            yield gmsh
+        finally:
+            gmsh.finalize()
+
+    @staticmethod
+    def _volume_entities(gmsh) -> list[int]:
+        """Volúmenes que terminan en el .msh: los de grupos físicos si existen (Mesh.SaveAll=0)."""
+        groups = gmsh.model.getPhysicalGroups(3)
+        if groups and not gmsh.option.getNumber("Mesh.SaveAll"):
+            tags: set[int] = set()
+            for dim, tag in groups:
+                tags.update(int(t) for t in gmsh.model.getEntitiesForPhysicalGroup(dim, tag))
+            return sorted(tags)
+        return [int(tag) for _, tag in gmsh.model.getEntities(3)]
+
+    def _extract(self, gmsh) -> MeshArrays:
+        node_tags, coords, _ = gmsh.model.mesh.getNodes()
+        elem_ids: list[np.ndarray] = []
+        conn: list[np.ndarray] = []
+        for ent in self._volume_entities(gmsh):
+            types, etags, enodes = gmsh.model.mesh.getElements(3, ent)
+            for etype, tags, nodes in zip(types, etags, enodes):
+                tags = np.asarray(tags, dtype=np.int64)
+                if etype in (_TET4, _TET10):
+                    npe = 4 if etype == _TET4 else 10
+                    conn.append(np.asarray(nodes, dtype=np.int64).reshape(-1, npe)[:, :4])
+                    elem_ids.append(tags)
+                elif etype == _PRISM6:
+                    prisms = np.asarray(nodes, dtype=np.int64).reshape(-1, 6)
+                    conn.append(prisms[:, _PRISM_TETS].reshape(-1, 4))
+                    elem_ids.append((tags[:, None] * 10 + np.arange(3)).ravel())
+
+        if not conn:
+            raise RuntimeError("Malla sin elementos 3D convertibles (gmsh api).")
+        return MeshArrays(
+            node_ids=np.asarray(node_tags, dtype=np.int64),
+            node_xyz=np.asarray(coords, dtype=float).reshape(-1, 3),
+            elem_ids=np.concatenate(elem_ids),
+            conn=np.concatenate(conn),
+        )
+
+    @staticmethod
+    def _write_msh2(gmsh, out_msh: Path) -> None:
+        out_msh.parent.mkdir(parents=True, exist_ok=True)
+        gmsh.option.setNumber("Mesh.MshFileVersion", 2.2)
+        gmsh.write(str(out_msh))
+
+    @staticmethod
+    def _set_options(gmsh, options: dict[str, int | float]) -> None:
+        for name, value in options.items():
+            gmsh.option.setNumber(name, value)
+
+    def mesh_coarse(
+        self, geo: Path, out_msh: Path, options: dict[str, int | float] | None = None
+    ) -> MeshArrays:
+        with self._session() as gmsh:
+            # Antes de abrir el .geo, como "-string" en el backend cli
+            self._set_options(gmsh, options or {})
+            gmsh.open(str(geo))
+            gmsh.model.mesh.generate(3)
+            self._write_msh2(gmsh, out_msh)
+            return self._extract(gmsh)
+
+    def _mesh_adapt(
+        self,
+        geo: Path,
+        out_msh: Path,
+        add_field: Callable[[object], int],
+        size_max: float | None = None,
+        options: dict[str, int | float] | None = None,
+    ) -> MeshArrays:
+        with self._session() as gmsh:
+            gmsh.open(str(geo.resolve()))
+            field = add_field(gmsh)
+            gmsh.model.mesh.field.setAsBackgroundMesh(field)
+
+            # Mismas opciones que el .geo temporal del backend cli
+            gmsh.option.setNumber("Mesh.MeshSizeExtendFromBoundary", 0)
+            gmsh.option.setNumber("Mesh.MeshSizeFromPoints", 0)
+            gmsh.option.setNumber("Mesh.MeshSizeFromCurvature", 0)
+            if size_max is not None:
+                gmsh.option.setNumber("Mesh.MeshSizeMax", size_max)
+            self._set_options(gmsh, options or MESH_PROFILES["quality"])
+
+            gmsh.model.mesh.generate(3)
+            self._write_msh2(gmsh, out_msh)
+            return self._extract(gmsh)
+
+    @staticmethod
+    def _post_view_field(gmsh, view: int, use_closest: bool = True) -> int:
+        field = gmsh.model.mesh.field.add("PostView")
+        gmsh.model.mesh.field.setNumber(field, "ViewTag", view)
+        if not use_closest:
+            gmsh.model.mesh.field.setNumber(field, "UseClosest", 0)
+        return field
+
+    def mesh_adapt_points(
+        self,
+        geo: Path,
+        xyz: np.ndarray,
+        h: np.ndarray,
+        out_msh: Path,
+        options: dict[str, int | float] | None = None,
+    ) -> MeshArrays:
+        """Campo de fondo SP (puntos dispersos) inyectado como vista en memoria."""
+        def add_field(gmsh) -> int:
+            view = gmsh.view.add("background_points_3d")
+            data = np.column_stack([xyz, h]).ravel()
+            gmsh.view.addListData(view, "SP", len(h), data.tolist())
+            return self._post_view_field(gmsh, view)
+
+        return self._mesh_adapt(geo, out_msh, add_field, options=options)
+
+    def mesh_adapt_tets(
+        self,
+        geo: Path,
+        node_xyz: np.ndarray,
+        conn_idx: np.ndarray,
+        h_node: np.ndarray,
+        out_msh: Path,
+        size_max: float | None = None,
+        options: dict[str, int | float] | None = None,
+    ) -> MeshArrays:
+        """Campo de fondo SS (tets coarse con h nodal), interpolado dentro del tet."""
+        def add_field(gmsh) -> int:
+            view = gmsh.view.add("background_tets_3d")
+            # Formato de lista SS: x1..x4, y1..y4, z1..z4, v1..v4 por elemento
+            xyz = node_xyz[conn_idx]  # (M,4,3)
+            data = np.hstack([xyz.transpose(0, 2, 1).reshape(-1, 12), h_node[conn_idx]]).ravel()
+            gmsh.view.addListData(view, "SS", len(conn_idx), data.tolist())
+            return self._post_view_field(gmsh, view, use_closest=False)
+
+        return self._mesh_adapt(geo, out_msh, add_field, size_max=size_max, options=options)
+
+    def mesh_adapt_grid(
+        self,
+        geo: Path,
+        grid_file: Path,
+        out_msh: Path,
+        options: dict[str, int | float] | None = None,
+    ) -> MeshArrays:
+        """Campo Structured desde la grilla binaria (ya es binaria: no hay texto que parsear)."""
+        def add_field(gmsh) -> int:
+            field = gmsh.model.mesh.field.add("Structured")
+            gmsh.model.mesh.field.setString(field, "FileName", str(grid_file.resolve()))
+            gmsh.model.mesh.field.setNumber(field, "TextFormat", 0)
+            return field
+
+        return self._mesh_adapt(geo, out_msh, add_field, options=options)
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 from pathlib import Path
 
+from mesh_app.mesh_profiles import options_script
 from mesh_app.utils.subprocess_utils import run_cmd
 
 
@@ -10,9 +11,9 @@ class GmshService:
     def __init__(self, gmsh_exe: str = "gmsh"):
         self.gmsh_exe = gmsh_exe
 
-    def mesh_coarse(self, geo: Path, out_msh: Path) -> None:
+    def mesh_coarse(self, geo: Path, out_msh: Path, options: dict[str, int | float] | None = None) -> None:
         out_msh.parent.mkdir(parents=True, exist_ok=True)
-        run_cmd([
+        cmd = [
             self.gmsh_exe,
             str(geo),
             "-3",
@@ -20,7 +21,11 @@ class GmshService:
             "msh2",
             "-o",
             str(out_msh),
-        ])
+        ]
+        if options:
+            # -string se interpreta al inicio: las opciones que fije el propio .geo prevalecen
+            cmd.extend(["-string", options_script(options).replace("\n", " ").strip()])
+        run_cmd(cmd)
 
     def mesh_adapt_with_pos(self, temp_geo: Path, workdir: Path, out_name: str = "adapt_3d.msh") -> None:
         run_cmd(
@@ -0,0 +1,93 @@
+# mesh_cache_service.py
+from __future__ import annotations
+
+import json
+import re
+import subprocess
+from pathlib import Path
+
+from mesh_app.config import RunConfig
+from src3d.content_cache_3d import ContentCache, hash_bytes
+from src3d.paths3d import geometry_parquet, node_coords_parquet
+
+_INCLUDE_RE = re.compile(r'^\s*(?:Merge|Include)\s*"([^"]+)"', re.MULTILINE)
+# Subir si cambian las columnas de element_geometry_3d / node_coords_3d
+_GEOMETRY_SCHEMA = "element_geometry_3d/v1"
+
+
+def geo_dependencies(geo: Path) -> list[Path]:
+    """El .geo y los archivos que carga con Merge/Include (recursivo en .geo, relativo al archivo que incluye)."""
+    seen: list[Path] = []
+    stack = [geo.resolve()]
+    while stack:
+        path = stack.pop()
+        if path in seen:
+            continue
+        if not path.exists():
+            raise FileNotFoundError(f"{geo}: dependencia Merge/Include inexistente: {path}")
+        seen.append(path)
+        if path.suffix.lower() == ".geo":
+            text = path.read_text(encoding="utf-8", errors="ignore")
+            stack.extend((path.parent / m).resolve() for m in _INCLUDE_RE.findall(text))
+    return seen
+
+
+def gmsh_version(backend: str, gmsh_exe: str = "gmsh") -> str:
+    if backend == "api":
+        from mesh_app.services.gmsh_api_service import _import_gmsh
+
+        return str(_import_gmsh().__version__)
+    proc = subprocess.run([gmsh_exe, "-version"], capture_output=True, text=True, check=False)
+    out = (proc.stdout + proc.stderr).strip().splitlines()
+    if proc.returncode != 0 or not out:
+        raise RuntimeError(f"No se pudo obtener la versión de Gmsh ({gmsh_exe} -version)")
+    return out[-1].strip()
+
+
+class CoarseMeshCache:
+    """
+    Cache global de mallas coarse: la clave es el hash del .geo (con sus
+    Merge/Include), la versión de Gmsh, el backend y las opciones de mallado.
+    Cada entrada guarda el .msh y sus Parquet de geometría/nodos, que los casos
+    reciben como hardlink (o copia si el FS no lo permite).
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.cache = ContentCache(root, max_bytes)
+
+    @staticmethod
+    def _files(cfg: RunConfig) -> dict[str, Path]:
+        return {
+            "coarse_3d.msh": cfg.coarse_msh(),
+            "element_geometry_3d.parquet": geometry_parquet(cfg.case, "", cfg.runs_dir),
+            "node_coords_3d.parquet": node_coords_parquet(cfg.case, "", cfg.runs_dir),
+        }
+
+    def key(self, cfg: RunConfig) -> str:
+        base = cfg.geo.resolve().parent
+        chunks: list[bytes | str] = []
+        for dep in geo_dependencies(cfg.geo):
+            # Ruta relativa al .geo principal: mover la carpeta completa no invalida el cache
+            rel = dep.relative_to(base).as_posix() if dep.is_relative_to(base) else dep.as_posix()
+            chunks.extend([rel, dep.read_bytes()])
+        chunks.extend(
+            [
+                gmsh_version(cfg.gmsh_backend, cfg.gmsh_exe),
+                cfg.gmsh_backend,
+                json.dumps(cfg.mesh_options(), sort_keys=True),
+                "msh2",
+                _GEOMETRY_SCHEMA,
+            ]
+        )
+        return hash_bytes(*chunks)
+
+    def restore(self, key: str, cfg: RunConfig) -> bool:
+        return self.cache.get(key, self._files(cfg))
+
+    def clear_outputs(self, cfg: RunConfig) -> None:
+        """Borra los archivos del caso antes de regenerarlos: pueden ser hardlinks a una entrada del cache."""
+        for path in self._files(cfg).values():
+            path.unlink(missing_ok=True)
+
+    def store(self, key: str, cfg: RunConfig) -> None:
+        self.cache.put(key, self._files(cfg))
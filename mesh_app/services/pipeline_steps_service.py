@@ -1,9 +1,15 @@
 # mesh_app/services/pipeline_steps_service.py
 from __future__ import annotations
 
+import json
+import os
 from pathlib import Path
 
-from mesh_app.utils.subprocess_utils import run_cmd
+from mesh_app.utils.subprocess_utils import run_cmd, run_cmds_parallel
+from src3d.fem.calculix_runner import run_info_path
+from src3d.paths3d import sigma_ref_surrogate_json, sigma_source_json
+
+CCX_POLICIES = ("even", "weighted", "sequential")
 
 
 def _normalize_cli_path(path: Path | str) -> Path:
@@ -12,6 +18,32 @@ def _normalize_cli_path(path: Path | str) -> Path:
 
 def _default_sigma_file(case: str, runs_dir: Path, tag: str) -> Path:
     return runs_dir / case / "ccx" / tag / "sigma_vm.csv"
+
+
+def split_threads(total: int, weights: list[float]) -> list[int]:
+    """Reparte total threads proporcional a weights (mínimo 1 por job), por mayor resto."""
+    n = len(weights)
+    wsum = float(sum(weights))
+    shares = [total * w / wsum for w in weights] if wsum > 0 else [total / n] * n
+    out = [max(1, int(s)) for s in shares]
+    while sum(out) > total and max(out) > 1:
+        out[out.index(max(out))] -= 1
+    rest = sorted(range(n), key=lambda i: shares[i] - int(shares[i]), reverse=True)
+    for i in rest[: max(0, total - sum(out))]:
+        out[i] += 1
+    return out
+
+
+def _ccx_job_size(case: str, runs_dir: Path, tag: str, workdir: Path) -> float:
+    """Tamaño relativo del job (bytes de mesh.inp o del .msh que se exportará) para la política weighted."""
+    for path in (
+        workdir / "mesh.inp",
+        runs_dir / case / "gmsh" / f"{tag}_3d.msh",
+        runs_dir / case / "gmsh" / "coarse_3d.msh",
+    ):
+        if path.exists():
+            return float(path.stat().st_size)
+    return 1.0
 class PipelineStepsService:
     def __init__(self, python_exe: str = "python", runs_dir: Path = Path("runs")):
         self.python_exe = python_exe
@@ -53,10 +85,22 @@ class PipelineStepsService:
         ccx_run: bool = False,
         cgx_exe: str = "cgx",
         cgx_run: bool = True,
+        sigma_extractor: str = "frd",  # frd | cgx
+        ccx_threads: int = 0,  # 0 = todos los cores (os.cpu_count())
+        ccx_policy: str = "even",  # even | weighted | sequential
+        fem_cache_dir: Path | None = None,
+        fem_cache_max_gb: float = 5.0,
+        ref_mesh: Path | None = None,  # con ref_sigma: sigma ref transferido desde esta malla, sin resolver
+        ref_sigma: Path | None = None,
+        surrogate_max_err: float | None = None,  # usa el surrogate de sigma_ref si su val_err <= este umbral
+        ref_submodel_quantile: float | None = None,  # con ccx_run: ref solo en la región sigma coarse >= cuantil
+        ref_submodel_layers: int = 2,
         auto_fallback_if_missing: bool = True,
     ) -> None:
         sigma_files: dict[str, Path | None] = {"coarse": sigma_coarse_file, "ref": sigma_ref_file}
         workdirs: dict[str, Path | None] = {"coarse": ccx_workdir_coarse, "ref": ccx_workdir_ref}
+        cmds: dict[str, list[str]] = {}
+        ccx_workdirs: dict[str, Path] = {}
 
         for tag in ("coarse", "ref"):
             cmd = [
@@ -69,10 +113,27 @@ class PipelineStepsService:
                 *self._runs_dir_args(),
             ]
 
+            if tag == "ref" and ref_mesh is not None and ref_sigma is not None:
+                # La referencia ya está resuelta en otra malla: se interpola en los centroides
+                cmd[cmd.index("--backend") + 1] = "transfer"
+                cmd.extend(["--ref-mesh", str(_normalize_cli_path(ref_mesh))])
+                cmd.extend(["--ref-sigma", str(_normalize_cli_path(ref_sigma))])
+                cmds[tag] = cmd
+                continue
+
+            if tag == "ref" and surrogate_max_err is not None and self._surrogate_ok(surrogate_max_err):
+                cmd[cmd.index("--backend") + 1] = "surrogate"
+                cmds[tag] = cmd
+                continue
+
             if backend == "calculix":
                 cmd.extend(["--ccx-exe", ccx_exe, "--ccx-job", ccx_job, "--cgx-exe", cgx_exe])
+                cmd.extend(["--sigma-extractor", sigma_extractor])
                 if ccx_run:
                     cmd.append("--ccx-run")
+                if fem_cache_dir is not None:
+                    cmd.extend(["--fem-cache-dir", str(_normalize_cli_path(fem_cache_dir))])
+                    cmd.extend(["--fem-cache-max-gb", str(fem_cache_max_gb)])
 
                 if not cgx_run:
                     cmd.append("--no-cgx-run")
@@ -80,18 +141,33 @@ class PipelineStepsService:
                 wd = workdirs[tag]
                 if wd is not None:
                     cmd.extend(["--ccx-workdir", str(_normalize_cli_path(wd))])
+                ccx_wd = _normalize_cli_path(wd) if wd is not None else self.runs_dir / case / "ccx" / tag
+                frd = ccx_wd / f"{ccx_job}.frd"
+                if tag == "ref" and ccx_run and ref_submodel_quantile is not None:
+                    # El submodelo toma BCs del FRD coarse: corre después de coarse, no en paralelo
+                    cmd[cmd.index("--backend") + 1] = "submodel"
+                    cmd.extend(["--submodel-quantile", str(ref_submodel_quantile)])
+                    cmd.extend(["--submodel-layers", str(ref_submodel_layers)])
+                    if workdirs["coarse"] is not None:
+                        cmd.extend(["--coarse-ccx-workdir", str(_normalize_cli_path(workdirs["coarse"]))])
+                    if ccx_threads:
+                        cmd.extend(["--ccx-threads", str(ccx_threads)])
+                    cmds[tag] = cmd
+                    continue
+                if ccx_run:
+                    ccx_workdirs[tag] = ccx_wd
 
                 sf = sigma_files[tag]
                 sigma_path = _normalize_cli_path(sf) if sf is not None else _default_sigma_file(case, self.runs_dir, tag)
 
                 if sigma_path.exists():
                     cmd.extend(["--sigma-file", str(sigma_path)])
-                elif ccx_run:
+                elif ccx_run or (sigma_extractor == "frd" and frd.exists()):
                     # Permite ejecutar ccx primero y que un postproceso externo deje sigma_vm.csv.
                     # Si no aparece, fallará dentro del módulo con mensaje explícito.
                     print(
                         f"ℹ️  sigma-file no existe aún para tag={tag}: {sigma_path}. "
-                        "Se intentará generar durante --fem-ccx-run."
+                        "Se intentará generar durante --fem-ccx-run o desde el .frd."
                     )
                     cmd.extend(["--sigma-file", str(sigma_path)])
                 elif auto_fallback_if_missing:
@@ -108,26 +184,182 @@ class PipelineStepsService:
                         "--backend", "fallback",
                         *self._runs_dir_args(),
                     ]
+                    ccx_workdirs.pop(tag, None)
                 else:
                     raise FileNotFoundError(
                         f"No existe sigma-file ({backend}) para tag={tag}: {sigma_path}. "
                         "Entrega --fem-sigma-*-file o activa --fem-auto-fallback."
                     )
             # backend fallback: no necesita archivos
+            cmds[tag] = cmd
+
+        if len(ccx_workdirs) < 2:
+            for tag, cmd in cmds.items():
+                if tag in ccx_workdirs and ccx_threads:
+                    cmd.extend(["--ccx-threads", str(ccx_threads)])
+                run_cmd(cmd)
+            self._report_ccx_runs(ccx_workdirs, ccx_job, fem_cache_dir is not None)
+            self._report_sigma_sources(case)
+            return
 
-            run_cmd(cmd)
+        # coarse y ref corren ccx: se reparten los cores y se lanzan a la vez
+        total = ccx_threads or os.cpu_count() or 1
+        tags = list(ccx_workdirs)
+        concurrent = ccx_policy != "sequential" and total >= len(tags)
+        if not concurrent:
+            threads = [ccx_threads] * len(tags)  # 0 = hereda el entorno (comportamiento histórico)
+        elif ccx_policy == "weighted":
+            threads = split_threads(
+                total, [_ccx_job_size(case, self.runs_dir, t, ccx_workdirs[t]) for t in tags]
+            )
+        else:
+            threads = split_threads(total, [1.0] * len(tags))
+        for tag, n in zip(tags, threads):
+            if n:
+                cmds[tag].extend(["--ccx-threads", str(n)])
+
+        plan = ", ".join(f"{t}={n or 'env'}" for t, n in zip(tags, threads))
+        mode = "concurrente" if concurrent else "secuencial"
+        print(f"FEM ccx ({ccx_policy}, {mode}, {total} threads): {plan}")
+        if concurrent:
+            run_cmds_parallel(list(cmds.values()))
+        else:
+            for cmd in cmds.values():
+                run_cmd(cmd)
+        self._report_ccx_runs(ccx_workdirs, ccx_job, fem_cache_dir is not None)
+        self._report_sigma_sources(case)
+
+    def _surrogate_ok(self, max_err: float) -> bool:
+        meta_path = sigma_ref_surrogate_json(self.runs_dir)
+        if not meta_path.exists():
+            print(f"Info: no hay surrogate de sigma_ref ({meta_path}); se calcula ref. Entrénalo con src3d.train_sigma_ref_surrogate_3d")
+            return False
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        ok = meta["val_err"] <= max_err
+        verdict = "<=" if ok else ">"
+        action = "se usa en lugar del solve ref" if ok else "se calcula ref"
+        print(f"Surrogate sigma_ref: val_err {meta['val_err']:.4f} {verdict} umbral {max_err:g} ({len(meta['cases'])} casos) -> {action}")
+        return ok
+
+    def _report_sigma_sources(self, case: str) -> None:
+        parts = []
+        for tag in ("coarse", "ref"):
+            path = sigma_source_json(case, tag, self.runs_dir)
+            if not path.exists():
+                continue
+            info = json.loads(path.read_text(encoding="utf-8"))
+            detail = "resuelto" if info.get("solved") else ("cache" if info.get("cache_hit") else "sin solve")
+            text = f"{tag}={info['source']} ({detail}, {info['wall_s']:.2f} s"
+            if info.get("time_saved_s") is not None:
+                text += f", ahorro estimado {info['time_saved_s']:.2f} s"
+            parts.append(text + ")")
+        if parts:
+            print("Fuente sigma: " + " | ".join(parts))
+
+    @staticmethod
+    def _report_ccx_runs(workdirs: dict[str, Path], ccx_job: str, cached: bool) -> None:
+        runs = {}
+        hits = {}
+        for tag, wd in workdirs.items():
+            status = wd / "fem_cache.json"
+            if cached and status.exists():
+                info = json.loads(status.read_text(encoding="utf-8"))
+                if info["status"] == "hit":
+                    hits[tag] = info
+                    continue
+            path = run_info_path(wd, ccx_job)
+            if path.exists():
+                runs[tag] = json.loads(path.read_text(encoding="utf-8"))
+        if cached:
+            saved = sum(h["ccx_wall_s"] for h in hits.values())
+            print(f"Cache FEM: {len(hits)}/{len(workdirs)} hits" + (f" (ccx evitado: {saved:.2f} s)" if hits else ""))
+        if not runs:
+            return
+        for tag, r in runs.items():
+            solver = f"{r['solver_s']:.2f} s" if r["solver_s"] is not None else "n/d"
+            print(f"Tiempo ccx {tag}: threads {r['threads'] or 'env'} | solver {solver} | pared {r['wall_s']:.2f} s")
+        span = max(r["t_end"] for r in runs.values()) - min(r["t_start"] for r in runs.values())
+        print(f"Tiempo ccx total: {span:.2f} s (suma de jobs {sum(r['wall_s'] for r in runs.values()):.2f} s)")
 
     def compute_hstar(self, case: str) -> None:
         run_cmd([self.python_exe, "-m", "src3d.compute_hstar_3d", "--case", case, *self._runs_dir_args()])
 
-    def train_model(self, case: str) -> None:
-        run_cmd([self.python_exe, "-m", "src3d.train_ml_hstar_3d", "--case", case, *self._runs_dir_args()])
+    def compute_features(self, case: str) -> None:
+        run_cmd([self.python_exe, "-m", "src3d.compute_element_features_3d", "--case", case, *self._runs_dir_args()])
+
+    def train_model(self, case: str, feature_set: str = "base") -> None:
+        run_cmd([
+            self.python_exe, "-m", "src3d.train_ml_hstar_3d",
+            "--case", case,
+            "--feature_set", feature_set,
+            *self._runs_dir_args(),
+        ])
+
+    def tune_model(self, case: str, feature_set: str = "base") -> None:
+        run_cmd([
+            self.python_exe, "-m", "src3d.tune_ml_hstar_3d",
+            "--case", case,
+            "--feature_set", feature_set,
+            *self._runs_dir_args(),
+        ])
 
     def predict_hstar(self, case: str) -> None:
         run_cmd([self.python_exe, "-m", "src3d.predict_hstar_3d", "--case", case, *self._runs_dir_args()])
 
-    def postprocess(self, case: str) -> None:
-        run_cmd([self.python_exe, "-m", "src3d.postprocess_h_pred_3d", "--case", case, *self._runs_dir_args()])
+    def postprocess(
+        self,
+        case: str,
+        target_elements: int | None = None,
+        geo_name: str = "",
+        grad_ratio: float | None = None,
+        grad_lipschitz: float | None = None,
+    ) -> None:
+        cmd = [
+            self.python_exe, "-m", "src3d.postprocess_h_pred_3d",
+            "--case", case,
+            "--geo_name", geo_name,
+            *self._runs_dir_args(),
+        ]
+        if target_elements is not None:
+            cmd.extend(["--target_elements", str(target_elements)])
+        if grad_ratio is not None:
+            cmd.extend(["--grad_ratio", str(grad_ratio)])
+        if grad_lipschitz is not None:
+            cmd.extend(["--grad_lipschitz", str(grad_lipschitz)])
+        run_cmd(cmd)
+
+    def decimate_background(self, case: str, tol: float) -> None:
+        run_cmd([
+            self.python_exe, "-m", "src3d.decimate_background_3d",
+            "--case", case,
+            "--tol", str(tol),
+            *self._runs_dir_args(),
+        ])
 
-    def export_background(self, case: str) -> None:
-        run_cmd([self.python_exe, "-m", "src3d.export_background_points_3d", "--case", case, *self._runs_dir_args()])
+    def size_error_map(self, case: str, target: str = "points", source: str = "post", k: int = 1) -> None:
+        run_cmd([
+            self.python_exe, "-m", "src3d.size_error_map_3d",
+            "--case", case,
+            "--target", target,
+            "--input", source,
+            "--k", str(k),
+            *self._runs_dir_args(),
+        ])
+
+    def export_background(
+        self,
+        case: str,
+        write_csv: bool = True,
+        source: str = "post",
+        mode: str = "points",
+        grid_n: int = 64,
+    ) -> None:
+        run_cmd([
+            self.python_exe, "-m", "src3d.export_background_points_3d",
+            "--case", case,
+            "--mode", mode,
+            "--grid-n", str(grid_n),
+            "--input", source,
+            "--csv" if write_csv else "--no-csv",
+            *self._runs_dir_args(),
+        ])
@@ -16,3 +16,16 @@ def run_cmd(cmd: list[str], cwd: Path | None = None) -> None:
     proc = subprocess.run(cmd, cwd=str(cwd) if cwd else None, check=False)
     if proc.returncode != 0:
         raise RuntimeError(f"Comando falló ({proc.returncode}): {printable}")
+
+
+def run_cmds_parallel(cmds: list[list[str]], cwd: Path | None = None) -> None:
+    """Lanza todos los comandos a la vez y espera a que terminen; falla si alguno falló."""
+    procs = []
+    for cmd in cmds:
+        print(f"\n[cmd &] {_pretty(cmd)}")
+        procs.append(subprocess.Popen(cmd, cwd=str(cwd) if cwd else None))
+    failed = [(p.wait(), cmd) for p, cmd in zip(procs, cmds)]
+    failed = [(rc, cmd) for rc, cmd in failed if rc != 0]
+    if failed:
+        rc, cmd = failed[0]
+        raise RuntimeError(f"Comando falló ({rc}): {_pretty(cmd)}" + (f" (+{len(failed) - 1} más)" if len(failed) > 1 else ""))
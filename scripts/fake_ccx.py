@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# scripts/fake_ccx.py
+"""
+Reemplazo de `ccx` para probar el paso FEM sin CalculiX instalado:
+
+    python -m mesh_app run ... --sigma-mode fem --fem-backend calculix --fem-ccx-run \
+        --fem-ccx-exe scripts/fake_ccx.py --fem-ccx-threads 8
+
+Acepta `-i <job>`, lee <job>.inp (sigue *INCLUDE), "resuelve" durmiendo
+FAKE_CCX_SECONDS_PER_MELEM * elementos / 1e6 / OMP_NUM_THREADS segundos
+(sin usar CPU, así el solapamiento de jobs se ve aun con un solo core) y
+escribe <job>.frd con bloques DISP y STRESS sintéticos, <job>.dat vacío y un
+resumen al estilo ccx con "Total CalculiX Time". Con FAKE_CCX_FAIL=1 sale con error.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src3d.fem.frd_reader import DISP_COMPONENTS, STRESS_COMPONENTS  # noqa: E402
+from src3d.fem.inp_reader import read_inp  # noqa: E402
+
+
+def synthetic_stress(xyz: np.ndarray) -> np.ndarray:
+    """Flexión en z más una concentración cerca de la cara z-min (donde se empotra por defecto)."""
+    lo, hi = xyz.min(axis=0), xyz.max(axis=0)
+    u = (xyz - lo) / np.where(hi > lo, hi - lo, 1.0)
+    hot = np.exp(-((u[:, 2] / 0.15) ** 2))
+    szz = 100.0 * (u[:, 0] - 0.5) * (1.0 - u[:, 2]) + 150.0 * hot
+    return np.column_stack([0.3 * szz, 0.1 * szz, szz, 10.0 * hot, 5.0 * u[:, 1], 5.0 * u[:, 0]])
+
+
+def synthetic_disp(xyz: np.ndarray) -> np.ndarray:
+    """Flexión en x creciendo con z (cero en la cara z-min empotrada)."""
+    lo, hi = xyz.min(axis=0), xyz.max(axis=0)
+    u = (xyz - lo) / np.where(hi > lo, hi - lo, 1.0)
+    return 1e-3 * np.column_stack([u[:, 2] ** 2, 0.1 * u[:, 2] * u[:, 0], -0.3 * u[:, 2]])
+
+
+def write_frd(path: Path, node_ids: np.ndarray, xyz: np.ndarray, disp: np.ndarray, stress: np.ndarray) -> None:
+    n = len(node_ids)
+    with path.open("wb") as f:
+        f.write(b"    1C\n    1UUSER\n")
+        f.write(f"    2C{n:>24d}{1:>37d}\n".encode())
+        np.savetxt(f, np.column_stack([node_ids, xyz]), fmt=" -1%10d%12.5E%12.5E%12.5E")
+        f.write(b" -3\n")
+        f.write(b"    1PSTEP                1           1           1\n")
+        for name, comps, vals, ctype in (("DISP", DISP_COMPONENTS + ["ALL"], disp, 2), ("STRESS", STRESS_COMPONENTS, stress, 4)):
+            f.write(f"  100CL  101 1.00000E+00{n:>12d}{'':20s} 0{1:>5d}{'':10s}{1:>2d}\n".encode())
+            f.write(f" -4  {name:<8s}{len(comps):>5d}    1\n".encode())
+            for k, c in enumerate(comps):
+                exist = 1 if c == "ALL" else 0
+                f.write(f" -5  {c:<8s}{1:>5d}{ctype:>5d}{k + 1:>5d}{0:>5d}{exist:>5d}\n".encode())
+            np.savetxt(f, np.column_stack([node_ids, vals]), fmt=" -1%10d" + "%12.5E" * vals.shape[1])
+            f.write(b" -3\n")
+        f.write(b" 9999\n")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="ccx falso para pruebas del paso FEM")
+    ap.add_argument("-i", dest="job", required=True)
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    threads = int(os.environ.get("OMP_NUM_THREADS", "1") or 1)
+    solver_threads = os.environ.get("CCX_NPROC_EQUATION_SOLVER", "")
+    print(f"fake ccx: job={args.job} pid={os.getpid()} OMP_NUM_THREADS={threads} CCX_NPROC_EQUATION_SOLVER={solver_threads}")
+    if os.environ.get("FAKE_CCX_FAIL") == "1":
+        print("*ERROR: FAKE_CCX_FAIL=1")
+        return 201
+
+    mesh = read_inp(Path(f"{args.job}.inp"))
+    n_elems = int(mesh.solid_element_ids().size)
+    work = float(os.environ.get("FAKE_CCX_SECONDS_PER_MELEM", "20")) * n_elems / 1e6
+    time.sleep(work / max(threads, 1))
+
+    xyz = mesh.node_xyz
+    write_frd(Path(f"{args.job}.frd"), mesh.node_ids, xyz, synthetic_disp(xyz), synthetic_stress(xyz))
+    Path(f"{args.job}.dat").write_text("", encoding="utf-8")
+    print(f"fake ccx: {len(mesh.node_ids)} nodos, {n_elems} elementos")
+    print(f" Total CalculiX Time: {time.perf_counter() - t0:.6f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
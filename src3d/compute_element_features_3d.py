@@ -0,0 +1,201 @@
+# src3d/compute_element_features_3d.py
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from src3d.mesh_graph_3d import (
+    TetGraph,
+    build_tet_graph,
+    neighbor_reduce_max,
+    tet_connectivity,
+    with_self_loops,
+)
+from src3d.parquet_io_3d import read_columns
+from src3d.paths3d import (
+    element_features_parquet,
+    ensure_case_dirs,
+    geometry_parquet,
+    node_coords_parquet,
+    sigma_vm_parquet,
+)
+
+BASE_FEATURES = ["cx", "cy", "cz", "h_cbrtV", "sigma_vm_coarse"]
+NEIGHBOR_FEATURES = [
+    "nb_sigma_mean",
+    "nb_sigma_max",
+    "nb_sigma_std",
+    "grad_sigma_mag",
+    "dist_boundary",
+]
+FEATURE_SETS = {
+    "base": BASE_FEATURES,
+    "neighbors": BASE_FEATURES + NEIGHBOR_FEATURES,
+}
+
+
+def neighbor_sigma_stats(graph: TetGraph, sigma: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Media, máximo y desviación estándar de sigma en el vecindario cerrado (tet + vecinos por cara)."""
+    closed = with_self_loops(graph.adj)
+    count = np.asarray(closed.sum(axis=1)).ravel()
+    s1 = closed @ sigma
+    s2 = closed @ (sigma * sigma)
+    mean = s1 / count
+    var = np.maximum(s2 / count - mean * mean, 0.0)
+    return mean, neighbor_reduce_max(closed, sigma), np.sqrt(var)
+
+
+def sigma_gradient_magnitude(graph: TetGraph, centers: np.ndarray, sigma: np.ndarray) -> np.ndarray:
+    """
+    |grad sigma| por mínimos cuadrados sobre los vecinos por cara:
+    resuelve (sum d d^T) g = sum d * dsigma para todos los tets a la vez.
+    """
+    coo = graph.adj.tocoo()
+    i, j = coo.row, coo.col
+    m = graph.n_elems
+
+    d = centers[j] - centers[i]
+    ds = sigma[j] - sigma[i]
+
+    A = np.empty((m, 3, 3))
+    b = np.empty((m, 3))
+    for a in range(3):
+        b[:, a] = np.bincount(i, weights=d[:, a] * ds, minlength=m)
+        for c in range(a, 3):
+            A[:, a, c] = np.bincount(i, weights=d[:, a] * d[:, c], minlength=m)
+            A[:, c, a] = A[:, a, c]
+
+    # Regularización mínima: tets con <3 vecinos (o vecinos coplanares) no son invertibles
+    tr = np.trace(A, axis1=1, axis2=2)
+    reg = 1e-9 * tr / 3.0 + 1e-30
+    A += reg[:, None, None] * np.eye(3)[None, :, :]
+
+    g = np.linalg.solve(A, b[:, :, None])[:, :, 0]
+    return np.linalg.norm(g, axis=1)
+
+
+def distance_to_boundary(graph: TetGraph, centers: np.ndarray, nodes: pd.DataFrame) -> np.ndarray:
+    """Distancia de cada centroide al centroide de cara de borde más cercano (KD-tree)."""
+    node_ids = nodes["node_id"].to_numpy(dtype=np.int64)
+    xyz = nodes[["x", "y", "z"]].to_numpy(dtype=float)
+    id_to_idx = np.full(int(node_ids.max()) + 1, -1, dtype=np.int64)
+    id_to_idx[node_ids] = np.arange(node_ids.size, dtype=np.int64)
+
+    face_idx = id_to_idx[graph.boundary_faces]
+    if (face_idx < 0).any():
+        raise ValueError("Caras de borde refieren nodos que no están en la tabla de nodos.")
+    face_centers = xyz[face_idx].mean(axis=1)
+
+    # Las caras de borde son casi coplanares: sin compactar las cajas del árbol
+    # la poda es mucho más efectiva para centroides interiores.
+    tree = cKDTree(face_centers, balanced_tree=False, compact_nodes=False)
+    dist, _ = tree.query(centers, k=1, workers=-1)
+    return dist
+
+
+def compute_features(geom: pd.DataFrame, nodes: pd.DataFrame, sigma_coarse: np.ndarray) -> pd.DataFrame:
+    """Features de vecindario para cada tet (mismo orden que `geom`)."""
+    centers = geom[["cx", "cy", "cz"]].to_numpy(dtype=float)
+    sigma = np.asarray(sigma_coarse, dtype=float)
+
+    graph = build_tet_graph(tet_connectivity(geom))
+
+    nb_mean, nb_max, nb_std = neighbor_sigma_stats(graph, sigma)
+
+    return pd.DataFrame(
+        {
+            "elem_id": geom["elem_id"].to_numpy(dtype=np.int64),
+            "nb_sigma_mean": nb_mean,
+            "nb_sigma_max": nb_max,
+            "nb_sigma_std": nb_std,
+            "grad_sigma_mag": sigma_gradient_magnitude(graph, centers, sigma),
+            "dist_boundary": distance_to_boundary(graph, centers, nodes),
+        }
+    )
+
+
+def attach_element_features(
+    df: pd.DataFrame,
+    feats: list[str],
+    case: str,
+    runs_dir: Path | str,
+    tag: str = "",
+) -> pd.DataFrame:
+    """
+    Agrega a `df` (por elem_id) las features que falten y existan en el cache
+    element_features_3d.parquet. Si no hace falta ninguna, devuelve `df` tal cual.
+    """
+    missing = [c for c in feats if c not in df.columns]
+    if not missing:
+        return df
+
+    path = element_features_parquet(case, tag, runs_dir)
+    if not path.exists():
+        raise FileNotFoundError(
+            f"Faltan features {missing} y no existe {path}. "
+            "Corre primero: python -m src3d.compute_element_features_3d --case <case>"
+        )
+    extra = read_columns(path, ["elem_id", *missing])
+    out = df.merge(extra, on="elem_id", how="left")
+    if out[missing].isna().any().any():
+        raise RuntimeError(f"Features {missing} no cubren todos los elem_id de {path}")
+    return out
+
+
+def _is_fresh(out: Path, inputs: list[Path]) -> bool:
+    if not out.exists():
+        return False
+    t_out = out.stat().st_mtime
+    return all(p.exists() and p.stat().st_mtime <= t_out for p in inputs)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--case", required=True)
+    ap.add_argument("--runs-dir", default="runs")
+    ap.add_argument("--geom_tag", default="", help="tag de geometría: '' o 'adapt'")
+    ap.add_argument("--force", action="store_true", help="Recalcula aunque el cache esté al día")
+    args = ap.parse_args()
+
+    ensure_case_dirs(args.case, args.runs_dir)
+
+    geom_path = geometry_parquet(args.case, args.geom_tag, args.runs_dir)
+    nodes_path = node_coords_parquet(args.case, args.geom_tag, args.runs_dir)
+    sigma_path = sigma_vm_parquet(args.case, "coarse", args.runs_dir)
+    out = element_features_parquet(args.case, args.geom_tag, args.runs_dir)
+
+    if not args.force and _is_fresh(out, [geom_path, nodes_path, sigma_path]):
+        print(f"OK: features al día (cache): {out}")
+        return
+
+    if not nodes_path.exists():
+        raise FileNotFoundError(
+            f"No existe {nodes_path}. Recalcula la geometría con src3d.compute_element_geometry_3d."
+        )
+
+    geom = read_columns(geom_path, ["elem_id", "n0", "n1", "n2", "n3", "cx", "cy", "cz"])
+    nodes = read_columns(nodes_path, ["node_id", "x", "y", "z"])
+    sigma = read_columns(sigma_path, ["elem_id", "sigma_vm"]).rename(columns={"sigma_vm": "sigma_vm_coarse"})
+
+    geom = geom.merge(sigma, on="elem_id", how="inner")
+    if len(geom) == 0:
+        raise RuntimeError("Merge geometría+sigma vacío: revisa elem_id.")
+
+    t0 = time.perf_counter()
+    feats = compute_features(geom, nodes, geom["sigma_vm_coarse"].to_numpy(dtype=float))
+    dt = time.perf_counter() - t0
+
+    feats.to_parquet(out, index=False)
+
+    print(f"OK: guardado features de {len(feats)} tets en: {out}")
+    print(f"tiempo features: {dt:.3f} s ({dt / max(len(feats), 1) * 1e6:.3f} s por millón de elementos)")
+    print(feats.head(8).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,78 @@
 # src3d/compute_element_geometry_3d.py
 from __future__ import annotations
 import argparse
+from pathlib import Path
+
 import numpy as np
 import pandas as pd
 
-from src3d.paths3d import ensure_case_dirs, geometry_parquet
+from src3d.paths3d import ensure_case_dirs, geometry_parquet, node_coords_parquet
 from src3d.read_mesh_3d import read_msh2_3d
 
-def tet_volume(p1, p2, p3, p4) -> float:
-    a = np.array(p2) - np.array(p1)
-    b = np.array(p3) - np.array(p1)
-    c = np.array(p4) - np.array(p1)
-    return float(abs(np.linalg.det(np.vstack([a, b, c]).T)) / 6.0)
+def tet_geometry_frame(
+    node_ids: np.ndarray,
+    node_xyz: np.ndarray,
+    elem_ids: np.ndarray,
+    conn: np.ndarray,
+) -> pd.DataFrame:
+    """
+    Misma tabla que el loop por elemento, pero vectorizada sobre arreglos:
+    node_ids (N,), node_xyz (N,3), elem_ids (M,), conn (M,4) con ids de nodo.
+    """
+    node_ids = np.asarray(node_ids, dtype=np.int64)
+    conn = np.asarray(conn, dtype=np.int64)
+    id_to_idx = np.full(int(node_ids.max()) + 1, -1, dtype=np.int64)
+    id_to_idx[node_ids] = np.arange(node_ids.size, dtype=np.int64)
+    idx = id_to_idx[conn]
+    if (idx < 0).any():
+        raise ValueError("La conectividad refiere nodos inexistentes.")
+
+    xyz = np.asarray(node_xyz, dtype=float)
+    p1, p2, p3, p4 = (xyz[idx[:, k]] for k in range(4))
+
+    c = (p1 + p2 + p3 + p4) / 4.0
+    vol = np.abs(np.linalg.det(np.stack([p2 - p1, p3 - p1, p4 - p1], axis=2))) / 6.0
+
+    # 6 aristas
+    edges = [
+        np.linalg.norm(q - p, axis=1)
+        for p, q in ((p1, p2), (p1, p3), (p1, p4), (p2, p3), (p2, p4), (p3, p4))
+    ]
+    sum_e2 = sum(e**2 for e in edges)
+    pos = vol > 0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        quality = np.where(pos & (sum_e2 > 0), vol ** (2.0 / 3.0) / sum_e2, 0.0)
+
+    return pd.DataFrame(
+        {
+            "elem_id": np.asarray(elem_ids, dtype=np.int64),
+            "n0": conn[:, 0], "n1": conn[:, 1], "n2": conn[:, 2], "n3": conn[:, 3],
+            "cx": c[:, 0], "cy": c[:, 1], "cz": c[:, 2],
+            "volume": vol,
+            "h_cbrtV": np.where(pos, vol ** (1.0 / 3.0), 0.0),
+            "h_mean_edge": sum(edges) / 6.0,
+            "quality": quality,
+        }
+    )
+
+
+def save_geometry(
+    df: pd.DataFrame,
+    nodes_df: pd.DataFrame,
+    case: str,
+    tag: str = "",
+    runs_dir: Path | str = "runs",
+) -> tuple[Path, Path]:
+    """Guarda la tabla de tets y la de nodos (node_id, x, y, z) del caso/tag."""
+    out = geometry_parquet(case, tag, runs_dir)
+    df.to_parquet(out, index=False)
+
+    # Coordenadas nodales: las usan las features de vecindario (caras de borde)
+    out_nodes = node_coords_parquet(case, tag, runs_dir)
+    nodes_df.to_parquet(out_nodes, index=False)
+    return out, out_nodes
 
-def dist(p, q) -> float:
-    p = np.array(p); q = np.array(q)
-    return float(np.linalg.norm(p - q))
 
 def main():
     ap = argparse.ArgumentParser()
@@ -29,48 +86,18 @@ def main():
 
     mesh = read_msh2_3d(args.msh)
 
-    rows = []
-    for eid, n1, n2, n3, n4 in mesh.tets:
-        p1 = mesh.nodes[n1]
-        p2 = mesh.nodes[n2]
-        p3 = mesh.nodes[n3]
-        p4 = mesh.nodes[n4]
-
-        cx = (p1[0] + p2[0] + p3[0] + p4[0]) / 4.0
-        cy = (p1[1] + p2[1] + p3[1] + p4[1]) / 4.0
-        cz = (p1[2] + p2[2] + p3[2] + p4[2]) / 4.0
-
-        vol = tet_volume(p1, p2, p3, p4)
-
-        # 6 edges
-        e12 = dist(p1, p2)
-        e13 = dist(p1, p3)
-        e14 = dist(p1, p4)
-        e23 = dist(p2, p3)
-        e24 = dist(p2, p4)
-        e34 = dist(p3, p4)
-        sum_e2 = e12**2 + e13**2 + e14**2 + e23**2 + e24**2 + e34**2
-
-        h_cbrtV = float(vol ** (1.0/3.0)) if vol > 0 else 0.0
-        h_mean_edge = float((e12 + e13 + e14 + e23 + e24 + e34) / 6.0)
-
-        quality = float((vol ** (2.0/3.0)) / sum_e2) if (vol > 0 and sum_e2 > 0) else 0.0
-
-        rows.append({
-            "elem_id": int(eid),
-            "n0": n1, "n1": n2, "n2": n3, "n3": n4,
-            "cx": cx, "cy": cy, "cz": cz,
-            "volume": vol,
-            "h_cbrtV": h_cbrtV,
-            "h_mean_edge": h_mean_edge,
-            "quality": quality,
-        })
+    node_ids = np.fromiter(mesh.nodes.keys(), dtype=np.int64, count=len(mesh.nodes))
+    node_xyz = np.array(list(mesh.nodes.values()), dtype=float).reshape(-1, 3)
+    tets = np.array(mesh.tets, dtype=np.int64).reshape(-1, 5)
 
-    df = pd.DataFrame(rows)
-    out = geometry_parquet(args.case, args.tag, args.runs_dir)
-    df.to_parquet(out, index=False)
+    df = tet_geometry_frame(node_ids, node_xyz, tets[:, 0], tets[:, 1:])
+    nodes_df = pd.DataFrame(
+        {"node_id": node_ids, "x": node_xyz[:, 0], "y": node_xyz[:, 1], "z": node_xyz[:, 2]}
+    )
+    out, out_nodes = save_geometry(df, nodes_df, args.case, args.tag, args.runs_dir)
 
     print(f"OK: guardado {len(df)} tets en: {out}")
+    print(f"OK: guardado {len(nodes_df)} nodos en: {out_nodes}")
     print(df.head(8).to_string(index=False))
 
 if __name__ == "__main__":
@@ -2,8 +2,8 @@
 from __future__ import annotations
 import argparse
 import numpy as np
-import pandas as pd
 
+from src3d.parquet_io_3d import read_columns
 from src3d.paths3d import (
     ensure_case_dirs,
     geometry_parquet,
@@ -25,9 +25,10 @@ def main():
 
     case_dir, gmsh_dir, models_dir = ensure_case_dirs(args.case, args.runs_dir)
 
-    geom = pd.read_parquet(geometry_parquet(args.case, args.geom_tag, args.runs_dir)).copy()
-    sc = pd.read_parquet(sigma_vm_parquet(args.case, "coarse", args.runs_dir)).rename(columns={"sigma_vm": "sigma_vm_coarse"})
-    sr = pd.read_parquet(sigma_vm_parquet(args.case, "ref", args.runs_dir)).rename(columns={"sigma_vm": "sigma_vm_ref"})
+    # El dataset conserva toda la geometría (el surrogate de sigma ref usa n0..n3)
+    geom = read_columns(geometry_parquet(args.case, args.geom_tag, args.runs_dir))
+    sc = read_columns(sigma_vm_parquet(args.case, "coarse", args.runs_dir), ["elem_id", "sigma_vm"]).rename(columns={"sigma_vm": "sigma_vm_coarse"})
+    sr = read_columns(sigma_vm_parquet(args.case, "ref", args.runs_dir), ["elem_id", "sigma_vm"]).rename(columns={"sigma_vm": "sigma_vm_ref"})
 
     df = geom.merge(sc, on="elem_id", how="inner").merge(sr, on="elem_id", how="inner")
     if len(df) == 0:
@@ -0,0 +1,174 @@
+# src3d/content_cache_3d.py
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+_MANIFEST = "manifest.json"
+_USED = ".used"
+
+
+def hash_bytes(*chunks: bytes | str) -> str:
+    """sha256 de una secuencia de bloques (str se codifica en UTF-8), separados para evitar colisiones por concatenación."""
+    h = hashlib.sha256()
+    for c in chunks:
+        b = c.encode("utf-8") if isinstance(c, str) else c
+        h.update(len(b).to_bytes(8, "little"))
+        h.update(b)
+    return h.hexdigest()
+
+
+def hash_file(path: Path, block: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        for chunk in iter(lambda: f.read(block), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def link_or_copy(src: Path, dst: Path) -> str:
+    """Hardlink src -> dst (reemplazando dst); si el FS no lo permite, copia. Devuelve 'link' o 'copy'."""
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    # Nunca escribir sobre dst: podría ser un hardlink a otra entrada del cache
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+        return "link"
+    except OSError:
+        shutil.copy2(src, dst)
+        return "copy"
+
+
+class ContentCache:
+    """
+    Cache de archivos direccionado por contenido en `root/<key>/`.
+
+    - Las entradas se arman en un directorio temporal y se publican con un
+      rename atómico: un lector nunca ve una entrada a medias.
+    - Un lock por archivo (O_CREAT|O_EXCL, portable) serializa publicación,
+      lectura y desalojo entre procesos paralelos.
+    - El manifiesto guarda tamaño y mtime de cada archivo; si una entrada fue
+      modificada (p.ej. escribiendo sobre un hardlink) se descarta.
+    - max_bytes acota el tamaño total desalojando por LRU (mtime de `.used`).
+    """
+
+    def __init__(self, root: Path | str, max_bytes: int, lock_timeout: float = 120.0, stale_lock: float = 600.0):
+        self.root = Path(root)
+        self.max_bytes = int(max_bytes)
+        self.lock_timeout = lock_timeout
+        self.stale_lock = stale_lock
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Lock del cache entre procesos; también sirve para serializar archivos propios en `root` (p.ej. logs)."""
+        path = self.root / ".lock"
+        t0 = time.monotonic()
+        while True:
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - path.stat().st_mtime > self.stale_lock:
+                        # Lock huérfano (proceso muerto): se libera
+                        path.unlink(missing_ok=True)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.monotonic() - t0 > self.lock_timeout:
+                    raise TimeoutError(f"No se pudo tomar el lock del cache: {path}")
+                time.sleep(0.05)
+        try:
+            os.write(fd, str(os.getpid()).encode("ascii"))
+            yield
+        finally:
+            os.close(fd)
+            path.unlink(missing_ok=True)
+
+    def _entry(self, key: str) -> Path:
+        return self.root / key
+
+    @staticmethod
+    def _valid(entry: Path) -> bool:
+        try:
+            manifest = json.loads((entry / _MANIFEST).read_text(encoding="utf-8"))
+            for name, (size, mtime_ns) in manifest["files"].items():
+                st = (entry / name).stat()
+                if st.st_size != size or st.st_mtime_ns != mtime_ns:
+                    return False
+            return True
+        except (OSError, ValueError, KeyError):
+            return False
+
+    def get(self, key: str, dests: dict[str, Path]) -> bool:
+        """Si la entrada existe y está íntegra, enlaza/copia sus archivos a `dests` (nombre -> destino)."""
+        entry = self._entry(key)
+        with self.lock():
+            if not entry.is_dir():
+                return False
+            if not self._valid(entry) or any(not (entry / n).exists() for n in dests):
+                shutil.rmtree(entry, ignore_errors=True)
+                return False
+            for name, dst in dests.items():
+                link_or_copy(entry / name, dst)
+            (entry / _USED).touch()
+        return True
+
+    def put(self, key: str, files: dict[str, Path]) -> None:
+        """Publica una entrada copiando `files` (nombre -> origen). Si otra ejecución ya la publicó, no hace nada."""
+        tmp = Path(tempfile.mkdtemp(prefix=".tmp-", dir=self.root))
+        os.chmod(tmp, 0o755)  # mkdtemp crea 0700; el cache puede ser compartido
+        try:
+            manifest = {}
+            for name, src in files.items():
+                # Copia (no hardlink): el caso puede reescribir sus archivos después
+                shutil.copy2(src, tmp / name)
+                st = (tmp / name).stat()
+                manifest[name] = [st.st_size, st.st_mtime_ns]
+            (tmp / _MANIFEST).write_text(json.dumps({"files": manifest}, indent=2), encoding="utf-8")
+            (tmp / _USED).touch()
+
+            with self.lock():
+                entry = self._entry(key)
+                if not entry.exists():
+                    os.replace(tmp, entry)
+                self._evict()
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        out = []
+        for entry in self.root.iterdir():
+            if not entry.is_dir() or entry.name.startswith("."):
+                continue
+            size = sum(p.stat().st_size for p in entry.iterdir() if p.is_file())
+            try:
+                used = (entry / _USED).stat().st_mtime
+            except FileNotFoundError:
+                used = 0.0
+            out.append((used, size, entry))
+        return out
+
+    def _evict(self) -> list[Path]:
+        """Desaloja entradas menos usadas hasta que el total quede <= max_bytes (llamar con el lock tomado)."""
+        entries = sorted(self._entries(), key=lambda t: t[0])
+        total = sum(size for _, size, _ in entries)
+        removed = []
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed.append(entry)
+        return removed
+
+    def total_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
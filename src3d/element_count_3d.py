@@ -0,0 +1,107 @@
+# src3d/element_count_3d.py
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Volumen de un tetraedro regular de arista h: h^3 / (6 sqrt(2))
+REGULAR_TET_VOLUME = 1.0 / (6.0 * np.sqrt(2.0))
+
+LOG_COLUMNS = [
+    "timestamp",
+    "case",
+    "geo",
+    "bg_mode",
+    "mesh_profile",
+    "target",
+    "n_est_raw",
+    "calib",
+    "n_est",
+    "n_actual",
+    "ratio_actual_raw",
+]
+
+
+def estimate_element_count(volume: np.ndarray, h: np.ndarray, calib: float = 1.0) -> float:
+    """
+    N ≈ calib * sum_i V_i / (c h_i^3), con c el volumen de un tet regular de arista 1:
+    cada tet coarse aporta cuántos tets de arista h_i caben en su volumen.
+    """
+    h = np.asarray(h, dtype=float)
+    return float(calib * np.sum(np.asarray(volume, dtype=float) / (REGULAR_TET_VOLUME * h**3)))
+
+
+def scale_to_target(
+    volume: np.ndarray,
+    h: np.ndarray,
+    target: float,
+    hmin: float,
+    hmax: float,
+    calib: float = 1.0,
+    rtol: float = 1e-3,
+    max_iter: int = 100,
+) -> tuple[np.ndarray, float, float]:
+    """
+    Busca s tal que N(clip(s*h, hmin, hmax)) = target por bisección en log(s)
+    (N es monótona decreciente en s). Si el target no es alcanzable dentro de
+    [hmin, hmax] devuelve el extremo más cercano. Devuelve (h_escalado, s, N).
+    """
+    h = np.asarray(h, dtype=float)
+
+    def count(s: float) -> float:
+        return estimate_element_count(volume, np.clip(s * h, hmin, hmax), calib)
+
+    lo, hi = np.log(hmin / h.max()), np.log(hmax / h.min())
+    if count(np.exp(lo)) <= target:
+        s = float(np.exp(lo))
+    elif count(np.exp(hi)) >= target:
+        s = float(np.exp(hi))
+    else:
+        for _ in range(max_iter):
+            mid = 0.5 * (lo + hi)
+            n = count(np.exp(mid))
+            if abs(n - target) <= rtol * target:
+                break
+            if n > target:
+                lo = mid
+            else:
+                hi = mid
+        s = float(np.exp(mid))
+    h_scaled = np.clip(s * h, hmin, hmax)
+    return h_scaled, s, estimate_element_count(volume, h_scaled, calib)
+
+
+def load_calibration(log_csv: Path, geo: str) -> tuple[float, int]:
+    """Mediana de n_actual / n_est_raw en corridas previas del mismo .geo (1.0 si no hay historia)."""
+    if not Path(log_csv).exists():
+        return 1.0, 0
+    log = pd.read_csv(log_csv)
+    rows = log[(log["geo"] == geo) & (log["ratio_actual_raw"] > 0)]
+    if rows.empty:
+        return 1.0, 0
+    return float(rows["ratio_actual_raw"].median()), int(len(rows))
+
+
+def write_estimate(path: Path, estimate: dict) -> None:
+    Path(path).write_text(json.dumps(estimate, indent=2), encoding="utf-8")
+
+
+def log_estimate_vs_actual(log_csv: Path, estimate_json: Path, n_actual: int, **extra) -> dict:
+    """Agrega al log (CSV) la estimación previa al remallado y el conteo real de la malla adapt."""
+    est = json.loads(Path(estimate_json).read_text(encoding="utf-8"))
+    row = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        **{k: est.get(k) for k in ("case", "geo", "target", "n_est_raw", "calib", "n_est")},
+        **extra,
+        "n_actual": int(n_actual),
+        "ratio_actual_raw": n_actual / est["n_est_raw"] if est.get("n_est_raw") else np.nan,
+    }
+    log_csv = Path(log_csv)
+    pd.DataFrame([row], columns=LOG_COLUMNS).to_csv(
+        log_csv, mode="a", header=not log_csv.exists(), index=False
+    )
+    return row
@@ -2,47 +2,298 @@
 from __future__ import annotations
 import argparse
 from pathlib import Path
+import numpy as np
 import pandas as pd
+from scipy import sparse
+from scipy.spatial import cKDTree
 
+from src3d.parquet_io_3d import read_columns
 from src3d.paths3d import (
     ensure_case_dirs,
+    geometry_parquet,
+    h_pred_decimated_parquet,
     h_pred_post_parquet,
+    node_coords_parquet,
     background_csv_path,
     background_pos_path,
+    background_grid_path,
+    background_nodes_pos_path,
+    background_tets_pos_path,
 )
 
-def write_pos(points_df: pd.DataFrame, out_pos: Path) -> None:
-    lines = []
-    lines.append('View "background_points_3d" {')
-    for _, r in points_df.iterrows():
-        x = float(r["x"]); y = float(r["y"]); z = float(r["z"]); h = float(r["h"])
-        lines.append(f"  SP({x},{y},{z}){{{h}}};")
-    lines.append("};")
-    out_pos.write_text("\n".join(lines), encoding="utf-8")
+_SP_LINE = "  SP(%r,%r,%r){%r};\n"
+_SS_LINE = "  SS(" + ",".join(["%r"] * 12) + "){%r,%r,%r,%r};\n"
+
+
+def write_pos(points_df: pd.DataFrame, out_pos: Path, chunk_size: int = 100_000) -> None:
+    """
+    Escribe la vista SP de Gmsh en bloques de `chunk_size` puntos.
+
+    Cada bloque se formatea con una sola operación % sobre floats de Python
+    (repr, igual que el f-string original) y se escribe directo al archivo,
+    así la memoria queda acotada por el bloque y no por el total de puntos.
+    """
+    data = points_df[["x", "y", "z", "h"]].to_numpy(dtype=float)
+    with out_pos.open("w", encoding="utf-8") as f:
+        f.write('View "background_points_3d" {\n')
+        for start in range(0, data.shape[0], chunk_size):
+            block = data[start : start + chunk_size]
+            f.write((_SP_LINE * block.shape[0]) % tuple(block.ravel().tolist()))
+        f.write("};")
+
+
+def nodal_sizes(conn_idx: np.ndarray, h_elem: np.ndarray, n_nodes: int) -> np.ndarray:
+    """Promedio de h por nodo sobre los tets que lo contienen (scatter-add con bincount)."""
+    flat = conn_idx.ravel()
+    acc = np.bincount(flat, weights=np.repeat(h_elem, conn_idx.shape[1]), minlength=n_nodes)
+    cnt = np.bincount(flat, minlength=n_nodes)
+    return acc / np.maximum(cnt, 1)
+
+
+def write_pos_tets(
+    node_xyz: np.ndarray,
+    conn_idx: np.ndarray,
+    h_node: np.ndarray,
+    out_pos: Path,
+    chunk_size: int = 50_000,
+) -> None:
+    """
+    Escribe una vista SS (escalar en tetraedros) con tamaños nodales: Gmsh
+    interpola dentro de cada tet en vez de buscar puntos dispersos.
+    """
+    with out_pos.open("w", encoding="utf-8") as f:
+        f.write('View "background_tets_3d" {\n')
+        for start in range(0, conn_idx.shape[0], chunk_size):
+            c = conn_idx[start : start + chunk_size]
+            block = np.hstack([node_xyz[c].reshape(-1, 12), h_node[c]])
+            f.write((_SS_LINE * block.shape[0]) % tuple(block.ravel().tolist()))
+        f.write("};")
+
+
+def volume_weighted_nodal_sizes(conn_idx: np.ndarray, h_elem: np.ndarray, vol: np.ndarray, n_nodes: int) -> np.ndarray:
+    """
+    h por nodo ponderado por volumen: sum_e(V_e h_e) / sum_e(V_e) sobre los tets del nodo,
+    como un producto matriz dispersa (nodos x tets) por vector.
+    """
+    m, k = conn_idx.shape
+    P = sparse.csr_matrix(
+        (np.repeat(vol, k), (conn_idx.ravel(), np.repeat(np.arange(m), k))),
+        shape=(n_nodes, m),
+    )
+    wsum = P @ np.ones(m)
+    return (P @ h_elem) / np.maximum(wsum, 1e-300)
+
+
+def _load_coarse_field(
+    case: str, runs_dir: Path | str, columns: list[str], mode: str
+) -> tuple[pd.DataFrame, pd.DataFrame, np.ndarray]:
+    """Geometría coarse + h_post alineados por elem_id, nodos y conectividad como índices de fila."""
+    geom = read_columns(geometry_parquet(case, "", runs_dir), ["elem_id", "n0", "n1", "n2", "n3", *columns])
+    nodes_path = node_coords_parquet(case, "", runs_dir)
+    if not nodes_path.exists():
+        raise FileNotFoundError(
+            f"No existe {nodes_path}. Recalcula la geometría con src3d.compute_element_geometry_3d."
+        )
+    nodes = read_columns(nodes_path, ["node_id", "x", "y", "z"])
+    hp = read_columns(h_pred_post_parquet(case, runs_dir), ["elem_id", "h_post"])
+
+    df = geom.merge(hp, on="elem_id", how="inner")
+    if len(df) != len(geom):
+        raise RuntimeError(
+            f"h_post cubre {len(df)} de {len(geom)} tets; el modo {mode} necesita todos los elementos."
+        )
+
+    node_ids = nodes["node_id"].to_numpy(dtype=np.int64)
+    id_to_idx = np.full(int(node_ids.max()) + 1, -1, dtype=np.int64)
+    id_to_idx[node_ids] = np.arange(node_ids.size, dtype=np.int64)
+    conn_idx = id_to_idx[df[["n0", "n1", "n2", "n3"]].to_numpy(dtype=np.int64)]
+    if (conn_idx < 0).any():
+        raise ValueError("La conectividad refiere nodos que no están en node_coords_3d.parquet")
+    return df, nodes, conn_idx
+
+
+def centroid_background(case: str, runs_dir: Path | str = "runs", source: str = "post") -> tuple[np.ndarray, np.ndarray]:
+    """(xyz, h) en los centroides desde h_pred_post (o el decimado)."""
+    src = h_pred_decimated_parquet(case, runs_dir) if source == "decimated" else h_pred_post_parquet(case, runs_dir)
+    hp = read_columns(src, ["cx", "cy", "cz", "h_post"])
+    return hp[["cx", "cy", "cz"]].to_numpy(dtype=float), hp["h_post"].to_numpy(dtype=float)
+
+
+def nodal_background(case: str, runs_dir: Path | str = "runs") -> tuple[np.ndarray, np.ndarray, int]:
+    """
+    (xyz, h) en los nodos coarse usados por algún tet, con h ponderado por volumen.
+    También devuelve el número de tets (para reportar la reducción de puntos).
+    """
+    df, nodes, conn_idx = _load_coarse_field(case, runs_dir, ["volume"], "nodes")
+    h_node = volume_weighted_nodal_sizes(
+        conn_idx, df["h_post"].to_numpy(dtype=float), df["volume"].to_numpy(dtype=float), len(nodes)
+    )
+    # Solo nodos usados por algún tet (descarta nodos sueltos de curvas/superficies)
+    used = np.zeros(len(nodes), dtype=bool)
+    used[conn_idx.ravel()] = True
+    return nodes[["x", "y", "z"]].to_numpy(dtype=float)[used], h_node[used], len(df)
+
+
+def tet_background(case: str, runs_dir: Path | str = "runs") -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(node_xyz, conn_idx, h_node) para una vista SS sobre los tets coarse (h nodal promedio)."""
+    df, nodes, conn_idx = _load_coarse_field(case, runs_dir, [], "tets")
+    h_node = nodal_sizes(conn_idx, df["h_post"].to_numpy(dtype=float), len(nodes))
+    return nodes[["x", "y", "z"]].to_numpy(dtype=float), conn_idx, h_node
+
+
+def _export_nodes(args: argparse.Namespace) -> Path:
+    xyz, h, n_tets = nodal_background(args.case, args.runs_dir)
+    pts = pd.DataFrame({"x": xyz[:, 0], "y": xyz[:, 1], "z": xyz[:, 2], "h": h})
+    out_pos = background_nodes_pos_path(args.case, args.runs_dir)
+    write_pos(pts, out_pos, chunk_size=args.chunk_size)
+    print(
+        f"OK: POS (SP nodal ponderado por volumen) guardado en {out_pos}: "
+        f"{len(pts)} puntos vs {n_tets} centroides (x{n_tets / max(len(pts), 1):.2f} menos), "
+        f"{out_pos.stat().st_size / 2**20:.3f} MB"
+    )
+    return out_pos
+
+
+def _export_tets(args: argparse.Namespace) -> Path:
+    node_xyz, conn_idx, h_node = tet_background(args.case, args.runs_dir)
+    out_pos = background_tets_pos_path(args.case, args.runs_dir)
+    write_pos_tets(node_xyz, conn_idx, h_node, out_pos, chunk_size=args.chunk_size)
+    print(f"OK: POS (SS, {len(conn_idx)} tets, h nodal promedio) guardado en {out_pos}")
+    return out_pos
+
+
+def resample_to_grid(
+    xyz: np.ndarray,
+    h: np.ndarray,
+    lo: np.ndarray,
+    hi: np.ndarray,
+    *,
+    n_max: int,
+    interp: str = "idw",
+    k: int = 8,
+    chunk_size: int = 500_000,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Remuestrea h sobre una grilla regular que cubre [lo, hi] (con una celda de margen).
+
+    n_max es el número de nodos en el eje más largo; los otros ejes usan el mismo
+    paso. Los valores se obtienen por vecino más cercano o IDW (k vecinos) con un
+    KD-tree, consultando la grilla por bloques. Devuelve (origen, paso, valores)
+    con valores de forma (nx, ny, nz).
+    """
+    if n_max < 2:
+        raise ValueError("n_max debe ser >= 2")
+    span = np.maximum(hi - lo, 1e-12)
+    d = float(span.max()) / (n_max - 1)
+    origin = lo - d
+    n = np.ceil((span + 2 * d) / d).astype(np.int64) + 1
+
+    tree = cKDTree(xyz)
+    gx, gy, gz = (origin[a] + d * np.arange(n[a]) for a in range(3))
+    out = np.empty(int(np.prod(n)))
+    # Índice lineal (i,j,k) con k más rápido: el orden que lee el campo Structured de Gmsh
+    for start in range(0, out.size, chunk_size):
+        lin = np.arange(start, min(start + chunk_size, out.size))
+        i, rem = np.divmod(lin, n[1] * n[2])
+        j, kk = np.divmod(rem, n[2])
+        q = np.column_stack([gx[i], gy[j], gz[kk]])
+        if interp == "nearest":
+            _, nn = tree.query(q, k=1, workers=-1)
+            out[lin] = h[nn]
+        else:
+            dist, nn = tree.query(q, k=min(k, h.size), workers=-1)
+            dist = dist.reshape(len(q), -1)
+            nn = nn.reshape(len(q), -1)
+            w = 1.0 / np.maximum(dist, 1e-12 * d) ** 2
+            out[lin] = (w * h[nn]).sum(axis=1) / w.sum(axis=1)
+    return origin, np.array([d, d, d]), out.reshape(tuple(n))
+
+
+def write_structured_grid(origin: np.ndarray, step: np.ndarray, values: np.ndarray, out_path: Path) -> None:
+    """Formato binario del campo Structured de Gmsh: O (3 double), D (3 double), N (3 int), valores double."""
+    with out_path.open("wb") as f:
+        f.write(np.asarray(origin, dtype="<f8").tobytes())
+        f.write(np.asarray(step, dtype="<f8").tobytes())
+        f.write(np.asarray(values.shape, dtype="<i4").tobytes())
+        f.write(np.ascontiguousarray(values, dtype="<f8").tobytes())
+
+
+def _export_grid(args: argparse.Namespace) -> Path:
+    hp = read_columns(h_pred_post_parquet(args.case, args.runs_dir), ["cx", "cy", "cz", "h_post"])
+    xyz = hp[["cx", "cy", "cz"]].to_numpy(dtype=float)
+    h = hp["h_post"].to_numpy(dtype=float)
+
+    # La grilla debe cubrir la malla completa (nodos), no solo los centroides
+    nodes_path = node_coords_parquet(args.case, "", args.runs_dir)
+    ref = read_columns(nodes_path, ["x", "y", "z"]).to_numpy(dtype=float) if nodes_path.exists() else xyz
+
+    origin, step, values = resample_to_grid(
+        xyz, h, ref.min(axis=0), ref.max(axis=0), n_max=args.grid_n, interp=args.grid_interp
+    )
+    out = background_grid_path(args.case, args.runs_dir)
+    write_structured_grid(origin, step, values, out)
+    nx, ny, nz = values.shape
+    print(f"OK: grilla Structured {nx}x{ny}x{nz} (paso {step[0]:.4g}, {args.grid_interp}) guardada en {out}")
+    return out
+
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--case", required=True)
     ap.add_argument("--runs-dir", default="runs")
+    ap.add_argument(
+        "--mode",
+        choices=["points", "nodes", "tets", "grid"],
+        default="points",
+        help="points: SP en centroides | nodes: SP en nodos (h ponderado por volumen) | "
+        "tets: SS sobre los tets coarse con h nodal promedio | grid: grilla regular binaria para Field Structured",
+    )
+    ap.add_argument("--grid-n", type=int, default=64, help="(grid) Nodos en el eje más largo del bounding box")
+    ap.add_argument("--grid-interp", choices=["idw", "nearest"], default="idw")
+    ap.add_argument(
+        "--input",
+        choices=["post", "decimated"],
+        default="post",
+        help="post: h_pred_post_3d.parquet | decimated: h_pred_decimated_3d.parquet (decimate_background_3d)",
+    )
+    ap.add_argument("--chunk-size", type=int, default=100_000, help="Puntos por bloque al escribir el .pos")
+    ap.add_argument(
+        "--csv",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Escribe también background_points_3d.csv (no lo usa Gmsh).",
+    )
     args = ap.parse_args()
 
     ensure_case_dirs(args.case, args.runs_dir)
 
-    hp = pd.read_parquet(h_pred_post_parquet(args.case, args.runs_dir)).copy()
-    required = ["cx","cy","cz","h_post"]
-    missing = [c for c in required if c not in hp.columns]
-    if missing:
-        raise ValueError(f"Faltan columnas {missing} en h_pred_post_3d.parquet")
+    if args.mode != "points":
+        if args.input != "post":
+            raise ValueError(f"El modo {args.mode} requiere --input post.")
+        {"nodes": _export_nodes, "tets": _export_tets, "grid": _export_grid}[args.mode](args)
+        return
 
+    src = (
+        h_pred_decimated_parquet(args.case, args.runs_dir)
+        if args.input == "decimated"
+        else h_pred_post_parquet(args.case, args.runs_dir)
+    )
+    hp = read_columns(src, ["cx", "cy", "cz", "h_post"])
     pts = hp.rename(columns={"cx":"x","cy":"y","cz":"z","h_post":"h"})[["x","y","z","h"]]
 
     out_csv = background_csv_path(args.case, args.runs_dir)
     out_pos = background_pos_path(args.case, args.runs_dir)
     
-    pts.to_csv(out_csv, index=False)
-    write_pos(pts, out_pos)
+    if args.csv:
+        pts.to_csv(out_csv, index=False)
+    elif out_csv.exists():
+        # Un CSV de una corrida anterior ya no corresponde al .pos que se escribe ahora
+        out_csv.unlink()
+        print(f"Info: --no-csv: se borró el CSV anterior {out_csv} (no corresponde a este .pos)")
+    write_pos(pts, out_pos, chunk_size=args.chunk_size)
 
-    print(f"OK: CSV guardado en {out_csv}")
+    if args.csv:
+        print(f"OK: CSV guardado en {out_csv}")
     print(f"OK: POS guardado en {out_pos}")
     print(pts.head(5).to_string(index=False))
 
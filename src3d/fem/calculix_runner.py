@@ -1,23 +1,80 @@
 # src3d/fem/calculix_runner.py
 from __future__ import annotations
 
+import json
+import os
+import re
 import subprocess
+import time
+from dataclasses import asdict, dataclass
 from pathlib import Path
 
+_TOTAL_TIME_RE = re.compile(r"Total CalculiX Time:\s*([0-9.eE+-]+)")
 
-def run_ccx(ccx_exe: str, job_name: str, workdir: Path) -> tuple[Path, Path]:
+
+@dataclass
+class CcxRun:
+    job: str
+    threads: int | None  # None = hereda OMP_NUM_THREADS del entorno
+    wall_s: float
+    solver_s: float | None  # "Total CalculiX Time" del log, si ccx lo imprime
+    t_start: float  # epoch, para verificar solapamiento entre jobs
+    t_end: float
+
+
+def ccx_env(threads: int | None) -> dict[str, str]:
+    """Entorno de ccx: con threads fija OpenMP y el solver de ecuaciones (SPOOLES/PaStiX) al mismo valor."""
+    env = dict(os.environ)
+    if threads:
+        env["OMP_NUM_THREADS"] = str(threads)
+        env["CCX_NPROC_EQUATION_SOLVER"] = str(threads)
+    return env
+
+
+def run_info_path(workdir: Path, job_name: str) -> Path:
+    return workdir / f"{job_name}_run.json"
+
+
+def run_ccx(ccx_exe: str, job_name: str, workdir: Path, threads: int | None = None) -> tuple[Path, Path]:
     """
     Ejecuta CalculiX: ccx -i <job_name> en workdir
     Espera outputs estándar: <job>.frd y <job>.dat
+
+    La salida de ccx va a <job>.log (varios jobs pueden correr a la vez) y el
+    resumen de la corrida (threads, tiempo de pared y del solver) a <job>_run.json.
     """
     workdir.mkdir(parents=True, exist_ok=True)
 
+    # ccx corre con cwd=workdir: una ruta relativa (p.ej. scripts/fake_ccx.py) se resuelve antes
+    if os.sep in ccx_exe or (os.altsep and os.altsep in ccx_exe):
+        ccx_exe = str(Path(ccx_exe).resolve())
     cmd = [ccx_exe, "-i", job_name]
-    print(f"[cmd] {' '.join(cmd)} (cwd={workdir})")
-    proc = subprocess.run(cmd, cwd=str(workdir), check=False)
+    log = workdir / f"{job_name}.log"
+    print(f"[cmd] {' '.join(cmd)} (cwd={workdir}, threads={threads or 'env'}, log={log.name})")
+    t_start = time.time()
+    with log.open("w", encoding="utf-8") as out:
+        proc = subprocess.run(
+            cmd, cwd=str(workdir), env=ccx_env(threads), stdout=out, stderr=subprocess.STDOUT, check=False
+        )
+    t_end = time.time()
 
+    text = log.read_text(encoding="utf-8", errors="ignore")
     if proc.returncode != 0:
-        raise RuntimeError(f"CalculiX falló ({proc.returncode}) con CMD: {' '.join(cmd)}")
+        tail = "\n".join(text.splitlines()[-20:])
+        raise RuntimeError(f"CalculiX falló ({proc.returncode}) con CMD: {' '.join(cmd)}\n{tail}")
+
+    m = _TOTAL_TIME_RE.search(text)
+    info = CcxRun(
+        job=job_name,
+        threads=threads,
+        wall_s=t_end - t_start,
+        solver_s=float(m.group(1)) if m else None,
+        t_start=t_start,
+        t_end=t_end,
+    )
+    run_info_path(workdir, job_name).write_text(json.dumps(asdict(info), indent=2), encoding="utf-8")
+    solver = f"{info.solver_s:.2f} s" if info.solver_s is not None else "n/d"
+    print(f"Tiempo ccx ({job_name}): solver {solver} | pared {info.wall_s:.2f} s")
 
     frd = workdir / f"{job_name}.frd"
     dat = workdir / f"{job_name}.dat"
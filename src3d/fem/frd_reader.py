@@ -0,0 +1,261 @@
+# src3d/fem/frd_reader.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+import numpy as np
+import pandas as pd
+
+from src3d.fem.inp_reader import InpMesh, read_inp
+
+# Nodos por elemento según el tipo FRD (he8, pe6, te4, he20, pe15, te10, tr3, tr6, qu4, qu8, be2, be3)
+_FRD_ELEMENT_NODES = {1: 8, 2: 6, 3: 4, 4: 20, 5: 15, 6: 10, 7: 3, 8: 6, 9: 4, 10: 8, 11: 2, 12: 3}
+# Ancho del id de nodo en líneas " -1": formato 0 = corto (I5), 1 = largo (I10); 2 = binario
+_ID_WIDTH = {0: 5, 1: 10}
+_VALUE_WIDTH = 12
+STRESS_COMPONENTS = ["SXX", "SYY", "SZZ", "SXY", "SYZ", "SZX"]
+DISP_COMPONENTS = ["D1", "D2", "D3"]
+
+
+@dataclass
+class NodalVonMises:
+    node_ids: np.ndarray  # (N,) int64
+    sigma_vm: np.ndarray  # (N,) float64
+    n_stress_blocks: int
+    step: int
+
+
+def von_mises(s: np.ndarray) -> np.ndarray:
+    """s: (N,6) en orden SXX,SYY,SZZ,SXY,SYZ,SZX (convención FRD)."""
+    sxx, syy, szz, sxy, syz, szx = (s[:, k] for k in range(6))
+    return np.sqrt(
+        0.5 * ((sxx - syy) ** 2 + (syy - szz) ** 2 + (szz - sxx) ** 2)
+        + 3.0 * (sxy**2 + syz**2 + szx**2)
+    )
+
+
+def _skip_ascii_block(f: BinaryIO, block: int = 1 << 20) -> None:
+    """Avanza hasta después de la línea " -3" buscando por bloques de bytes (sin leer línea a línea)."""
+    tail = b"\n"  # f está al inicio de una línea
+    while True:
+        buf = f.read(block)
+        if not buf:
+            return
+        data = tail + buf
+        i = data.find(b"\n -3")
+        if i >= 0:
+            f.seek(i + 1 - len(data), 1)
+            f.readline()
+            return
+        tail = data[-3:]
+
+
+def _skip_binary_elements(f: BinaryIO, n_elems: int) -> None:
+    """Registros (id, tipo, grupo, material, nodos...) en int32; de largo fijo si todos son del mismo tipo."""
+    left = n_elems
+    while left > 0:
+        head = np.frombuffer(f.read(16), dtype="<i4")
+        nn = _FRD_ELEMENT_NODES[int(head[1])]
+        f.seek(4 * nn, 1)
+        left -= 1
+        # Mismo tipo en el resto del bloque (caso usual): salto en bloque si los tipos calzan
+        rec = 4 * (4 + nn)
+        probe = min(left, 4096)
+        if probe == 0:
+            break
+        raw = f.read(probe * rec)
+        if len(raw) == probe * rec:
+            data = np.frombuffer(raw, dtype="<i4").reshape(probe, 4 + nn)
+            if np.all(data[:, 1] == head[1]):
+                left -= probe
+                continue
+        f.seek(-len(raw), 1)
+
+
+def _read_values_ascii(f: BinaryIO, n_nodes: int, id_width: int, n_values: int, chunk_rows: int):
+    """
+    Yield (ids, valores) por bloques de hasta chunk_rows nodos. Las líneas de
+    datos tienen ancho fijo: si todas miden lo mismo se decodifican con NumPy
+    sin recorrer línea a línea; si no (p.ej. continuaciones " -2"), se lee por línea.
+    """
+    first = f.readline()
+    line_len = len(first)
+    val0 = 3 + id_width
+    per_line = (len(first.rstrip(b"\r\n")) - val0) // _VALUE_WIDTH
+    pending = first
+    left = n_nodes
+
+    if per_line >= n_values:
+        while left > 0:
+            m = min(left, chunk_rows)
+            buf = pending + f.read(m * line_len - len(pending))
+            pending = b""
+            rows = np.frombuffer(buf, dtype=np.uint8)
+            if rows.size != m * line_len:
+                raise ValueError("FRD truncado en bloque de resultados")
+            rows = rows.reshape(m, line_len)
+            if not (np.all(rows[:, 1] == ord("-")) and np.all(rows[:, 2] == ord("1"))):
+                raise ValueError("FRD: líneas de ancho variable en bloque de resultados (formato no soportado)")
+            ids = np.ascontiguousarray(rows[:, 3:val0]).view(f"S{id_width}").ravel().astype(np.int64)
+            vals = np.ascontiguousarray(rows[:, val0 : val0 + n_values * _VALUE_WIDTH])
+            vals = vals.view(f"S{_VALUE_WIDTH}").astype(np.float64)
+            left -= m
+            yield ids, vals
+        return
+
+    # Valores repartidos en " -1" + " -2" (más de 6 componentes por línea)
+    ids = np.empty(min(left, chunk_rows), dtype=np.int64)
+    vals = np.empty((ids.size, n_values), dtype=np.float64)
+    k = 0
+    line = first
+    while left > 0:
+        fields = []
+        ids[k] = int(line[3:val0])
+        while True:
+            body = line.rstrip(b"\r\n")[val0:]
+            fields.extend(float(body[i : i + _VALUE_WIDTH]) for i in range(0, len(body), _VALUE_WIDTH))
+            if len(fields) >= n_values:
+                break
+            line = f.readline()
+        vals[k] = fields[:n_values]
+        k += 1
+        left -= 1
+        if k == ids.size or left == 0:
+            yield ids[:k].copy(), vals[:k].copy()
+            k = 0
+        if left > 0:
+            line = f.readline()
+
+
+def _read_values_binary(f: BinaryIO, n_nodes: int, n_values: int, chunk_rows: int):
+    rec = np.dtype([("id", "<i4"), ("v", "<f4", (n_values,))])
+    left = n_nodes
+    while left > 0:
+        m = min(left, chunk_rows)
+        data = np.frombuffer(f.read(m * rec.itemsize), dtype=rec)
+        if data.size != m:
+            raise ValueError("FRD binario truncado en bloque de resultados")
+        left -= m
+        yield data["id"].astype(np.int64), data["v"].astype(np.float64)
+
+
+def _read_last_result(frd: Path, name: str, components: list[str], reduce, chunk_rows: int):
+    """
+    Recorre <job>.frd (ASCII o binario) y devuelve (ids, reduce(valores), n_bloques, step)
+    del último bloque de resultados `name` (incremento final), o None si no hay.
+    Los bloques de nodos, elementos y otros resultados se saltan sin cargarlos; el
+    bloque pedido se decodifica por tramos de chunk_rows nodos y `reduce` recibe
+    solo las columnas de `components`, así la memoria queda acotada por el número
+    de nodos y no por el tamaño del archivo.
+    """
+    best = None
+    n_blocks = 0
+    step = 0
+    with Path(frd).open("rb") as f:
+        for line in iter(f.readline, b""):
+            head = line[:6].strip()
+            if head in (b"2C", b"3C"):
+                toks = line.split()
+                n, fmt = int(toks[1]), int(toks[-1])
+                if fmt < 2:
+                    _skip_ascii_block(f)
+                elif head == b"2C":
+                    f.seek(n * (4 + 3 * 8), 1)  # id int32 + x,y,z float64
+                else:
+                    _skip_binary_elements(f, n)
+
+            elif head.startswith(b"100C"):
+                n_nodes = int(line[24:36])
+                fmt = int(line[73:75] or b"0")
+                cur_step = int(line[58:63] or b"0")
+                name_line = f.readline()
+                block_name, n_comp = name_line.split()[1].decode(), int(name_line.split()[2])
+                stored = 0
+                comps = []
+                for _ in range(n_comp):
+                    c = f.readline()
+                    iexist = c[33:38].strip()
+                    if not iexist or int(iexist) == 0:
+                        stored += 1
+                        comps.append(c[5:13].strip().decode())
+
+                if block_name != name:
+                    if fmt < 2:
+                        _skip_ascii_block(f)
+                    else:
+                        f.seek(n_nodes * (4 + 4 * stored), 1)
+                    continue
+                if comps[: len(components)] != components:
+                    raise ValueError(f"{frd}: componentes {name} inesperadas: {comps}")
+
+                if fmt < 2:
+                    chunks = _read_values_ascii(f, n_nodes, _ID_WIDTH[fmt], stored, chunk_rows)
+                else:
+                    chunks = _read_values_binary(f, n_nodes, stored, chunk_rows)
+                ids = np.empty(n_nodes, dtype=np.int64)
+                out = None
+                k = 0
+                for cid, cval in chunks:
+                    red = reduce(cval[:, : len(components)])
+                    if out is None:
+                        out = np.empty((n_nodes, *red.shape[1:]), dtype=np.float64)
+                    ids[k : k + cid.size] = cid
+                    out[k : k + cid.size] = red
+                    k += cid.size
+                best = (ids, out)
+                n_blocks += 1
+                step = cur_step
+
+    if best is None:
+        return None
+    return best[0], best[1], n_blocks, step
+
+
+def read_frd_nodal_von_mises(frd: Path, chunk_rows: int = 200_000) -> NodalVonMises:
+    """Von Mises nodal del último bloque STRESS (incremento final) de <job>.frd."""
+    res = _read_last_result(frd, "STRESS", STRESS_COMPONENTS, von_mises, chunk_rows)
+    if res is None:
+        raise RuntimeError(f"{frd} no tiene bloque STRESS. Revisa '*NODE FILE'/'*EL FILE S' en el .inp.")
+    ids, vm, n_blocks, step = res
+    return NodalVonMises(node_ids=ids, sigma_vm=vm, n_stress_blocks=n_blocks, step=step)
+
+
+def read_frd_nodal_displacement(frd: Path, chunk_rows: int = 200_000) -> tuple[np.ndarray, np.ndarray]:
+    """Desplazamientos nodales (D1,D2,D3) del último bloque DISP de <job>.frd -> (node_ids, (N,3))."""
+    res = _read_last_result(frd, "DISP", DISP_COMPONENTS, np.asarray, chunk_rows)
+    if res is None:
+        raise RuntimeError(f"{frd} no tiene bloque DISP. Revisa '*NODE FILE' con 'U' en el .inp.")
+    return res[0], res[1]
+
+
+def element_von_mises(nodal: NodalVonMises, mesh: InpMesh) -> pd.DataFrame:
+    """Promedio por elemento (bloques sólidos C3D*) del von Mises de sus nodos -> elem_id,sigma_vm."""
+    lookup = np.full(int(max(nodal.node_ids.max(), mesh.node_ids.max())) + 1, np.nan)
+    lookup[nodal.node_ids] = nodal.sigma_vm
+
+    ids, sig = [], []
+    for block in mesh.solid_blocks():
+        ids.append(block.ids)
+        sig.append(lookup[block.conn].mean(axis=1))
+    if not ids:
+        raise RuntimeError(f"El INP no tiene elementos sólidos (C3D*): {mesh.element_counts()}")
+    out = pd.DataFrame({"elem_id": np.concatenate(ids), "sigma_vm": np.concatenate(sig)})
+    nmiss = int(out["sigma_vm"].isna().sum())
+    if nmiss:
+        raise RuntimeError(f"{nmiss} elementos tienen nodos sin STRESS en el FRD")
+    return out
+
+
+def extract_sigma_vm_frd(frd: Path, job_inp: Path, out_csv: Path) -> pd.DataFrame:
+    """<job>.frd + <job>.inp (sigue *INCLUDE) -> CSV elem_id,sigma_vm (contrato de read_sigma_vm_table)."""
+    nodal = read_frd_nodal_von_mises(frd)
+    df = element_von_mises(nodal, read_inp(job_inp))
+    out_csv.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(out_csv, index=False)
+    print(
+        f"OK: sigma_vm desde {Path(frd).name}: {len(nodal.node_ids)} nodos, {len(df)} elementos "
+        f"(step {nodal.step}, {nodal.n_stress_blocks} bloques STRESS) -> {out_csv}"
+    )
+    return df
@@ -0,0 +1,213 @@
+# src3d/fem/inp_reader.py
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+# Líneas de keyword (incluye comentarios "**"); el resto del texto son bloques de datos
+_KEYWORD_RE = re.compile(r"^[ \t]*\*.*$", re.MULTILINE)
+_NAME_RE = re.compile(r"[A-Za-z_]")
+
+# Nodos por elemento de los tipos usuales (CalculiX/Abaqus); el resto se infiere de la primera línea
+NODES_PER_ELEMENT = {
+    "C3D4": 4,
+    "C3D10": 10,
+    "C3D6": 6,
+    "C3D15": 15,
+    "C3D8": 8,
+    "C3D8R": 8,
+    "C3D8I": 8,
+    "C3D20": 20,
+    "C3D20R": 20,
+    "S3": 3,
+    "CPS3": 3,
+    "S4": 4,
+    "CPS4": 4,
+    "S6": 6,
+    "CPS6": 6,
+    "S8": 8,
+    "CPS8": 8,
+    "T3D2": 2,
+    "T3D3": 3,
+}
+
+
+@dataclass
+class ElementBlock:
+    etype: str
+    elset: str | None
+    ids: np.ndarray  # (M,) int64
+    conn: np.ndarray  # (M, nodos_por_elemento) int64, ids de nodo del INP
+
+
+@dataclass
+class InpMesh:
+    node_ids: np.ndarray  # (N,) int64
+    node_xyz: np.ndarray  # (N, 3) float64
+    blocks: list[ElementBlock] = field(default_factory=list)
+    nsets: dict[str, np.ndarray] = field(default_factory=dict)
+    elsets: dict[str, np.ndarray] = field(default_factory=dict)
+
+    def solid_blocks(self) -> list[ElementBlock]:
+        return [b for b in self.blocks if b.etype.startswith("C3D")]
+
+    def solid_element_ids(self) -> np.ndarray:
+        blocks = self.solid_blocks()
+        if not blocks:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([b.ids for b in blocks])
+
+    def element_counts(self) -> dict[str, int]:
+        out: dict[str, int] = {}
+        for b in self.blocks:
+            out[b.etype] = out.get(b.etype, 0) + int(b.ids.size)
+        return out
+
+
+def _parse_keyword(line: str) -> tuple[str, dict[str, str]]:
+    """'*ELEMENT, type=C3D4, ELSET=Volume1' -> ('ELEMENT', {'TYPE': 'C3D4', 'ELSET': 'Volume1'})."""
+    parts = [p.strip() for p in line.strip().lstrip("*").split(",")]
+    params: dict[str, str] = {}
+    for p in parts[1:]:
+        if not p:
+            continue
+        k, _, v = p.partition("=")
+        params[k.strip().upper()] = v.strip()
+    return parts[0].upper(), params
+
+
+def _ints(text: str) -> np.ndarray:
+    # Comas y saltos de línea (incluidas líneas de continuación) se tratan como espacio
+    return np.fromstring(text.replace(",", " "), dtype=np.int64, sep=" ")
+
+
+def _floats(text: str) -> np.ndarray:
+    return np.fromstring(text.replace(",", " "), dtype=np.float64, sep=" ")
+
+
+def _set_members(text: str, params: dict[str, str], known: dict[str, np.ndarray]) -> np.ndarray:
+    """Datos de *NSET/*ELSET: ids, nombres de sets ya definidos, o líneas start,end[,step] con GENERATE."""
+    if "GENERATE" in params:
+        parts = []
+        for line in text.splitlines():
+            vals = _ints(line)
+            if vals.size == 0:
+                continue
+            if vals.size not in (2, 3):
+                raise ValueError(f"*SET con GENERATE mal formado: {line.strip()!r} (se espera start, end[, step])")
+            step = int(vals[2]) if vals.size == 3 and vals[2] else 1
+            parts.append(np.arange(vals[0], vals[1] + 1, step, dtype=np.int64))
+    elif _NAME_RE.search(text):
+        parts = []
+        for tok in text.replace(",", " ").split():
+            if _NAME_RE.search(tok):
+                parts.append(known[tok.upper()])
+            else:
+                parts.append(np.array([int(tok)], dtype=np.int64))
+    else:
+        parts = [_ints(text)]
+    if not parts:
+        return np.empty(0, dtype=np.int64)
+    return np.concatenate(parts).astype(np.int64, copy=False)
+
+
+class _Accumulator:
+    def __init__(self):
+        self.nodes: list[np.ndarray] = []
+        self.blocks: list[ElementBlock] = []
+        self.nsets: dict[str, list[np.ndarray]] = {}
+        self.elsets: dict[str, list[np.ndarray]] = {}
+
+    def _add_set(self, sets: dict[str, list[np.ndarray]], name: str, ids: np.ndarray) -> None:
+        sets.setdefault(name.upper(), []).append(ids)
+
+    def resolved(self, sets: dict[str, list[np.ndarray]]) -> dict[str, np.ndarray]:
+        return {k: np.concatenate(v) if len(v) > 1 else v[0] for k, v in sets.items()}
+
+    def section(self, keyword: str, params: dict[str, str], text: str, path: Path) -> None:
+        if keyword == "NODE":
+            vals = _floats(text)
+            if vals.size % 4:
+                raise ValueError(f"{path}: bloque *NODE con {vals.size} valores (se esperan id,x,y,z por línea)")
+            vals = vals.reshape(-1, 4)
+            self.nodes.append(vals)
+            if "NSET" in params:
+                self._add_set(self.nsets, params["NSET"], vals[:, 0].astype(np.int64))
+
+        elif keyword == "ELEMENT":
+            etype = params.get("TYPE", "").upper()
+            nper = NODES_PER_ELEMENT.get(etype)
+            if nper is None:
+                first = text.lstrip().split("\n", 1)[0]
+                nper = len([t for t in first.split(",") if t.strip()]) - 1
+            vals = _ints(text)
+            if nper <= 0 or vals.size % (nper + 1):
+                raise ValueError(f"{path}: bloque *ELEMENT type={etype} no calza con {nper} nodos por elemento")
+            vals = vals.reshape(-1, nper + 1)
+            block = ElementBlock(etype=etype, elset=params.get("ELSET"), ids=vals[:, 0].copy(), conn=vals[:, 1:])
+            self.blocks.append(block)
+            if block.elset:
+                self._add_set(self.elsets, block.elset, block.ids)
+
+        elif keyword in {"NSET", "ELSET"}:
+            sets = self.nsets if keyword == "NSET" else self.elsets
+            name = params.get(keyword)
+            if not name:
+                raise ValueError(f"{path}: *{keyword} sin nombre")
+            self._add_set(sets, name, _set_members(text, params, self.resolved(sets)))
+
+
+def _read_into(acc: _Accumulator, path: Path) -> None:
+    text = path.read_text(encoding="utf-8", errors="ignore")
+    keyword: str | None = None
+    params: dict[str, str] = {}
+    chunks: list[str] = []
+
+    def flush():
+        if keyword is not None and chunks:
+            data = "".join(chunks)
+            if data.strip():
+                acc.section(keyword, params, data, path)
+
+    pos = 0
+    for m in _KEYWORD_RE.finditer(text):
+        chunks.append(text[pos : m.start()])
+        pos = m.end() + 1
+        line = m.group(0).strip()
+        if line.startswith("**"):
+            continue  # comentario: el bloque de datos continúa
+        flush()
+        keyword, params = _parse_keyword(line)
+        chunks = []
+        if keyword == "INCLUDE":
+            inc = Path(params.get("INPUT", "").strip('"'))
+            _read_into(acc, inc if inc.is_absolute() else path.parent / inc)
+            keyword = None
+    chunks.append(text[pos:])
+    flush()
+
+
+def read_inp(path: Path) -> InpMesh:
+    """
+    Lee nodos, bloques *ELEMENT (todos los tipos) y *NSET/*ELSET de un INP
+    (CalculiX/Abaqus, p.ej. exportado por Gmsh) en una pasada: las líneas de
+    keyword se ubican con una sola regex sobre el texto completo y cada bloque
+    numérico se convierte de una vez con NumPy. Sigue *INCLUDE.
+    """
+    path = Path(path)
+    acc = _Accumulator()
+    _read_into(acc, path)
+    if not acc.nodes:
+        raise RuntimeError(f"No pude leer nodos desde {path}. Verifica bloque *NODE.")
+
+    nodes = np.concatenate(acc.nodes) if len(acc.nodes) > 1 else acc.nodes[0]
+    return InpMesh(
+        node_ids=nodes[:, 0].astype(np.int64),
+        node_xyz=np.ascontiguousarray(nodes[:, 1:]),
+        blocks=acc.blocks,
+        nsets=acc.resolved(acc.nsets),
+        elsets=acc.resolved(acc.elsets),
+    )
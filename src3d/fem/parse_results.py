@@ -5,6 +5,8 @@ from pathlib import Path
 
 import pandas as pd
 
+from src3d.parquet_io_3d import read_columns
+
 def _normalize_input_path(path: Path) -> Path:
     """Normaliza rutas provenientes de CLI (espacios/comillas accidentales)."""
     clean = str(path).strip().strip('"').strip("'")
@@ -29,7 +31,7 @@ def read_sigma_vm_table(path: Path) -> pd.DataFrame:
     if path.suffix.lower() == ".csv":
         df = pd.read_csv(path)
     elif path.suffix.lower() in {".parquet", ".pq"}:
-        df = pd.read_parquet(path)
+        df = read_columns(path, ["elem_id", "sigma_vm"])
     else:
         raise ValueError(f"Formato FEM no soportado: {path.suffix}. Usa .csv o .parquet")
 
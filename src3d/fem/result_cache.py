@@ -0,0 +1,112 @@
+# src3d/fem/result_cache.py
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from src3d.content_cache_3d import ContentCache, hash_bytes
+
+_INCLUDE_RE = re.compile(r'^\s*\*INCLUDE\s*,\s*INPUT\s*=\s*"?([^"\r\n]+?)"?\s*$', re.IGNORECASE | re.MULTILINE)
+# Subir si cambia cómo se obtiene sigma_vm desde los resultados (extractor, promedio por elemento, columnas)
+_SCHEMA = "sigma_vm/v1"
+# *HEADING es solo un título (Gmsh escribe ahí la ruta del archivo): no cambia la solución
+_HEADING_RE = re.compile(rb"^\*HEADING[^\n]*\n(?:[^*][^\n]*\n)*", re.IGNORECASE | re.MULTILINE)
+
+LOG_NAME = "fem_cache_log.csv"
+COUNTS_NAME = "fem_cache_counts.json"
+LOG_COLUMNS = ["timestamp", "case", "tag", "key", "status", "ccx_wall_s", "lookup_ms"]
+
+
+def inp_dependencies(job_inp: Path) -> list[Path]:
+    """El .inp y los archivos que carga con *INCLUDE (recursivo, relativo al archivo que incluye)."""
+    seen: list[Path] = []
+    stack = [Path(job_inp).resolve()]
+    while stack:
+        path = stack.pop()
+        if path in seen:
+            continue
+        if not path.exists():
+            raise FileNotFoundError(f"{job_inp}: *INCLUDE inexistente: {path}")
+        seen.append(path)
+        text = path.read_text(encoding="utf-8", errors="ignore")
+        stack.extend((path.parent / m.strip()).resolve() for m in _INCLUDE_RE.findall(text))
+    return seen
+
+
+def solver_identity(ccx_exe: str) -> str:
+    """Ruta, tamaño y mtime del ejecutable de ccx: cambia si se actualiza, sin lanzar el solver en cada consulta."""
+    path = Path(shutil.which(ccx_exe) or ccx_exe).resolve()
+    try:
+        st = path.stat()
+    except OSError:
+        return str(path)
+    return f"{path}:{st.st_size}:{st.st_mtime_ns}"
+
+
+class FemResultCache:
+    """
+    Cache persistente de resultados FEM: la clave es el hash del job .inp y de
+    todo lo que incluye (malla, material, BCs y cargas quedan ahí, sin el
+    *HEADING), el ejecutable de ccx y el extractor de sigma. Cada entrada guarda la tabla elem_id,sigma_vm
+    en Parquet y el resumen de la corrida ccx original (para reportar el ahorro).
+    """
+
+    FILES = ("sigma_vm.parquet", "ccx_run.json")
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.cache = ContentCache(root, max_bytes)
+        self.log_csv = Path(root) / LOG_NAME
+        self.counts_json = Path(root) / COUNTS_NAME
+
+    def key(self, job_inp: Path, ccx_exe: str, extractor: str) -> str:
+        base = Path(job_inp).resolve().parent
+        chunks: list[bytes | str] = []
+        for dep in inp_dependencies(job_inp):
+            rel = dep.relative_to(base).as_posix() if dep.is_relative_to(base) else dep.as_posix()
+            chunks.extend([rel, _HEADING_RE.sub(b"", dep.read_bytes())])
+        chunks.extend([solver_identity(ccx_exe), extractor, _SCHEMA])
+        return hash_bytes(*chunks)
+
+    def restore(self, key: str, dests: dict[str, Path]) -> bool:
+        return self.cache.get(key, dests)
+
+    def store(self, key: str, files: dict[str, Path]) -> None:
+        self.cache.put(key, files)
+
+    def log(self, case: str, tag: str, key: str, status: str, ccx_wall_s: float | None, lookup_ms: float) -> tuple[int, int]:
+        """Agrega la consulta al log del cache y devuelve (hits, misses) históricos."""
+        row = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "case": case,
+            "tag": tag,
+            "key": key[:16],
+            "status": status,
+            "ccx_wall_s": ccx_wall_s,
+            "lookup_ms": round(lookup_ms, 3),
+        }
+        # coarse y ref pueden correr a la vez sobre el mismo cache: header + append + contadores bajo el lock
+        with self.cache.lock():
+            counts = self._read_counts()
+            pd.DataFrame([row], columns=LOG_COLUMNS).to_csv(
+                self.log_csv, mode="a", header=not self.log_csv.exists(), index=False
+            )
+            counts[status] = counts.get(status, 0) + 1
+            tmp = self.counts_json.with_suffix(".tmp")
+            tmp.write_text(json.dumps(counts), encoding="utf-8")
+            os.replace(tmp, self.counts_json)
+        return counts.get("hit", 0), counts.get("miss", 0)
+
+    def _read_counts(self) -> dict[str, int]:
+        """Contadores por status (llamar con el lock tomado). Un log sin contadores (cache anterior) se cuenta una vez."""
+        if self.counts_json.exists():
+            return json.loads(self.counts_json.read_text(encoding="utf-8"))
+        if not self.log_csv.exists():
+            return {}
+        status_col = pd.read_csv(self.log_csv, usecols=["status"])["status"]
+        return {k: int(v) for k, v in status_col.value_counts().items()}
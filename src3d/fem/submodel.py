@@ -0,0 +1,120 @@
+# src3d/fem/submodel.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from src3d.fem.inp_reader import ElementBlock, InpMesh
+from src3d.fem.transfer import TetLocator, inp_tets
+from src3d.mesh_graph_3d import tet_connectivity
+
+
+@dataclass
+class SubmodelRegion:
+    core_ids: np.ndarray  # elementos calientes: su sigma del submodelo reemplaza al coarse
+    region_ids: np.ndarray  # core + capas de buffer: lo que se resuelve
+    n_elems: int  # elementos del modelo completo
+
+
+def _element_node_incidence(conn: np.ndarray) -> sparse.csr_matrix:
+    m, k = conn.shape
+    rows = np.repeat(np.arange(m), k)
+    return sparse.csr_matrix((np.ones(m * k, dtype=np.int32), (rows, conn.ravel())), shape=(m, int(conn.max()) + 1))
+
+
+def select_region(geom: pd.DataFrame, sigma_coarse: np.ndarray, quantile: float, layers: int) -> SubmodelRegion:
+    """
+    Core = elementos con sigma_coarse >= cuantil `quantile`; región = core más
+    `layers` capas de vecinos por nodo (el buffer aleja el borde de corte, donde
+    el desplazamiento impuesto del coarse contamina la solución, de la zona que se usa).
+    """
+    if not 0.0 < quantile < 1.0:
+        raise ValueError("quantile debe estar en (0, 1)")
+    sigma = np.asarray(sigma_coarse, dtype=float)
+    hot = sigma >= np.quantile(sigma, quantile)
+    inc = _element_node_incidence(tet_connectivity(geom))
+    region = hot.copy()
+    for _ in range(layers):
+        # int32: en int8 un nodo compartido por > 127 elementos de la región desborda y se pierde
+        touched = (inc.T @ region.astype(np.int32)) > 0
+        region |= (inc @ touched.astype(np.int32)) > 0
+    elem_ids = geom["elem_id"].to_numpy(dtype=np.int64)
+    return SubmodelRegion(core_ids=elem_ids[hot], region_ids=elem_ids[region], n_elems=len(elem_ids))
+
+
+def submesh(mesh: InpMesh, region_ids: np.ndarray) -> tuple[InpMesh, np.ndarray]:
+    """
+    Recorta los bloques sólidos de `mesh` a region_ids -> (submalla, nodos de corte).
+    Los nodos de corte son los que comparten elementos dentro y fuera de la
+    región (incluye nodos intermedios de C3D10): ahí se impone el desplazamiento.
+    """
+    blocks = []
+    inside_nodes, outside_nodes = [], []
+    for b in mesh.solid_blocks():
+        keep = np.isin(b.ids, region_ids)
+        if keep.any():
+            blocks.append(ElementBlock(b.etype, b.elset, b.ids[keep], b.conn[keep]))
+        inside_nodes.append(b.conn[keep].ravel())
+        outside_nodes.append(b.conn[~keep].ravel())
+    if not blocks:
+        raise RuntimeError("La región del submodelo no tiene elementos en la malla ref")
+
+    used = np.unique(np.concatenate(inside_nodes))
+    cut = np.intersect1d(used, np.concatenate(outside_nodes))
+    order = np.argsort(mesh.node_ids)
+    pos = order[np.searchsorted(mesh.node_ids, used, sorter=order)]
+    sub = InpMesh(node_ids=mesh.node_ids[pos], node_xyz=mesh.node_xyz[pos], blocks=blocks)
+    return sub, cut
+
+
+def _node_index(mesh: InpMesh, ids: np.ndarray) -> np.ndarray:
+    order = np.argsort(mesh.node_ids)
+    return order[np.searchsorted(mesh.node_ids, ids, sorter=order)]
+
+
+def _tet_locator(mesh: InpMesh) -> tuple[np.ndarray, TetLocator]:
+    elem_ids, conn = inp_tets(mesh)
+    return elem_ids, TetLocator(mesh.node_xyz, _node_index(mesh, conn))
+
+
+def same_mesh(a: InpMesh, b: InpMesh) -> bool:
+    """Mismos tipos y cantidades de elementos y mismos nodos (ids y coordenadas)."""
+    if a.element_counts() != b.element_counts() or not np.array_equal(np.sort(a.node_ids), np.sort(b.node_ids)):
+        return False
+    return bool(np.allclose(a.node_xyz[np.argsort(a.node_ids)], b.node_xyz[np.argsort(b.node_ids)]))
+
+
+def map_region(mesh: InpMesh, coarse: InpMesh, region_ids: np.ndarray, batch: int = 100_000) -> np.ndarray:
+    """
+    Traslada la región (elem_id de la malla coarse) a la malla ref por geometría:
+    devuelve los elementos sólidos de `mesh` cuyo centroide cae en un tet coarse de
+    la región. Los ids de las dos mallas no se relacionan (ref puede ser otra malla,
+    más fina o C3D10).
+    """
+    coarse_ids, locator = _tet_locator(coarse)
+    missing = np.setdiff1d(region_ids, coarse_ids)
+    if missing.size:
+        raise RuntimeError(
+            f"{missing.size} elementos de la región no están en el mesh.inp coarse "
+            "(¿mesh.inp de otra malla que element_geometry_3d?)"
+        )
+    in_region = np.isin(coarse_ids, region_ids)
+    out = []
+    for b in mesh.solid_blocks():
+        centroids = mesh.node_xyz[_node_index(mesh, b.conn)].mean(axis=1)
+        keep = np.empty(len(b.ids), dtype=bool)
+        for s in range(0, len(b.ids), batch):
+            tet, _, _ = locator.locate(centroids[s : s + batch])
+            keep[s : s + batch] = in_region[tet]
+        out.append(b.ids[keep])
+    return np.concatenate(out) if out else np.empty(0, dtype=np.int64)
+
+
+def sigma_at_points(sub: InpMesh, sub_sigma: pd.Series, points: np.ndarray) -> np.ndarray:
+    """sigma_vm por elemento del submodelo (índice elem_id) en `points`: el del tet que contiene a cada punto."""
+    elem_ids, locator = _tet_locator(sub)
+    tet, _, _ = locator.locate(np.asarray(points, dtype=float))
+    return sub_sigma.reindex(elem_ids).to_numpy(dtype=float)[tet]
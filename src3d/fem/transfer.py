@@ -0,0 +1,202 @@
+# src3d/fem/transfer.py
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from src3d.fem.frd_reader import read_frd_nodal_von_mises
+from src3d.fem.inp_reader import InpMesh, read_inp
+from src3d.parquet_io_3d import read_columns
+from src3d.read_mesh_3d import read_msh2_3d
+
+# Tipos INP con tets: en C3D10 los 4 primeros nodos son los vértices
+_TET_TYPES = {"C3D4", "C3D10"}
+
+
+@dataclass
+class TransferStats:
+    n_ref_tets: int
+    n_points: int
+    build_s: float
+    query_s: float
+    n_outside: int  # puntos fuera de la malla de referencia (se usa el tet más cercano)
+
+
+def inp_tets(mesh: InpMesh) -> tuple[np.ndarray, np.ndarray]:
+    """Tets (C3D4/C3D10) de un InpMesh -> elem_ids, conn (ids de nodo de los 4 vértices)."""
+    blocks = [b for b in mesh.blocks if b.etype in _TET_TYPES]
+    if not blocks:
+        raise ValueError(f"sin elementos tetraédricos (C3D4/C3D10): {mesh.element_counts()}")
+    return np.concatenate([b.ids for b in blocks]), np.concatenate([b.conn[:, :4] for b in blocks])
+
+
+def load_reference_mesh(path: Path) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Malla de referencia (.msh v2 o .inp) -> node_ids, node_xyz, elem_ids, conn (ids de nodo de los 4 vértices)."""
+    path = Path(path)
+    if path.suffix.lower() == ".inp":
+        mesh = read_inp(path)
+        try:
+            elem_ids, conn = inp_tets(mesh)
+        except ValueError as e:
+            raise ValueError(f"{path}: {e}") from None
+        return mesh.node_ids, mesh.node_xyz, elem_ids, conn
+
+    mesh = read_msh2_3d(path)
+    node_ids = np.fromiter(mesh.nodes.keys(), dtype=np.int64, count=len(mesh.nodes))
+    node_xyz = np.array(list(mesh.nodes.values()), dtype=float).reshape(-1, 3)
+    tets = np.asarray(mesh.tets, dtype=np.int64).reshape(-1, 5)
+    return node_ids, node_xyz, tets[:, 0], tets[:, 1:]
+
+
+def load_reference_sigma(path: Path) -> tuple[str, np.ndarray, np.ndarray]:
+    """
+    sigma_vm de la malla de referencia -> (location, ids, valores):
+      - .frd: von Mises nodal (último bloque STRESS) -> 'node'
+      - .csv/.parquet con node_id,sigma_vm -> 'node'; con elem_id,sigma_vm -> 'elem'
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".frd":
+        nodal = read_frd_nodal_von_mises(path)
+        return "node", nodal.node_ids, nodal.sigma_vm
+    if suffix == ".csv":
+        df = pd.read_csv(path)
+    elif suffix in {".parquet", ".pq"}:
+        df = read_columns(path, ["sigma_vm"], optional=["node_id", "elem_id"])
+    else:
+        raise ValueError(f"Formato de sigma de referencia no soportado: {suffix}. Usa .frd, .csv o .parquet")
+    if "sigma_vm" not in df.columns:
+        raise ValueError(f"Falta columna sigma_vm en {path}")
+    for col, location in (("node_id", "node"), ("elem_id", "elem")):
+        if col in df.columns:
+            return location, df[col].to_numpy(dtype=np.int64), df["sigma_vm"].to_numpy(dtype=float)
+    raise ValueError(f"{path} necesita columna node_id o elem_id junto a sigma_vm")
+
+
+def _spatial_order(points: np.ndarray, cells: int = 64) -> np.ndarray:
+    """Permutación que agrupa los puntos por celda de una grilla gruesa: consultas vecinas tocan la misma zona del KD-tree."""
+    lo, hi = points.min(axis=0), points.max(axis=0)
+    cell = ((points - lo) / np.where(hi > lo, hi - lo, 1.0) * (cells - 1)).astype(np.int64)
+    return np.argsort((cell[:, 0] * cells + cell[:, 1]) * cells + cell[:, 2], kind="stable")
+
+
+def _index_of(ids: np.ndarray, wanted: np.ndarray, missing_msg: str) -> np.ndarray:
+    """Posición de cada id de wanted dentro de ids (lookup denso); error si falta alguno."""
+    lookup = np.full(int(max(ids.max(), wanted.max())) + 1, -1, dtype=np.int64)
+    lookup[ids] = np.arange(ids.size)
+    idx = lookup[wanted]
+    if np.any(idx < 0):
+        raise RuntimeError(f"{int((idx < 0).sum())} {missing_msg}")
+    return idx
+
+
+class TetLocator:
+    """
+    Localización de puntos en una malla de tets: KD-tree sobre centroides para
+    elegir k candidatos y coordenadas baricéntricas (inversas de las matrices
+    de arista precalculadas) evaluadas en bloque. Se queda con el candidato
+    de mayor baricéntrica mínima: si es >= -tol el punto está dentro; si no,
+    es el tet más cercano y las baricéntricas se recortan a [0, 1].
+    """
+
+    def __init__(self, node_xyz: np.ndarray, conn_idx: np.ndarray):
+        p = node_xyz[conn_idx]  # (M,4,3)
+        self.v0 = p[:, 0]
+        edges = np.stack([p[:, 1] - p[:, 0], p[:, 2] - p[:, 0], p[:, 3] - p[:, 0]], axis=2)  # columnas
+        det = np.linalg.det(edges)
+        ok = np.abs(det) > 1e-30 * np.abs(edges).max() ** 3
+        self.inv = np.full_like(edges, np.nan)
+        self.inv[ok] = np.linalg.inv(edges[ok])
+        self.tree = cKDTree(p.mean(axis=1))
+
+    def locate(
+        self, points: np.ndarray, k: int = 8, tol: float = 1e-9, retry_k: int = 64
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """-> (tet, baricéntricas (B,4), inside) para un bloque de puntos; los no ubicados se reintentan con retry_k candidatos."""
+        tet, w, inside = self._locate(points, k, tol)
+        miss = np.flatnonzero(~inside)
+        if miss.size and retry_k > k:
+            tet[miss], w[miss], inside[miss] = self._locate(points[miss], retry_k, tol)
+        return tet, w, inside
+
+    def _locate(self, points: np.ndarray, k: int, tol: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        k = min(k, self.tree.n)
+        _, cand = self.tree.query(points, k=k, workers=-1)
+        cand = cand.reshape(len(points), k)
+        lam = np.einsum("bkij,bkj->bki", self.inv[cand], points[:, None, :] - self.v0[cand])
+        bary = np.concatenate([1.0 - lam.sum(axis=2, keepdims=True), lam], axis=2)  # (B,k,4)
+        score = np.nan_to_num(bary.min(axis=2), nan=-np.inf)
+        best = score.argmax(axis=1)
+        rows = np.arange(len(points))
+        tet = cand[rows, best]
+        w = bary[rows, best]
+        inside = score[rows, best] >= -tol
+        w = np.clip(w, 0.0, None)
+        w /= w.sum(axis=1, keepdims=True)
+        return tet, w, inside
+
+
+def transfer_to_points(
+    ref_mesh: Path,
+    ref_sigma: Path,
+    points: np.ndarray,
+    k: int = 8,
+    batch: int = 100_000,
+) -> tuple[np.ndarray, TransferStats]:
+    """
+    Interpola sigma_vm de la malla de referencia en points (p.ej. centroides
+    coarse): lineal en el tet contenedor si sigma es nodal, constante por tet
+    si es por elemento. Procesa los puntos por bloques de `batch`, ordenados
+    por celda para que cada bloque consulte una región compacta.
+    """
+    node_ids, node_xyz, elem_ids, conn = load_reference_mesh(ref_mesh)
+    location, ids, values = load_reference_sigma(ref_sigma)
+
+    t0 = time.perf_counter()
+    conn_idx = _index_of(node_ids, conn.ravel(), "nodos de la conectividad no existen en la malla de referencia").reshape(conn.shape)
+    locator = TetLocator(node_xyz, conn_idx)
+    if location == "node":
+        nodal = values[_index_of(ids, node_ids, "nodos de la malla de referencia sin sigma_vm")]
+        tet_values = nodal[conn_idx]  # (M,4)
+    else:
+        tet_values = values[_index_of(ids, elem_ids, "elementos de la malla de referencia sin sigma_vm")]
+    build_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    points = np.asarray(points, dtype=float)
+    order = _spatial_order(points) if len(points) else np.empty(0, dtype=np.int64)
+    out = np.empty(len(points))
+    n_outside = 0
+    for s in range(0, len(points), batch):
+        sel = order[s : s + batch]
+        tet, w, inside = locator.locate(points[sel], k=k)
+        if location == "node":
+            out[sel] = np.einsum("bi,bi->b", w, tet_values[tet])
+        else:
+            out[sel] = tet_values[tet]
+        n_outside += int((~inside).sum())
+    query_s = time.perf_counter() - t0
+
+    return out, TransferStats(len(conn), len(points), build_s, query_s, n_outside)
+
+
+def interpolate_nodal(
+    mesh_path: Path, field_ids: np.ndarray, field_values: np.ndarray, points: np.ndarray, k: int = 8
+) -> tuple[np.ndarray, int]:
+    """
+    Campo nodal (N,) o (N,c) definido en los vértices de mesh_path (p.ej.
+    desplazamientos del FRD coarse) -> valores en points por interpolación
+    baricéntrica en el tet contenedor, y cuántos puntos quedaron fuera.
+    """
+    node_ids, node_xyz, _, conn = load_reference_mesh(mesh_path)
+    conn_idx = _index_of(node_ids, conn.ravel(), "nodos de la conectividad no existen en la malla").reshape(conn.shape)
+    values = np.asarray(field_values, dtype=float)
+    nodal = values[_index_of(field_ids, node_ids, "nodos de la malla sin valor en el campo")]
+    tet, w, inside = TetLocator(node_xyz, conn_idx).locate(np.asarray(points, dtype=float), k=k)
+    out = np.einsum("bi,bi...->b...", w, nodal[conn_idx[tet]])
+    return out, int((~inside).sum())
@@ -4,6 +4,7 @@ import argparse
 import numpy as np
 import pandas as pd
 
+from src3d.parquet_io_3d import read_columns
 from src3d.paths3d import ensure_case_dirs, geometry_parquet, sigma_vm_parquet
 
 def main():
@@ -21,7 +22,7 @@ def main():
 
     case_dir, gmsh_dir, models_dir = ensure_case_dirs(args.case, args.runs_dir)
 
-    geom = pd.read_parquet(geometry_parquet(args.case, args.geom_tag, args.runs_dir)).copy()
+    geom = read_columns(geometry_parquet(args.case, args.geom_tag, args.runs_dir), ["elem_id", "cx", "cy", "cz"])
 
     tip = np.array([args.tipx, args.tipy, args.tipz], dtype=float)
     c = geom[["cx", "cy", "cz"]].values.astype(float)
@@ -0,0 +1,152 @@
+# src3d/mesh_graph_3d.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Caras locales de un tetraedro (índices de vértice 0..3)
+_TET_FACES = np.array([[0, 1, 2], [0, 1, 3], [0, 2, 3], [1, 2, 3]], dtype=np.int64)
+
+
+@dataclass
+class TetGraph:
+    """
+    Grafo de adyacencia por caras de una malla de tetraedros.
+
+    - adj: CSR simétrica (M,M) con 1.0 donde dos tets comparten cara.
+    - boundary_faces: (F,3) ids de nodo de las caras que pertenecen a un solo tet.
+    - boundary_owner: (F,) índice (fila) del tet dueño de cada cara de borde.
+    """
+    adj: sparse.csr_matrix
+    boundary_faces: np.ndarray
+    boundary_owner: np.ndarray
+
+    @property
+    def n_elems(self) -> int:
+        return int(self.adj.shape[0])
+
+
+def tet_connectivity(geom: pd.DataFrame) -> np.ndarray:
+    """Conectividad (M,4) int64 desde las columnas n0..n3 de la geometría."""
+    missing = [c for c in ("n0", "n1", "n2", "n3") if c not in geom.columns]
+    if missing:
+        raise ValueError(f"Faltan columnas de conectividad {missing} en geometría")
+    return geom[["n0", "n1", "n2", "n3"]].to_numpy(dtype=np.int64)
+
+
+def build_tet_graph(conn: np.ndarray) -> TetGraph:
+    """
+    Construye la adyacencia por caras de forma vectorizada:
+    ordena las 4M caras (con nodos ordenados) y empareja caras iguales consecutivas.
+    """
+    conn = np.asarray(conn, dtype=np.int64)
+    m = conn.shape[0]
+
+    faces = np.sort(conn[:, _TET_FACES].reshape(-1, 3), axis=1)
+    owner = np.repeat(np.arange(m, dtype=np.int64), 4)
+
+    order = np.lexsort((faces[:, 2], faces[:, 1], faces[:, 0]))
+    faces = faces[order]
+    owner = owner[order]
+
+    same_next = np.all(faces[1:] == faces[:-1], axis=1)
+    i = owner[:-1][same_next]
+    j = owner[1:][same_next]
+
+    shared = np.zeros(faces.shape[0], dtype=bool)
+    shared[:-1] |= same_next
+    shared[1:] |= same_next
+
+    data = np.ones(2 * i.size, dtype=np.float64)
+    adj = sparse.csr_matrix(
+        (data, (np.concatenate([i, j]), np.concatenate([j, i]))),
+        shape=(m, m),
+    )
+    adj.sum_duplicates()
+    adj.data[:] = 1.0
+
+    return TetGraph(adj=adj, boundary_faces=faces[~shared], boundary_owner=owner[~shared])
+
+
+def with_self_loops(adj: sparse.csr_matrix) -> sparse.csr_matrix:
+    """Vecindario cerrado: agrega la diagonal (cada elemento es vecino de sí mismo)."""
+    out = (adj + sparse.identity(adj.shape[0], format="csr", dtype=adj.dtype)).tocsr()
+    out.data[:] = 1.0
+    return out
+
+
+def neighbor_reduce_max(adj: sparse.csr_matrix, values: np.ndarray) -> np.ndarray:
+    """Máximo de `values` sobre los vecinos de cada fila CSR (NaN si no tiene vecinos)."""
+    values = np.asarray(values, dtype=float)
+    out = np.full(adj.shape[0], np.nan)
+    counts = np.diff(adj.indptr)
+    rows = np.flatnonzero(counts > 0)
+    if rows.size:
+        out[rows] = np.maximum.reduceat(values[adj.indices], adj.indptr[rows])
+    return out
+
+
+def neighbor_reduce_min(adj: sparse.csr_matrix, values: np.ndarray) -> np.ndarray:
+    """Mínimo de `values` sobre los vecinos de cada fila CSR (NaN si no tiene vecinos)."""
+    return _row_reduce_min(adj, np.asarray(values, dtype=float)[adj.indices])
+
+
+def _row_reduce_min(adj: sparse.csr_matrix, entry_values: np.ndarray) -> np.ndarray:
+    """Mínimo por fila de valores alineados con las entradas CSR (adj.indices)."""
+    out = np.full(adj.shape[0], np.nan)
+    counts = np.diff(adj.indptr)
+    rows = np.flatnonzero(counts > 0)
+    if rows.size:
+        out[rows] = np.minimum.reduceat(entry_values, adj.indptr[rows])
+    return out
+
+
+def limit_size_gradation(
+    adj: sparse.csr_matrix,
+    h: np.ndarray,
+    *,
+    ratio: float | None = None,
+    lipschitz: float | None = None,
+    centers: np.ndarray | None = None,
+    max_iter: int = 1000,
+) -> tuple[np.ndarray, int, bool]:
+    """
+    Limita la gradación de tamaños entre vecinos reduciendo h (nunca lo aumenta):
+
+    - ratio:     h_i <= ratio * h_j
+    - lipschitz: h_i <= h_j + lipschitz * |c_i - c_j|  (requiere centers)
+
+    Barrido de Jacobi vectorizado h <- min(h, min_j cota_ij) hasta punto fijo;
+    converge en a lo sumo ~diámetro del grafo iteraciones (con ratio=1 o
+    lipschitz=0 en una malla grande puede ser más que max_iter). Devuelve
+    (h, iteraciones, convergió); si no convergió, h todavía viola la cota.
+    """
+    if ratio is None and lipschitz is None:
+        return np.asarray(h, dtype=float).copy(), 0, True
+    if ratio is not None and ratio < 1.0:
+        raise ValueError("ratio debe ser >= 1")
+    if lipschitz is not None and (centers is None or lipschitz < 0):
+        raise ValueError("lipschitz requiere centers y un valor >= 0")
+
+    adj = adj.tocsr()
+    rows = np.repeat(np.arange(adj.shape[0]), np.diff(adj.indptr))
+    cols = adj.indices
+    edge_len = np.linalg.norm(centers[cols] - centers[rows], axis=1) if lipschitz is not None else None
+
+    h = np.asarray(h, dtype=float).copy()
+    for it in range(1, max_iter + 1):
+        hj = h[cols]
+        bound = np.full(hj.shape, np.inf)
+        if ratio is not None:
+            bound = np.minimum(bound, ratio * hj)
+        if lipschitz is not None:
+            bound = np.minimum(bound, hj + lipschitz * edge_len)
+        cap = _row_reduce_min(adj, bound)
+        new = np.fmin(h, cap)
+        if np.array_equal(new, h):
+            return h, it, True
+        h = new
+    return h, max_iter, False
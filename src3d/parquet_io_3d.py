@@ -0,0 +1,49 @@
+# src3d/parquet_io_3d.py
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+
+def parquet_columns(path: Path | str) -> list[str]:
+    """Nombres de columnas desde el footer (no lee datos)."""
+    return pq.read_schema(path).names
+
+
+def parquet_num_rows(path: Path | str) -> int:
+    """Número de filas desde el footer (no lee datos)."""
+    return int(pq.ParquetFile(path).metadata.num_rows)
+
+
+def read_columns(
+    path: Path | str,
+    columns: Sequence[str] | None = None,
+    optional: Iterable[str] = (),
+    filters: list | None = None,
+) -> pd.DataFrame:
+    """
+    Lee solo `columns` (más las de `optional` que existan en el archivo) de un Parquet:
+    los column chunks que no se piden no se leen ni se descomprimen. Con `filters`
+    (formato de pyarrow, ej. [("sigma_vm", ">=", 100.0)]) se descartan row groups por
+    sus estadísticas min/max antes de leerlos y luego las filas que no cumplen.
+
+    La conversión copia las columnas a bloques propios de pandas (escribibles: no hace
+    falta `.copy()` antes de modificar el DataFrame) y libera cada columna de Arrow al
+    copiarla (self_destruct), así el pico queda cerca de 1x la tabla en vez de 2x.
+    No se usa split_blocks: daría arrays de solo lectura respaldados por Arrow.
+    columns=None lee todas las columnas.
+    """
+    path = Path(path)
+    cols = None
+    if columns is not None or optional:
+        names = parquet_columns(path)
+        cols = list(names if columns is None else columns)
+        missing = [c for c in cols if c not in names]
+        if missing:
+            raise ValueError(f"Faltan columnas {missing} en {path.name}")
+        cols += [c for c in optional if c in names and c not in cols]
+    table = pq.read_table(path, columns=cols, filters=filters, use_pandas_metadata=False)
+    return table.to_pandas(self_destruct=True)
@@ -22,21 +22,79 @@ def geometry_parquet(case: str, tag: str = "", runs_dir: Path | str = "runs") ->
     return gmsh / f"element_geometry_3d{suffix}.parquet"
 
 
+def node_coords_parquet(case: str, tag: str = "", runs_dir: Path | str = "runs") -> Path:
+    _, gmsh, _ = ensure_case_dirs(case, runs_dir)
+    suffix = f"_{tag}" if tag else ""
+    return gmsh / f"node_coords_3d{suffix}.parquet"
+
+
+def element_features_parquet(case: str, tag: str = "", runs_dir: Path | str = "runs") -> Path:
+    _, gmsh, _ = ensure_case_dirs(case, runs_dir)
+    suffix = f"_{tag}" if tag else ""
+    return gmsh / f"element_features_3d{suffix}.parquet"
+
+
+def edge_lengths_parquet(case: str, tag: str = "", runs_dir: Path | str = "runs") -> Path:
+    """Longitudes de las aristas únicas de la malla (caché de compare-meshes --case)."""
+    _, gmsh, _ = ensure_case_dirs(case, runs_dir)
+    suffix = f"_{tag}" if tag else ""
+    return gmsh / f"edge_lengths_3d{suffix}.parquet"
+
+
 def sigma_vm_parquet(case: str, tag: str, runs_dir: Path | str = "runs") -> Path:
     _, gmsh, _ = ensure_case_dirs(case, runs_dir)
     return gmsh / f"sigma_vm_{tag}_3d.parquet"
 
 
+def sigma_source_json(case: str, tag: str, runs_dir: Path | str = "runs") -> Path:
+    """De dónde salió sigma_vm_<tag> (backend, si se resolvió, tiempo) para reportar y estimar ahorros."""
+    _, gmsh, _ = ensure_case_dirs(case, runs_dir)
+    return gmsh / f"sigma_source_{tag}_3d.json"
+
+
+def sigma_ref_surrogate_path(runs_dir: Path | str = "runs") -> Path:
+    """Modelo global (entrenado con el corpus de casos de runs_dir) que predice sigma_vm_ref."""
+    Path(runs_dir).mkdir(parents=True, exist_ok=True)
+    return Path(runs_dir) / "sigma_ref_surrogate_3d.joblib"
+
+
+def sigma_ref_surrogate_json(runs_dir: Path | str = "runs") -> Path:
+    """Resumen del surrogate (error de validación por caso, corpus, costo del solve ref)."""
+    Path(runs_dir).mkdir(parents=True, exist_ok=True)
+    return Path(runs_dir) / "sigma_ref_surrogate_3d.json"
+
+
 def dataset_hstar_parquet(case: str, runs_dir: Path | str = "runs") -> Path:
     _, gmsh, _ = ensure_case_dirs(case, runs_dir)
     return gmsh / "dataset_hstar_3d.parquet"
 
 
+def size_error_parquet(case: str, runs_dir: Path | str = "runs") -> Path:
+    """Por elemento adapt: h logrado vs h objetivo del campo de fondo (ratio, región)."""
+    _, gmsh, _ = ensure_case_dirs(case, runs_dir)
+    return gmsh / "size_error_3d.parquet"
+
+
+def size_error_json(case: str, runs_dir: Path | str = "runs") -> Path:
+    _, gmsh, _ = ensure_case_dirs(case, runs_dir)
+    return gmsh / "size_error_3d.json"
+
+
 def rf_model_path(case: str, runs_dir: Path | str = "runs") -> Path:
     _, _, models = ensure_case_dirs(case, runs_dir)
     return models / "rf_hstar_3d.joblib"
 
 
+def tune_results_csv(case: str, runs_dir: Path | str = "runs") -> Path:
+    _, _, models = ensure_case_dirs(case, runs_dir)
+    return models / "tune_results_3d.csv"
+
+
+def cv_folds_path(case: str, runs_dir: Path | str = "runs") -> Path:
+    _, _, models = ensure_case_dirs(case, runs_dir)
+    return models / "cv_folds_3d.npz"
+
+
 def h_pred_element_parquet(case: str, runs_dir: Path | str = "runs") -> Path:
     _, gmsh, _ = ensure_case_dirs(case, runs_dir)
     return gmsh / "h_pred_element_3d.parquet"
@@ -47,6 +105,22 @@ def h_pred_post_parquet(case: str, runs_dir: Path | str = "runs") -> Path:
     return gmsh / "h_pred_post_3d.parquet"
 
 
+def h_pred_decimated_parquet(case: str, runs_dir: Path | str = "runs") -> Path:
+    _, gmsh, _ = ensure_case_dirs(case, runs_dir)
+    return gmsh / "h_pred_decimated_3d.parquet"
+
+
+def element_estimate_json(case: str, runs_dir: Path | str = "runs") -> Path:
+    _, gmsh, _ = ensure_case_dirs(case, runs_dir)
+    return gmsh / "element_estimate_3d.json"
+
+
+def element_count_log_csv(runs_dir: Path | str = "runs") -> Path:
+    """Log global (todas las corridas) de conteo estimado vs real de la malla adapt."""
+    Path(runs_dir).mkdir(parents=True, exist_ok=True)
+    return Path(runs_dir) / "element_count_log_3d.csv"
+
+
 def background_csv_path(case: str, runs_dir: Path | str = "runs") -> Path:
     _, gmsh, _ = ensure_case_dirs(case, runs_dir)
     return gmsh / "background_points_3d.csv"
@@ -54,4 +128,19 @@ def background_csv_path(case: str, runs_dir: Path | str = "runs") -> Path:
 
 def background_pos_path(case: str, runs_dir: Path | str = "runs") -> Path:
     _, gmsh, _ = ensure_case_dirs(case, runs_dir)
-    return gmsh / "background_points_3d.pos"
\ No newline at end of file
+    return gmsh / "background_points_3d.pos"
+
+
+def background_nodes_pos_path(case: str, runs_dir: Path | str = "runs") -> Path:
+    _, gmsh, _ = ensure_case_dirs(case, runs_dir)
+    return gmsh / "background_nodes_3d.pos"
+
+
+def background_tets_pos_path(case: str, runs_dir: Path | str = "runs") -> Path:
+    _, gmsh, _ = ensure_case_dirs(case, runs_dir)
+    return gmsh / "background_tets_3d.pos"
+
+
+def background_grid_path(case: str, runs_dir: Path | str = "runs") -> Path:
+    _, gmsh, _ = ensure_case_dirs(case, runs_dir)
+    return gmsh / "background_grid_3d.bin"
@@ -5,13 +5,15 @@ import argparse
 import numpy as np
 import pandas as pd
 
-def read_geometry(case_dir: Path, tag: str | None) -> pd.DataFrame:
+from src3d.parquet_io_3d import read_columns
+
+def read_geometry(case_dir: Path, tag: str | None, col: str = "h_cbrtV") -> pd.DataFrame:
     tag = (tag or "").strip()
     fname = "element_geometry_3d.parquet" if tag == "" else f"element_geometry_3d_{tag}.parquet"
     path = case_dir / "gmsh" / fname
     if not path.exists():
         raise FileNotFoundError(f"No existe: {path}")
-    return pd.read_parquet(path)
+    return read_columns(path, [col])
 
 def common_bins(series_list: list[pd.Series], nbins: int) -> np.ndarray:
     all_vals = pd.concat(series_list, ignore_index=True)
@@ -70,8 +72,8 @@ def main():
     args = ap.parse_args()
 
     case_dir = Path(args.runs_dir) / args.case
-    coarse = read_geometry(case_dir, args.coarse_tag)
-    adapt  = read_geometry(case_dir, args.adapt_tag)
+    coarse = read_geometry(case_dir, args.coarse_tag, args.col)
+    adapt  = read_geometry(case_dir, args.adapt_tag, args.col)
 
     if args.print_stats:
         describe_h(coarse, args.col, "coarse")
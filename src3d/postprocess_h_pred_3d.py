@@ -1,11 +1,23 @@
 # src3d/postprocess_h_pred_3d.py
 from __future__ import annotations
 import argparse
+import time
+
 import numpy as np
 import pandas as pd
 
+from src3d.element_count_3d import (
+    estimate_element_count,
+    load_calibration,
+    scale_to_target,
+    write_estimate,
+)
+from src3d.mesh_graph_3d import build_tet_graph, limit_size_gradation, tet_connectivity
+from src3d.parquet_io_3d import read_columns
 from src3d.paths3d import (
     ensure_case_dirs,
+    element_count_log_csv,
+    element_estimate_json,
     h_pred_element_parquet,
     geometry_parquet,
     h_pred_post_parquet,
@@ -41,15 +53,21 @@ def main():
     ap.add_argument("--max_factor", type=float, default=1.2)   # hmax = max_factor * h_med
     ap.add_argument("--q_low", type=float, default=0.02)       # winsor
     ap.add_argument("--q_high", type=float, default=0.98)
+    ap.add_argument("--grad_ratio", type=float, default=None, help="Gradación: h_i <= ratio * h_j entre tets vecinos por cara (ej: 1.3)")
+    ap.add_argument("--grad_lipschitz", type=float, default=None, help="Gradación: h_i <= h_j + L * |c_i - c_j| entre vecinos")
+    ap.add_argument("--target_elements", type=int, default=None, help="Reescala h_post (dentro de hmin/hmax) para que la malla adapt estimada tenga ~N tets")
+    ap.add_argument("--geo_name", default="", help="Nombre del .geo: clave de calibración en el log de conteos")
     args = ap.parse_args()
 
     case_dir, gmsh_dir, models_dir = ensure_case_dirs(args.case, args.runs_dir)
 
-    # pred trae: elem_id,cx,cy,cz,h_cbrtV?,sigma_vm_coarse,h_pred
-    pred = pd.read_parquet(h_pred_element_parquet(args.case, args.runs_dir)).copy()
+    # pred trae: elem_id,cx,cy,cz,h_cbrtV?,sigma_vm_coarse,h_pred (solo se usan centroides y h_pred)
+    pred = read_columns(h_pred_element_parquet(args.case, args.runs_dir), ["elem_id", "cx", "cy", "cz", "h_pred"])
 
-    # geom siempre trae el h base "oficial" de la malla coarse
-    geom = pd.read_parquet(geometry_parquet(args.case, tag="", runs_dir=args.runs_dir))[["elem_id", "h_cbrtV"]].copy()
+    # geom siempre trae el h base "oficial" de la malla coarse; la conectividad solo hace falta para la gradación
+    grading = args.grad_ratio is not None or args.grad_lipschitz is not None
+    geom_cols = ["elem_id", "h_cbrtV", "volume", *(["n0", "n1", "n2", "n3"] if grading else [])]
+    geom = read_columns(geometry_parquet(args.case, tag="", runs_dir=args.runs_dir), geom_cols)
     geom = geom.rename(columns={"h_cbrtV": "h_cbrtV_geom"})
 
     df = pred.merge(geom, on="elem_id", how="left")
@@ -79,6 +97,71 @@ def main():
     h_post = h.clip(lower=hmin, upper=hmax)
     df["h_post"] = h_post
 
+    # Gradación sobre la adyacencia por caras. El escalado a target + clamp conserva
+    # h_i/h_j (--grad_ratio), pero multiplica |h_i - h_j| por s: con --grad_lipschitz
+    # y s > 1 se vuelve a graduar después de escalar.
+    n_graded, grad_iters, grad_converged = 0, 0, True
+    graph = build_tet_graph(tet_connectivity(df)) if grading else None
+
+    def grade() -> tuple[int, int, bool]:
+        t0 = time.perf_counter()
+        h_before = df["h_post"].to_numpy(dtype=float)
+        h_graded, iters, converged = limit_size_gradation(
+            graph.adj,
+            h_before,
+            ratio=args.grad_ratio,
+            lipschitz=args.grad_lipschitz,
+            centers=df[["cx", "cy", "cz"]].to_numpy(dtype=float),
+        )
+        df["h_post"] = h_graded
+        n = int(np.count_nonzero(h_graded < h_before))
+        print(
+            f"gradación: {iters} iteraciones, {n} tets ajustados "
+            f"({100.0 * n / max(len(df), 1):.1f}%), {time.perf_counter() - t0:.3f} s"
+        )
+        if not converged:
+            print(f"⚠️ gradación sin converger tras {iters} iteraciones: h_post todavía viola la cota en algunos tets")
+        return n, iters, converged
+
+    if grading:
+        n_graded, grad_iters, grad_converged = grade()
+
+    # Estimación del tamaño de la malla adapt (antes de llamar a Gmsh)
+    if df["volume"].isna().any():
+        raise RuntimeError("Faltan volúmenes coarse para estimar el conteo de elementos.")
+    vol = df["volume"].to_numpy(dtype=float)
+    calib, n_hist = load_calibration(element_count_log_csv(args.runs_dir), args.geo_name)
+    n_est_raw = estimate_element_count(vol, df["h_post"].to_numpy(dtype=float))
+    scale = 1.0
+    if args.target_elements is not None:
+        h_scaled, scale, _ = scale_to_target(
+            vol, df["h_post"].to_numpy(dtype=float), args.target_elements, hmin, hmax, calib=calib
+        )
+        df["h_post"] = h_scaled
+        if args.grad_lipschitz is not None and scale > 1.0:
+            n_regraded, iters, converged = grade()
+            n_graded += n_regraded
+            grad_iters += iters
+            grad_converged &= converged
+        n_est_raw = estimate_element_count(vol, df["h_post"].to_numpy(dtype=float))
+    n_est = calib * n_est_raw
+    write_estimate(
+        element_estimate_json(args.case, args.runs_dir),
+        {
+            "case": args.case,
+            "geo": args.geo_name,
+            "target": args.target_elements,
+            "scale": scale,
+            "n_est_raw": n_est_raw,
+            "calib": calib,
+            "calib_runs": n_hist,
+            "n_est": n_est,
+            "grad_iters": grad_iters,
+            "grad_converged": grad_converged,
+            "grad_adjusted": n_graded,
+        },
+    )
+
     out = h_pred_post_parquet(args.case, args.runs_dir)
     df[["elem_id", "cx", "cy", "cz", "h_pred", "h_post"]].to_parquet(out, index=False)
 
@@ -86,6 +169,11 @@ def main():
     print(f"h_base_col  = {hcol}")
     print(f"h_med       = {h_med}")
     print(f"hmin/hmax   = {hmin} {hmax}")
+    print(f"elementos adapt estimados = {n_est:.0f} (crudo {n_est_raw:.0f} x calib {calib:.3f}, {n_hist} corridas previas)")
+    if args.target_elements is not None:
+        print(f"target_elements = {args.target_elements} -> h_post escalado x{scale:.4f}")
+        if abs(n_est - args.target_elements) > 0.01 * args.target_elements:
+            print("⚠️ target no alcanzable dentro de hmin/hmax; se usa el extremo más cercano")
     print("h_post stats:\n", df["h_post"].describe())
     print(df[["elem_id", "h_pred", "h_post"]].head(10).to_string(index=False))
 
@@ -1,9 +1,10 @@
 # src3d/predict_hstar_3d.py
 from __future__ import annotations
 import argparse
-import pandas as pd
 import joblib
 
+from src3d.compute_element_features_3d import attach_element_features
+from src3d.parquet_io_3d import read_columns
 from src3d.paths3d import (
     ensure_case_dirs,
     rf_model_path,
@@ -23,13 +24,16 @@ def main():
     model = pack["model"]
     feats = pack["features"]
 
-    df = pd.read_parquet(dataset_hstar_parquet(args.case, args.runs_dir)).copy()
+    # Solo las columnas de salida y las features que trae el dataset; el resto sale del cache de features
+    out_cols = ["elem_id", "cx", "cy", "cz", "h_cbrtV", "sigma_vm_coarse"]
+    df = read_columns(dataset_hstar_parquet(args.case, args.runs_dir), out_cols, optional=feats)
+    df = attach_element_features(df, feats, args.case, args.runs_dir)
     X = df[feats]
 
     h_pred = model.predict(X)
     out = h_pred_element_parquet(args.case, args.runs_dir)
 
-    out_df = df[["elem_id","cx","cy","cz","h_cbrtV","sigma_vm_coarse"]].copy()
+    out_df = df[out_cols].copy()
     out_df["h_pred"] = h_pred
     out_df.to_parquet(out, index=False)
 
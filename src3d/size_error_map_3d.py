@@ -0,0 +1,249 @@
+# src3d/size_error_map_3d.py
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from scipy.spatial import cKDTree
+
+from src3d.export_background_points_3d import centroid_background, nodal_background, tet_background
+from src3d.fem.transfer import TetLocator
+from src3d.paths3d import geometry_parquet, size_error_json, size_error_parquet
+
+PERCENTILES = (5, 25, 50, 75, 95)
+_SCHEMA = pa.schema(
+    [
+        ("elem_id", pa.int64()),
+        ("cx", pa.float64()),
+        ("cy", pa.float64()),
+        ("cz", pa.float64()),
+        ("h_achieved", pa.float64()),
+        ("h_target", pa.float64()),
+        ("ratio", pa.float64()),
+        ("region", pa.int8()),
+        ("outside", pa.bool_()),
+    ]
+)
+
+
+class TargetField:
+    """
+    Tamaño objetivo h(x) que vio Gmsh, evaluable por bloques de puntos:
+    points/nodes: KD-tree sobre los puntos del campo (SP; k vecinos con IDW si k > 1),
+    tets: punto ubicado en el tet coarse e interpolación baricéntrica del h nodal (SS).
+    Solo lectura después de construido: se comparte entre hilos.
+    """
+
+    def __init__(self, case: str, runs_dir: Path | str, target: str, source: str = "post", k: int = 1):
+        self.target = target
+        self.k = k
+        if target == "tets":
+            xyz, self._conn, self._h_node = tet_background(case, runs_dir)
+            self._locator = TetLocator(xyz, self._conn)
+            self.values = (self._h_node[self._conn]).mean(axis=1)
+        else:
+            if target == "points":
+                xyz, h = centroid_background(case, runs_dir, source)
+            else:
+                xyz, h, _ = nodal_background(case, runs_dir)
+            self._tree = cKDTree(xyz)
+            self.values = h
+        self.n = len(self.values)
+
+    def __call__(self, points: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """-> (h_target, outside) para un bloque; outside solo aplica a tets (punto fuera de la malla coarse)."""
+        if self.target == "tets":
+            tet, w, inside = self._locator.locate(points)
+            return (w * self._h_node[self._conn[tet]]).sum(axis=1), ~inside
+        outside = np.zeros(len(points), dtype=bool)
+        dist, idx = self._tree.query(points, k=self.k, workers=1)
+        if self.k == 1:
+            return self.values[idx], outside
+        w = 1.0 / np.maximum(dist, 1e-12)
+        return (w * self.values[idx]).sum(axis=1) / w.sum(axis=1), outside
+
+
+def region_edges(values: np.ndarray, n_regions: int) -> np.ndarray:
+    """
+    Cortes entre regiones: bandas geométricas entre el h objetivo mínimo y máximo
+    del campo (región 0 = zona más refinada). Por cuantiles no sirve: con h_post
+    recortado a hmax, muchos puntos comparten el mismo valor y las bandas colapsan.
+    """
+    lo, hi = float(values.min()), float(values.max())
+    if n_regions <= 1 or hi <= lo * (1.0 + 1e-6):
+        return np.empty(0)
+    return np.geomspace(lo, hi, n_regions + 1)[1:-1]
+
+
+def _ordered_map(pool: ThreadPoolExecutor, fn: Callable, items: Iterable, max_in_flight: int) -> Iterator:
+    """pool.map en orden, pero con a lo sumo max_in_flight bloques pendientes (memoria acotada)."""
+    pending: deque = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= max_in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _summary(ratio: np.ndarray, tol: float) -> dict:
+    if ratio.size == 0:
+        return {"n": 0}
+    pct = np.percentile(ratio, PERCENTILES)
+    out = {"n": int(ratio.size)}
+    out.update({f"p{p:02d}": float(v) for p, v in zip(PERCENTILES, pct)})
+    out["frac_ok"] = float(np.mean((ratio >= 1.0 / tol) & (ratio <= tol)))
+    return out
+
+
+def size_error_map(
+    case: str,
+    runs_dir: Path | str = "runs",
+    target: str = "points",
+    source: str = "post",
+    k: int = 1,
+    achieved_col: str = "h_cbrtV",
+    n_regions: int = 4,
+    tol: float = 1.5,
+    chunk: int = 500_000,
+    workers: int = 0,
+) -> dict:
+    """
+    ratio = h logrado (achieved_col del adapt) / h objetivo en el centroide, para
+    cada elemento adapt. Lee el adapt por bloques de `chunk` filas, los evalúa en
+    un pool de hilos (el KD-tree y el locator liberan el GIL) y escribe el Parquet
+    bloque a bloque en orden; solo ratio/región quedan en memoria para los percentiles.
+    """
+    t0 = time.perf_counter()
+    field = TargetField(case, runs_dir, target, source, k)
+    edges = region_edges(field.values, n_regions)
+    t_build = time.perf_counter() - t0
+
+    def evaluate(batch: pa.RecordBatch) -> pa.Table:
+        xyz = np.column_stack([batch.column(c).to_numpy() for c in ("cx", "cy", "cz")])
+        h_ach = batch.column(achieved_col).to_numpy().astype(np.float64)
+        h_tgt, outside = field(xyz)
+        return pa.table(
+            {
+                "elem_id": batch.column("elem_id").to_numpy().astype(np.int64),
+                "cx": xyz[:, 0],
+                "cy": xyz[:, 1],
+                "cz": xyz[:, 2],
+                "h_achieved": h_ach,
+                "h_target": h_tgt,
+                "ratio": h_ach / np.maximum(h_tgt, 1e-30),
+                "region": np.searchsorted(edges, h_tgt).astype(np.int8),
+                "outside": outside,
+            },
+            schema=_SCHEMA,
+        )
+
+    adapt = pq.ParquetFile(geometry_parquet(case, "adapt", runs_dir))
+    workers = workers or os.cpu_count() or 1
+    out = size_error_parquet(case, runs_dir)
+    ratios, regions = [], []
+    n_outside = 0
+    t0 = time.perf_counter()
+    batches = adapt.iter_batches(batch_size=chunk, columns=["elem_id", "cx", "cy", "cz", achieved_col])
+    with ThreadPoolExecutor(max_workers=workers) as pool, pq.ParquetWriter(out, _SCHEMA) as writer:
+        for table in _ordered_map(pool, evaluate, batches, max_in_flight=2 * workers):
+            writer.write_table(table)
+            ratios.append(table.column("ratio").to_numpy().astype(np.float32))
+            regions.append(table.column("region").to_numpy())
+            n_outside += int(table.column("outside").to_numpy().sum())
+    t_map = time.perf_counter() - t0
+
+    ratio = np.concatenate(ratios) if ratios else np.empty(0, dtype=np.float32)
+    region = np.concatenate(regions) if regions else np.empty(0, dtype=np.int8)
+    bounds = np.concatenate([[float(field.values.min())], edges, [float(field.values.max())]])
+    summary = {
+        "case": case,
+        "target": target,
+        "source": source if target == "points" else "post",
+        "achieved_col": achieved_col,
+        "tol": tol,
+        "n_field": field.n,
+        "n_outside": n_outside,
+        "build_s": t_build,
+        "map_s": t_map,
+        "all": _summary(ratio, tol),
+        "regions": [
+            {"region": r, "h_lo": float(bounds[r]), "h_hi": float(bounds[r + 1]), **_summary(ratio[region == r], tol)}
+            for r in range(len(edges) + 1)
+        ],
+    }
+    size_error_json(case, runs_dir).write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    return summary
+
+
+def print_summary(summary: dict) -> None:
+    cols = ["n", *(f"p{p:02d}" for p in PERCENTILES), "frac_ok"]
+    print(f"{'región':>7} {'h objetivo':>21} " + " ".join(f"{c:>9}" for c in cols))
+    for row in [*summary["regions"], {"region": "todas", **summary["all"]}]:
+        h = f"{row['h_lo']:.4g}..{row['h_hi']:.4g}" if "h_lo" in row else ""
+        vals = [f"{row.get(c, float('nan')):>9.4g}" if c != "n" else f"{row.get('n', 0):>9}" for c in cols]
+        print(f"{row['region']!s:>7} {h:>21} " + " ".join(vals))
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Mapa de error de tamaño: h logrado por elemento adapt vs h objetivo del campo de fondo en su centroide."
+    )
+    ap.add_argument("--case", required=True)
+    ap.add_argument("--runs-dir", default="runs")
+    ap.add_argument(
+        "--target",
+        choices=["points", "nodes", "tets"],
+        default="points",
+        help="Campo objetivo como lo exportó export_background_points_3d: points (SP en centroides, KD-tree), "
+        "nodes (SP en nodos coarse, KD-tree) o tets (SS: ubica el centroide en el tet coarse e interpola el h nodal)",
+    )
+    ap.add_argument("--input", choices=["post", "decimated"], default="post", help="(points) h_pred_post o el decimado")
+    ap.add_argument("--k", type=int, default=1, help="(points/nodes) vecinos; > 1 interpola con IDW")
+    ap.add_argument("--achieved-col", default="h_cbrtV", help="Columna de element_geometry_3d_adapt con el h logrado")
+    ap.add_argument("--regions", type=int, default=4, help="Bandas geométricas del h objetivo (0 = más refinada)")
+    ap.add_argument("--tol", type=float, default=1.5, help="frac_ok = fracción con ratio en [1/tol, tol]")
+    ap.add_argument("--chunk", type=int, default=500_000, help="Elementos adapt por bloque")
+    ap.add_argument("--workers", type=int, default=0, help="Hilos que evalúan bloques (0 = n° de CPUs)")
+    args = ap.parse_args()
+
+    if not 1 <= args.regions <= 127:
+        raise ValueError("--regions debe estar entre 1 y 127")
+    if args.target != "points" and args.input != "post":
+        raise ValueError(f"--target {args.target} requiere --input post.")
+    summary = size_error_map(
+        args.case,
+        args.runs_dir,
+        target=args.target,
+        source=args.input,
+        k=args.k,
+        achieved_col=args.achieved_col,
+        n_regions=args.regions,
+        tol=args.tol,
+        chunk=args.chunk,
+        workers=args.workers,
+    )
+
+    n = summary["all"].get("n", 0)
+    print(
+        f"OK: ratio h logrado/objetivo de {n} elementos adapt ({args.target}, {summary['n_field']} puntos/tets de campo) "
+        f"en {summary['map_s']:.2f} s ({n / max(summary['map_s'], 1e-9):.0f} elem/s; campo {summary['build_s']:.2f} s)"
+    )
+    if summary["n_outside"]:
+        print(f"⚠️  {summary['n_outside']} centroides adapt fuera de la malla coarse (se usó el tet más cercano)")
+    print_summary(summary)
+    print(f"OK: mapa guardado en: {size_error_parquet(args.case, args.runs_dir)}")
+    print(f"OK: resumen en: {size_error_json(args.case, args.runs_dir)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,39 @@
 from __future__ import annotations
 
 import argparse
-import re
+import json
 import subprocess
+import time
 from pathlib import Path
-from typing import Iterable
 
+import joblib
 import numpy as np
 import pandas as pd
 
-from src3d.fem.calculix_runner import run_ccx
+from src3d.fem.calculix_runner import run_ccx, run_info_path
 from src3d.fem.cgx_extract_sigma_vm import run_cgx, write_cgx_script
+from src3d.fem.frd_reader import (
+    element_von_mises,
+    extract_sigma_vm_frd,
+    read_frd_nodal_displacement,
+    read_frd_nodal_von_mises,
+)
+from src3d.fem.inp_reader import InpMesh, read_inp
 from src3d.fem.parse_results import read_sigma_vm_table
-from src3d.paths3d import ensure_case_dirs, geometry_parquet, sigma_vm_parquet
+from src3d.fem.result_cache import FemResultCache
+from src3d.fem.submodel import map_region, same_mesh, select_region, sigma_at_points, submesh
+from src3d.fem.transfer import interpolate_nodal, transfer_to_points
+from src3d.parquet_io_3d import read_columns
+from src3d.paths3d import (
+    ensure_case_dirs,
+    geometry_parquet,
+    node_coords_parquet,
+    sigma_ref_surrogate_json,
+    sigma_ref_surrogate_path,
+    sigma_source_json,
+    sigma_vm_parquet,
+)
+from src3d.train_sigma_ref_surrogate_3d import predict_sigma_ref
 
 
 def _normalize_cli_path(path: Path | str) -> Path:
@@ -59,13 +80,6 @@ def _default_sigma_csv(case: str, runs_dir: str | Path, tag: str) -> Path:
     return _default_ccx_workdir(case, runs_dir, tag) / "sigma_vm.csv"
 
 
-_NODE_LINE_RE = re.compile(
-    r"^\s*(\d+)\s*,\s*([+-]?\d*\.?\d+(?:[eE][+-]?\d+)?)\s*,\s*"
-    r"([+-]?\d*\.?\d+(?:[eE][+-]?\d+)?)\s*,\s*([+-]?\d*\.?\d+(?:[eE][+-]?\d+)?)\s*$"
-)
-_ELEM_LINE_RE = re.compile(r"^\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*$")
-
-
 def _export_mesh_inp_from_msh(*, gmsh_exe: str, msh_path: Path, out_inp: Path) -> None:
     out_inp.parent.mkdir(parents=True, exist_ok=True)
 
@@ -78,10 +92,10 @@ def _export_mesh_inp_from_msh(*, gmsh_exe: str, msh_path: Path, out_inp: Path) -
 
     for cmd in candidate_cmds:
         print(f"[cmd] {' '.join(cmd)}")
-        subprocess.run(cmd, check=True)
-        if out_inp.exists():
+        proc = subprocess.run(cmd, check=False)
+        if proc.returncode == 0 and out_inp.exists():
             return
-        print(f"⚠️  Gmsh terminó pero no creó {out_inp}. Reintentando con otra variante...")
+        print(f"⚠️  Gmsh ({proc.returncode}) no creó {out_inp}. Reintentando con otra variante...")
 
     raise RuntimeError(
         "Gmsh terminó sin crear mesh.inp tras varios intentos. "
@@ -91,75 +105,9 @@ def _export_mesh_inp_from_msh(*, gmsh_exe: str, msh_path: Path, out_inp: Path) -
     )
 
 
-def _read_nodes_from_inp(mesh_inp: Path) -> pd.DataFrame:
-    """Lee bloque *NODE de INP exportado por Gmsh."""
-    lines = mesh_inp.read_text(encoding="utf-8", errors="ignore").splitlines()
-    in_node = False
-    rows: list[tuple[int, float, float, float]] = []
-
-    for line in lines:
-        row = line.strip()
-        if not row:
-            continue
-        if row.upper().startswith("*NODE"):
-            in_node = True
-            continue
-        if in_node and row.startswith("*"):
-            break
-        if in_node:
-            m = _NODE_LINE_RE.match(row)
-            if m:
-                rows.append(
-                    (
-                        int(m.group(1)),
-                        float(m.group(2)),
-                        float(m.group(3)),
-                        float(m.group(4)),
-                    )
-                )
-
-    if not rows:
-        raise RuntimeError(f"No pude leer nodos desde {mesh_inp}. Verifica bloque *NODE.")
-    return pd.DataFrame(rows, columns=["node_id", "x", "y", "z"])
-
-
-def _read_elements_from_inp(mesh_inp: Path) -> pd.DataFrame:
-    """Lee el primer bloque *ELEMENT tetra4 del INP."""
-    lines = mesh_inp.read_text(encoding="utf-8", errors="ignore").splitlines()
-    in_elem = False
-    rows: list[tuple[int, int, int, int, int]] = []
-
-    for line in lines:
-        row = line.strip()
-        if not row:
-            continue
-        if row.upper().startswith("*ELEMENT"):
-            in_elem = True
-            continue
-        if in_elem and row.startswith("*"):
-            break
-        if in_elem:
-            m = _ELEM_LINE_RE.match(row)
-            if m:
-                rows.append(
-                    (
-                        int(m.group(1)),
-                        int(m.group(2)),
-                        int(m.group(3)),
-                        int(m.group(4)),
-                        int(m.group(5)),
-                    )
-                )
-
-    if not rows:
-        raise RuntimeError(
-            f"No pude leer elementos tetra4 desde {mesh_inp}. "
-            "Si tu INP usa otro tipo de elemento, ajusta el parser."
-        )
-    return pd.DataFrame(rows, columns=["elem_id", "n1", "n2", "n3", "n4"])
-
-
-def _pick_face_nodes(nodes: pd.DataFrame, *, axis: str, side: str, tol: float) -> np.ndarray:
+def _pick_face_nodes(
+    node_ids: np.ndarray, node_xyz: np.ndarray, *, axis: str, side: str, tol: float
+) -> np.ndarray:
     axis = axis.lower().strip()
     side = side.lower().strip()
     if axis not in {"x", "y", "z"}:
@@ -167,9 +115,9 @@ def _pick_face_nodes(nodes: pd.DataFrame, *, axis: str, side: str, tol: float) -
     if side not in {"min", "max"}:
         raise ValueError("side debe ser min|max")
 
-    values = nodes[axis].to_numpy(dtype=float)
+    values = node_xyz[:, "xyz".index(axis)]
     target = float(np.min(values) if side == "min" else np.max(values))
-    selected = nodes.loc[np.abs(values - target) <= float(tol), "node_id"].to_numpy(dtype=int)
+    selected = node_ids[np.abs(values - target) <= float(tol)]
 
     if selected.size == 0:
         raise RuntimeError(
@@ -179,13 +127,22 @@ def _pick_face_nodes(nodes: pd.DataFrame, *, axis: str, side: str, tol: float) -
     return selected
 
 
-def _format_id_list(ids: Iterable[int], *, per_line: int = 16) -> str:
-    vals = [int(v) for v in ids]
-    lines = []
-    for i in range(0, len(vals), per_line):
-        chunk = vals[i : i + per_line]
-        lines.append(", ".join(str(v) for v in chunk))
-    return "\n".join(lines)
+def _format_rows(cols: list[np.ndarray], *, per_line: int = 1) -> str:
+    """Columnas (arrays de str) -> líneas 'a, b, ...' con per_line filas por línea, sin loop por fila."""
+    n = len(cols[0])
+    if n == 0:
+        return ""
+    cell = cols[0].astype(object)
+    for c in cols[1:]:
+        cell = cell + ", " + c.astype(object)
+    seps = np.full(n, ", ", dtype=object)
+    seps[per_line - 1 :: per_line] = "\n"
+    seps[-1] = ""
+    return "".join(cell + seps)
+
+
+def _format_id_list(ids: np.ndarray, *, per_line: int = 16) -> str:
+    return _format_rows([np.asarray(ids, dtype=np.int64).astype(str)], per_line=per_line)
 
 
 def _autogen_job_inp(
@@ -195,8 +152,7 @@ def _autogen_job_inp(
     case: str,
     tag: str,
     mesh_inp_name: str,
-    nodes: pd.DataFrame,
-    elems: pd.DataFrame,
+    mesh: InpMesh,
     mat_name: str,
     mat_e: float,
     mat_nu: float,
@@ -216,9 +172,12 @@ def _autogen_job_inp(
     - material lineal isotrópico + solid section
     - *BOUNDARY y *CLOAD nodal distribuido
     """
-    fix_nodes = _pick_face_nodes(nodes, axis=fix_axis, side=fix_side, tol=face_tol)
-    load_nodes = _pick_face_nodes(nodes, axis=load_axis, side=load_side, tol=face_tol)
-    eall = elems["elem_id"].to_numpy(dtype=int)
+    fix_nodes = _pick_face_nodes(mesh.node_ids, mesh.node_xyz, axis=fix_axis, side=fix_side, tol=face_tol)
+    load_nodes = _pick_face_nodes(mesh.node_ids, mesh.node_xyz, axis=load_axis, side=load_side, tol=face_tol)
+    # EALL = todos los bloques sólidos (C3D4, C3D10, C3D6, ...), no solo el primero
+    eall = mesh.solid_element_ids()
+    if eall.size == 0:
+        raise RuntimeError(f"{mesh_inp_name} no tiene elementos sólidos (C3D*): {mesh.element_counts()}")
 
     dof_by_axis = {"x": 1, "y": 2, "z": 3}
     load_dof = dof_by_axis[load_axis.lower()]
@@ -246,7 +205,16 @@ def _autogen_job_inp(
         "NSET_FIX, 1, 3, 0.0",
         "*CLOAD",
     ]
-    lines.extend(f"{nid}, {load_dof}, {f_per_node}" for nid in load_nodes)
+    n_load = len(load_nodes)
+    lines.append(
+        _format_rows(
+            [
+                load_nodes.astype(str),
+                np.full(n_load, str(load_dof), dtype=object),
+                np.full(n_load, str(f_per_node), dtype=object),
+            ]
+        )
+    )
     lines.extend(
         [
             "*EL FILE",
@@ -263,6 +231,245 @@ def _autogen_job_inp(
     return job_inp
 
 
+def _autogen_submodel_inp(
+    *,
+    workdir: Path,
+    ccx_job: str,
+    sub: InpMesh,
+    cut_nodes: np.ndarray,
+    cut_disp: np.ndarray,
+    fix_nodes: np.ndarray,
+    load_nodes: np.ndarray,
+    load_dof: int,
+    f_per_node: float,
+    mat_name: str,
+    mat_e: float,
+    mat_nu: float,
+) -> Path:
+    """
+    Crea submodel_mesh.inp (nodos y elementos de la región) y <ccx_job>.inp:
+    mismo material que el job completo, desplazamientos del coarse impuestos en
+    los nodos de corte y las BCs/cargas originales que caen dentro de la región.
+    """
+    mesh_lines = ["*NODE", _format_rows([sub.node_ids.astype(str), *(np.char.mod("%.10g", c) for c in sub.node_xyz.T)])]
+    for k, b in enumerate(sub.blocks):
+        mesh_lines.append(f"*ELEMENT, TYPE={b.etype}, ELSET=SUB{k + 1}")
+        mesh_lines.append(_format_rows([b.ids.astype(str), *(c.astype(str) for c in b.conn.T)]))
+    mesh_name = "submodel_mesh.inp"
+    (workdir / mesh_name).write_text("\n".join(mesh_lines) + "\n", encoding="utf-8")
+
+    lines = [
+        f"*INCLUDE, INPUT={mesh_name}",
+        "",
+        "*ELSET, ELSET=EALL",
+        _format_id_list(sub.solid_element_ids()),
+    ]
+    if fix_nodes.size:
+        lines.extend(["*NSET, NSET=NSET_FIX", _format_id_list(fix_nodes)])
+    lines.extend(
+        [
+            "",
+            f"*MATERIAL, NAME={mat_name}",
+            "*ELASTIC",
+            f"{mat_e}, {mat_nu}",
+            f"*SOLID SECTION, ELSET=EALL, MATERIAL={mat_name}",
+            "",
+            "*STEP",
+            "*STATIC",
+            "*BOUNDARY",
+        ]
+    )
+    if fix_nodes.size:
+        lines.append("NSET_FIX, 1, 3, 0.0")
+    n_cut = len(cut_nodes)
+    dofs = np.tile(np.array(["1", "2", "3"], dtype=object), n_cut)
+    lines.append(
+        _format_rows([np.repeat(cut_nodes.astype(str), 3), dofs, dofs, np.char.mod("%.9e", cut_disp.ravel())])
+    )
+    if load_nodes.size:
+        n_load = len(load_nodes)
+        lines.append("*CLOAD")
+        lines.append(
+            _format_rows(
+                [
+                    load_nodes.astype(str),
+                    np.full(n_load, str(load_dof), dtype=object),
+                    np.full(n_load, str(f_per_node), dtype=object),
+                ]
+            )
+        )
+    lines.extend(["*EL FILE", "S, E", "*NODE FILE", "U", "*END STEP", ""])
+
+    job_inp = workdir / f"{ccx_job}.inp"
+    job_inp.write_text("\n".join(lines), encoding="utf-8")
+    return job_inp
+
+
+def _previous_full_ref_seconds(case: str, runs_dir: Path) -> float | None:
+    """Tiempo del último solve ref completo de este caso (para medir el speedup del submodelo)."""
+    path = sigma_source_json(case, "ref", runs_dir)
+    if not path.exists():
+        return None
+    prev = json.loads(path.read_text(encoding="utf-8"))
+    if prev.get("source") == "calculix" and prev.get("solved"):
+        return prev["wall_s"]
+    return prev.get("full_ref_wall_s")
+
+
+def _run_submodel(args: argparse.Namespace, geom: pd.DataFrame, runs_dir: Path) -> tuple[pd.DataFrame, str, dict]:
+    """Solve ref solo en la región caliente (core + buffer) con BCs de desplazamiento del coarse."""
+    full_ref_s = _previous_full_ref_seconds(args.case, runs_dir)
+    workdir = _normalize_cli_path(args.ccx_workdir) if args.ccx_workdir else _default_ccx_workdir(args.case, runs_dir, "ref")
+    coarse_wd = (
+        _normalize_cli_path(args.coarse_ccx_workdir)
+        if args.coarse_ccx_workdir
+        else _default_ccx_workdir(args.case, runs_dir, "coarse")
+    )
+    coarse_frd = coarse_wd / f"{args.ccx_job}.frd"
+    coarse_inp = coarse_wd / "mesh.inp"
+    for p in (coarse_frd, coarse_inp):
+        if not p.exists():
+            raise FileNotFoundError(f"El submodelo necesita la solución ccx coarse: falta {p} (corre coarse con --ccx-run)")
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    t0 = time.perf_counter()
+    sc = read_columns(sigma_vm_parquet(args.case, "coarse", runs_dir), ["elem_id", "sigma_vm"])
+    df = geom.merge(sc, on="elem_id", how="inner")
+    if len(df) != len(geom):
+        raise RuntimeError(f"sigma_vm_coarse no cubre {len(geom) - len(df)} elementos: corre primero el tag coarse")
+    region = select_region(df, df["sigma_vm"].to_numpy(dtype=float), args.submodel_quantile, args.submodel_layers)
+
+    mesh_inp = workdir / "mesh.inp"
+    if not mesh_inp.exists():
+        _export_mesh_inp_from_msh(
+            gmsh_exe=args.gmsh_exe, msh_path=_guess_msh_path(args.case, runs_dir, "ref"), out_inp=mesh_inp
+        )
+    mesh = read_inp(mesh_inp)
+    coarse_mesh = read_inp(coarse_inp)
+    unrefined = same_mesh(mesh, coarse_mesh)
+    if unrefined:
+        print(
+            f"⚠️ La malla ref del submodelo ({mesh_inp}) es la misma que la coarse ({mesh.element_counts()}): "
+            "con los desplazamientos del coarse el submodelo repite la solución coarse y no refina nada. "
+            "Usa una malla ref más fina o de otro tipo (p.ej. C3D10)."
+        )
+    # Región por geometría: los elem_id coarse no identifican elementos de otra malla ref
+    sub, cut = submesh(mesh, map_region(mesh, coarse_mesh, region.region_ids))
+    cut_xyz = sub.node_xyz[np.searchsorted(sub.node_ids, cut)]  # sub.node_ids viene ordenado (np.unique)
+    frd_ids, frd_disp = read_frd_nodal_displacement(coarse_frd)
+    cut_disp, n_out = interpolate_nodal(coarse_inp, frd_ids, frd_disp, cut_xyz)
+
+    # BCs y carga del job completo (mismas caras del bounding box), restringidas a la región
+    fix_all = _pick_face_nodes(mesh.node_ids, mesh.node_xyz, axis=args.fix_axis, side=args.fix_side, tol=args.face_tol)
+    load_all = _pick_face_nodes(mesh.node_ids, mesh.node_xyz, axis=args.load_axis, side=args.load_side, tol=args.face_tol)
+    free = np.setdiff1d(sub.node_ids, cut)
+    job = f"{args.ccx_job}_sub"
+    _autogen_submodel_inp(
+        workdir=workdir,
+        ccx_job=job,
+        sub=sub,
+        cut_nodes=cut,
+        cut_disp=cut_disp,
+        fix_nodes=np.intersect1d(fix_all, free),
+        load_nodes=np.intersect1d(load_all, free),
+        load_dof={"x": 1, "y": 2, "z": 3}[args.load_axis],
+        f_per_node=float(args.load_f) / float(len(load_all)),
+        mat_name=args.mat_name,
+        mat_e=args.mat_e,
+        mat_nu=args.mat_nu,
+    )
+    t_deck = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    frd, _ = run_ccx(args.ccx_exe, job, workdir, threads=args.ccx_threads or None)
+    t_ccx = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    sub_sigma = element_von_mises(read_frd_nodal_von_mises(frd), sub).set_index("elem_id")["sigma_vm"]
+    sigma = df.set_index("elem_id")["sigma_vm"].copy()
+    is_core = sigma.index.isin(region.core_ids)
+    sigma[is_core] = sigma_at_points(sub, sub_sigma, df.loc[is_core, ["cx", "cy", "cz"]].to_numpy())
+    sigma_df = sigma.reset_index()
+    t_extract = time.perf_counter() - t0
+
+    n_full_nodes = len(mesh.node_ids)
+    n_sub_elems, n_ref_elems = sub.solid_element_ids().size, mesh.solid_element_ids().size
+    print(
+        f"Submodelo: región coarse {len(region.region_ids)}/{region.n_elems} elementos "
+        f"(core {len(region.core_ids)}, buffer {args.submodel_layers} capas) -> "
+        f"ref {n_sub_elems}/{n_ref_elems} elementos ({n_sub_elems / n_ref_elems:.1%}) | "
+        f"{len(sub.node_ids)}/{n_full_nodes} nodos ({len(sub.node_ids) / n_full_nodes:.1%}) | "
+        f"{len(cut)} nodos de corte ({n_out} fuera de la malla coarse)"
+    )
+    print(f"Tiempo submodelo: región+deck {t_deck:.2f} s | ccx {t_ccx:.2f} s | extracción {t_extract:.2f} s")
+    source = {
+        "solved": True,
+        "submodel": {
+            "quantile": args.submodel_quantile,
+            "layers": args.submodel_layers,
+            "core_elems": int(len(region.core_ids)),
+            "region_elems": int(len(region.region_ids)),
+            "full_elems": int(region.n_elems),
+            "ref_region_elems": int(n_sub_elems),
+            "ref_full_elems": int(n_ref_elems),
+            "region_nodes": int(len(sub.node_ids)),
+            "full_nodes": int(n_full_nodes),
+            "cut_nodes": int(len(cut)),
+            "same_mesh_as_coarse": unrefined,
+            "ccx_s": t_ccx,
+        },
+    }
+    if full_ref_s is not None:
+        source["full_ref_wall_s"] = full_ref_s
+        source["ref_s_est"] = full_ref_s
+    note = (
+        f"Nota: sigma ref por submodelo ({len(region.core_ids)} elementos core desde {frd.name}; "
+        "resto = sigma coarse)."
+    )
+    return sigma_df, note, source
+
+
+def _fem_cache_status_path(workdir: Path) -> Path:
+    return workdir / "fem_cache.json"
+
+
+def _fem_cache_lookup(
+    cache: FemResultCache, key: str, workdir: Path, case: str, tag: str, t0: float
+) -> pd.DataFrame | None:
+    cached = workdir / "sigma_vm.parquet"
+    run_meta = workdir / "fem_cache_run.json"
+    if not cache.restore(key, {"sigma_vm.parquet": cached, "ccx_run.json": run_meta}):
+        return None
+    ext_df = read_columns(cached, ["elem_id", "sigma_vm"])
+    lookup_ms = (time.perf_counter() - t0) * 1e3
+    wall = json.loads(run_meta.read_text(encoding="utf-8"))["wall_s"]
+    hits, misses = cache.log(case, tag, key, "hit", wall, lookup_ms)
+    _fem_cache_status_path(workdir).write_text(
+        json.dumps({"status": "hit", "key": key, "ccx_wall_s": wall, "lookup_ms": lookup_ms}), encoding="utf-8"
+    )
+    print(
+        f"Cache FEM ({tag}): HIT {key[:12]} en {lookup_ms:.1f} ms (ccx evitado: {wall:.2f} s) "
+        f"| histórico {hits} hit / {misses} miss"
+    )
+    return ext_df
+
+
+def _fem_cache_store(
+    cache: FemResultCache, key: str, ext_df: pd.DataFrame, workdir: Path, ccx_job: str, case: str, tag: str, lookup_ms: float
+) -> None:
+    cached = workdir / "sigma_vm.parquet"
+    cached.unlink(missing_ok=True)  # puede ser hardlink a una entrada del cache
+    ext_df.to_parquet(cached, index=False)
+    run_json = run_info_path(workdir, ccx_job)
+    cache.store(key, {"sigma_vm.parquet": cached, "ccx_run.json": run_json})
+    wall = json.loads(run_json.read_text(encoding="utf-8"))["wall_s"]
+    hits, misses = cache.log(case, tag, key, "miss", wall, lookup_ms)
+    _fem_cache_status_path(workdir).write_text(
+        json.dumps({"status": "miss", "key": key, "ccx_wall_s": wall, "lookup_ms": lookup_ms}), encoding="utf-8"
+    )
+    print(f"Cache FEM ({tag}): MISS {key[:12]} -> guardado | histórico {hits} hit / {misses} miss")
+
+
 def _guess_msh_path(case: str, runs_dir: Path, tag: str) -> Path:
     candidates = [
         runs_dir / case / "gmsh" / f"{tag}_3d.msh",
@@ -287,7 +494,33 @@ def main() -> None:
     ap.add_argument("--tag", required=True, choices=["coarse", "ref"])
     ap.add_argument("--geom-tag", default="", help="tag de geometría: '' o 'adapt'")
 
-    ap.add_argument("--backend", choices=["fallback", "calculix"], default="fallback")
+    ap.add_argument("--backend", choices=["fallback", "calculix", "transfer", "surrogate", "submodel"], default="fallback")
+
+    # Submodelo (solo tag ref): ccx solo en la región de sigma coarse alto + buffer
+    ap.add_argument("--submodel-quantile", type=float, default=0.9, help="(submodel) Core = elementos con sigma coarse >= este cuantil")
+    ap.add_argument("--submodel-layers", type=int, default=2, help="(submodel) Capas de vecinos (por nodo) de buffer alrededor del core")
+    ap.add_argument(
+        "--coarse-ccx-workdir",
+        default="",
+        help="(submodel) Workdir ccx coarse (<job>.frd con DISP y mesh.inp). Si no se da: runs/<case>/ccx/coarse/",
+    )
+
+    # Surrogate (solo tag ref): sigma_ref predicho desde la solución coarse con el modelo del corpus
+    ap.add_argument(
+        "--surrogate-model",
+        default="",
+        help="(surrogate) Modelo de train_sigma_ref_surrogate_3d. Si no se da: <runs-dir>/sigma_ref_surrogate_3d.joblib",
+    )
+
+    # Transfer: sigma de una malla de referencia (más fina) interpolada en los centroides
+    ap.add_argument("--ref-mesh", default="", help="(transfer) Malla de referencia .msh (v2) o .inp")
+    ap.add_argument(
+        "--ref-sigma",
+        default="",
+        help="(transfer) sigma_vm de la malla de referencia: .frd (nodal) o .csv/.parquet con node_id|elem_id,sigma_vm",
+    )
+    ap.add_argument("--transfer-k", type=int, default=8, help="(transfer) Tets candidatos por punto (KD-tree de centroides)")
+    ap.add_argument("--transfer-batch", type=int, default=100_000, help="(transfer) Puntos por bloque")
 
     # Entrada genérica para FEM externo (CalculiX/ANSYS): CSV/Parquet con elem_id,sigma_vm
     ap.add_argument(
@@ -323,6 +556,19 @@ def main() -> None:
         action="store_true",
         help="Si se activa, ejecuta ccx antes de leer sigma_vm.csv.",
     )
+    ap.add_argument(
+        "--ccx-threads",
+        type=int,
+        default=0,
+        help="Threads de ccx (OMP_NUM_THREADS y CCX_NPROC_EQUATION_SOLVER). 0 = hereda el entorno.",
+    )
+    ap.add_argument(
+        "--fem-cache-dir",
+        default="",
+        help="Cache persistente de resultados (clave: hash de job.inp + *INCLUDE, ejecutable de ccx y extractor). "
+        "Un acierto entrega sigma_vm sin correr ccx.",
+    )
+    ap.add_argument("--fem-cache-max-gb", type=float, default=5.0, help="Tamaño máximo del cache FEM (desalojo LRU)")
 
     ap.add_argument(
         "--ccx-autogen-inp",
@@ -340,24 +586,33 @@ def main() -> None:
     ap.add_argument("--load-side", choices=["min", "max"], default="max")
     ap.add_argument("--load-f", type=float, default=-1000.0)
 
+    ap.add_argument(
+        "--sigma-extractor",
+        choices=["frd", "cgx"],
+        default="frd",
+        help="Cómo crear sigma_vm.csv si falta: frd (lector nativo de <job>.frd, von Mises nodal "
+        "promediado por elemento) o cgx (script batch externo).",
+    )
     ap.add_argument("--cgx-exe", default="cgx")
     ap.add_argument(
         "--cgx-run",
         action=argparse.BooleanOptionalAction,
         default=True,
-        help="Si falta sigma_vm.csv tras ccx, intenta extraerlo automáticamente con cgx.",
+        help="(--sigma-extractor cgx) Si falta sigma_vm.csv tras ccx, intenta extraerlo automáticamente con cgx.",
     )
 
     args = ap.parse_args()
     runs_dir = Path(args.runs_dir)
+    t_start = time.perf_counter()
 
     ensure_case_dirs(args.case, runs_dir)
 
-    geom = pd.read_parquet(geometry_parquet(args.case, args.geom_tag, runs_dir)).copy()
-    required = {"elem_id", "cx", "cy", "cz"}
-    missing = [c for c in required if c not in geom.columns]
-    if missing:
-        raise ValueError(f"Faltan columnas {missing} en geometría")
+    # Centroides siempre; conectividad solo para submodelo/surrogate (y h_cbrtV para las features del surrogate)
+    conn_cols = {"submodel": ["n0", "n1", "n2", "n3"], "surrogate": ["n0", "n1", "n2", "n3", "h_cbrtV"]}
+    geom = read_columns(
+        geometry_parquet(args.case, args.geom_tag, runs_dir),
+        ["elem_id", "cx", "cy", "cz", *conn_cols.get(args.backend, [])],
+    )
 
     if args.backend == "fallback":
         sigma_df = _fallback_sigma(
@@ -371,6 +626,52 @@ def main() -> None:
             r0=args.r0,
         )
         note = f"Nota: se usó fallback gaussiano para tag={args.tag}."
+        source = {"solved": False}
+
+    elif args.backend == "transfer":
+        if not args.ref_mesh or not args.ref_sigma:
+            raise ValueError("--backend transfer requiere --ref-mesh y --ref-sigma")
+        ref_mesh, ref_sigma = _normalize_cli_path(args.ref_mesh), _normalize_cli_path(args.ref_sigma)
+        values, stats = transfer_to_points(
+            ref_mesh,
+            ref_sigma,
+            geom[["cx", "cy", "cz"]].to_numpy(dtype=float),
+            k=args.transfer_k,
+            batch=args.transfer_batch,
+        )
+        sigma_df = pd.DataFrame({"elem_id": geom["elem_id"].astype(int), "sigma_vm": values})
+        print(
+            f"Transfer: índice {stats.build_s:.3f} s ({stats.n_ref_tets} tets ref) | "
+            f"consulta {stats.query_s:.3f} s ({stats.n_points / max(stats.query_s, 1e-12):.0f} puntos/s) | "
+            f"fuera de la malla ref: {stats.n_outside}"
+        )
+        note = f"Nota: sigma {args.tag} transferido desde {ref_mesh.name} ({ref_sigma.name})."
+        source = {"solved": False, "ref_mesh": str(ref_mesh), "n_outside": stats.n_outside}
+
+    elif args.backend == "surrogate":
+        if args.tag != "ref":
+            raise ValueError("--backend surrogate solo aplica a --tag ref (usa la solución coarse como entrada)")
+        model_path = _normalize_cli_path(args.surrogate_model) if args.surrogate_model else sigma_ref_surrogate_path(runs_dir)
+        meta_path = model_path.with_suffix(".json") if args.surrogate_model else sigma_ref_surrogate_json(runs_dir)
+        meta = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() else {}
+        sc = read_columns(sigma_vm_parquet(args.case, "coarse", runs_dir), ["elem_id", "sigma_vm"]).rename(
+            columns={"sigma_vm": "sigma_vm_coarse"}
+        )
+        df = geom.merge(sc, on="elem_id", how="inner")
+        if len(df) != len(geom):
+            raise RuntimeError(f"sigma_vm_coarse no cubre {len(geom) - len(df)} elementos: corre primero el tag coarse")
+        nodes = read_columns(node_coords_parquet(args.case, args.geom_tag, runs_dir), ["node_id", "x", "y", "z"])
+        sigma = predict_sigma_ref(joblib.load(model_path), df, nodes, df["sigma_vm_coarse"].to_numpy(dtype=float))
+        sigma_df = pd.DataFrame({"elem_id": df["elem_id"].astype(int), "sigma_vm": sigma})
+        note = f"Nota: sigma ref predicho por surrogate {model_path.name} (val_err {meta.get('val_err', float('nan')):.4f})."
+        source = {"solved": False, "model": str(model_path), "val_err": meta.get("val_err")}
+        if meta.get("ref_s_per_melem") is not None:
+            source["ref_s_est"] = meta["ref_s_per_melem"] * len(geom) / 1e6
+
+    elif args.backend == "submodel":
+        if args.tag != "ref":
+            raise ValueError("--backend submodel solo aplica a --tag ref (usa la solución coarse como BCs)")
+        sigma_df, note, source = _run_submodel(args, geom, runs_dir)
 
     else:  # calculix
         workdir = (
@@ -398,16 +699,14 @@ def main() -> None:
                 )
 
             if not inp.exists():
-                nodes = _read_nodes_from_inp(mesh_inp)
-                elems = _read_elements_from_inp(mesh_inp)
+                mesh = read_inp(mesh_inp)
                 inp = _autogen_job_inp(
                     workdir=workdir,
                     ccx_job=args.ccx_job,
                     case=args.case,
                     tag=args.tag,
                     mesh_inp_name="mesh.inp",
-                    nodes=nodes,
-                    elems=elems,
+                    mesh=mesh,
                     mat_name=args.mat_name,
                     mat_e=args.mat_e,
                     mat_nu=args.mat_nu,
@@ -420,6 +719,9 @@ def main() -> None:
                 )
                 print(f"Info: creado automáticamente {inp}")
 
+        ext_df = None
+        cache = None
+        ccx_ran = False
         if args.ccx_run:
             if not inp.exists():
                 raise FileNotFoundError(
@@ -427,7 +729,16 @@ def main() -> None:
                     "Coloca ese archivo o usa --ccx-workdir/--ccx-job correctos, "
                     "o activa --ccx-autogen-inp."
                 )
-            run_ccx(args.ccx_exe, args.ccx_job, workdir)
+            if args.fem_cache_dir:
+                t0 = time.perf_counter()
+                cache = FemResultCache(_normalize_cli_path(args.fem_cache_dir), int(args.fem_cache_max_gb * 2**30))
+                cache_key = cache.key(inp, args.ccx_exe, args.sigma_extractor)
+                ext_df = _fem_cache_lookup(cache, cache_key, workdir, args.case, args.tag, t0)
+                lookup_ms = (time.perf_counter() - t0) * 1e3
+            if ext_df is None:
+                ccx_t0 = time.time()
+                run_ccx(args.ccx_exe, args.ccx_job, workdir, threads=args.ccx_threads or None)
+                ccx_ran = True
 
         sigma_path = (
             _normalize_cli_path(args.sigma_file)
@@ -436,16 +747,30 @@ def main() -> None:
         )
         sigma_path = _normalize_cli_path(sigma_path)
 
-        if args.ccx_run and not sigma_path.exists() and args.cgx_run:
+        frd = workdir / f"{args.ccx_job}.frd"
+        if ext_df is not None:
+            sigma_path = workdir / "sigma_vm.parquet"
+
+        elif args.sigma_extractor == "frd" and frd.exists() and (ccx_ran or not sigma_path.exists()):
+            # Tras correr ccx el .frd es nuevo: se re-extrae aunque exista un sigma_vm.csv anterior
+            print(f"Info: extrayendo von Mises desde {frd} -> {sigma_path}")
+            extract_sigma_vm_frd(frd, inp if inp.exists() else mesh_inp, sigma_path)
+
+        elif args.sigma_extractor == "cgx" and args.ccx_run and (ccx_ran or not sigma_path.exists()) and args.cgx_run:
+            # Igual que con frd: tras correr ccx se re-extrae aunque exista una tabla anterior
             sigma_path.parent.mkdir(parents=True, exist_ok=True)
-            print(
-                f"Info: no existe {sigma_path}; intentando extraer con cgx desde "
-                f"{workdir / (args.ccx_job + '.frd')}"
-            )
+            print(f"Info: extrayendo con cgx desde {workdir / (args.ccx_job + '.frd')} -> {sigma_path}")
             fbd = write_cgx_script(args.ccx_job, sigma_path)
             run_cgx(args.cgx_exe, workdir, fbd)
 
-        ext_df = read_sigma_vm_table(sigma_path)
+        if ext_df is None:
+            ext_df = read_sigma_vm_table(sigma_path)
+            if cache is not None and ccx_ran:
+                # Solo se publica una tabla escrita después de lanzar ccx (nunca una de una corrida anterior)
+                if sigma_path.stat().st_mtime >= ccx_t0:
+                    _fem_cache_store(cache, cache_key, ext_df, workdir, args.ccx_job, args.case, args.tag, lookup_ms)
+                else:
+                    print(f"⚠️  {sigma_path} es anterior a esta corrida de ccx: no se guarda en el cache FEM")
 
         sigma_df = geom[["elem_id"]].merge(ext_df, on="elem_id", how="left")
         nmiss = int(sigma_df["sigma_vm"].isna().sum())
@@ -455,10 +780,21 @@ def main() -> None:
                 "Revisa mapping elem_id solver <-> geometría."
             )
         note = f"Nota: se usó backend calculix desde {sigma_path}."
+        source = {"solved": ccx_ran, "cache_hit": cache is not None and not ccx_ran}
 
     out = sigma_vm_parquet(args.case, args.tag, runs_dir)
     sigma_df.to_parquet(out, index=False)
 
+    source = {"tag": args.tag, "source": args.backend, **source}
+    source.update(n_elems=len(sigma_df), wall_s=time.perf_counter() - t_start)
+    if "ref_s_est" in source:
+        source["time_saved_s"] = source["ref_s_est"] - source["wall_s"]
+        print(
+            f"Ahorro vs solve ref completo: {source['time_saved_s']:.2f} s "
+            f"({source['wall_s']:.2f} s vs {source['ref_s_est']:.2f} s, speedup {source['ref_s_est'] / source['wall_s']:.1f}x)"
+        )
+    sigma_source_json(args.case, args.tag, runs_dir).write_text(json.dumps(source, indent=2), encoding="utf-8")
+
     print(f"OK: creado {out}")
     print(note)
 
@@ -9,6 +9,8 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, r2_score
 from sklearn.model_selection import train_test_split
 
+from src3d.compute_element_features_3d import FEATURE_SETS, attach_element_features
+from src3d.parquet_io_3d import read_columns
 from src3d.paths3d import ensure_case_dirs, dataset_hstar_parquet, rf_model_path
 
 
@@ -19,6 +21,12 @@ def main():
     ap.add_argument("--n_estimators", type=int, default=400)
     ap.add_argument("--random_state", type=int, default=7)
     ap.add_argument("--test_size", type=float, default=0.2)
+    ap.add_argument(
+        "--feature_set",
+        choices=sorted(FEATURE_SETS),
+        default="base",
+        help="base: cx,cy,cz,h_cbrtV,sigma_vm_coarse | neighbors: + features de vecindario (element_features_3d.parquet)",
+    )
     args = ap.parse_args()
 
     if not (0.0 < args.test_size < 1.0):
@@ -26,9 +34,9 @@ def main():
 
     ensure_case_dirs(args.case, args.runs_dir)
 
-    df = pd.read_parquet(dataset_hstar_parquet(args.case, args.runs_dir)).copy()
-
-    feats = ["cx", "cy", "cz", "h_cbrtV", "sigma_vm_coarse"]
+    feats = list(FEATURE_SETS[args.feature_set])
+    df = read_columns(dataset_hstar_parquet(args.case, args.runs_dir), ["elem_id", "h_star"], optional=feats)
+    df = attach_element_features(df, feats, args.case, args.runs_dir)
     for c in feats + ["h_star"]:
         if c not in df.columns:
             raise ValueError(f"Falta columna: {c}")
@@ -0,0 +1,200 @@
+# src3d/train_sigma_ref_surrogate_3d.py
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import GroupKFold
+
+from src3d.compute_element_features_3d import compute_features
+from src3d.parquet_io_3d import read_columns
+from src3d.paths3d import (
+    dataset_hstar_parquet,
+    node_coords_parquet,
+    sigma_ref_surrogate_json,
+    sigma_ref_surrogate_path,
+)
+
+# Features adimensionales: el corpus mezcla geometrías, tamaños y cargas distintas,
+# así que nada en unidades absolutas (coordenadas, MPa, mm) entra al modelo.
+SURROGATE_FEATURES = [
+    "sigma_rel",  # sigma_coarse / mediana del caso
+    "nb_mean_rel",  # media de vecinos / sigma propio
+    "nb_max_rel",
+    "nb_std_rel",
+    "grad_h_rel",  # |grad sigma| * h / sigma: cambio relativo en un elemento
+    "h_rel",  # h / mediana del caso
+    "dist_h",  # distancia al borde en elementos
+]
+_EPS = 1e-12
+
+
+def surrogate_features(geom: pd.DataFrame, nodes: pd.DataFrame, sigma_coarse: np.ndarray) -> pd.DataFrame:
+    """Features de SURROGATE_FEATURES por tet (mismo orden que `geom`, que necesita n0..n3, cx..cz, h_cbrtV)."""
+    sigma = np.asarray(sigma_coarse, dtype=float)
+    nb = compute_features(geom, nodes, sigma)
+    h = geom["h_cbrtV"].to_numpy(dtype=float)
+    s = np.abs(sigma) + _EPS
+    return pd.DataFrame(
+        {
+            "sigma_rel": sigma / (np.median(np.abs(sigma)) + _EPS),
+            "nb_mean_rel": nb["nb_sigma_mean"].to_numpy() / s,
+            "nb_max_rel": nb["nb_sigma_max"].to_numpy() / s,
+            "nb_std_rel": nb["nb_sigma_std"].to_numpy() / s,
+            "grad_h_rel": nb["grad_sigma_mag"].to_numpy() * h / s,
+            "h_rel": h / np.median(h),
+            "dist_h": nb["dist_boundary"].to_numpy() / h,
+        }
+    )
+
+
+def predict_sigma_ref(pack: dict, geom: pd.DataFrame, nodes: pd.DataFrame, sigma_coarse: np.ndarray) -> np.ndarray:
+    """sigma_ref = sigma_coarse * exp(log-ratio predicho)."""
+    X = surrogate_features(geom, nodes, sigma_coarse)[pack["features"]]
+    ratio = np.exp(pack["model"].predict(X.to_numpy()))
+    return (np.abs(np.asarray(sigma_coarse, dtype=float)) + _EPS) * ratio
+
+
+def read_sigma_source(case_dir: Path, tag: str) -> dict:
+    path = case_dir / "gmsh" / f"sigma_source_{tag}_3d.json"
+    if not path.exists():
+        return {"source": "n/d"}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _corpus_cases(runs_dir: Path, cases: list[str], sources: set[str]) -> list[str]:
+    if not cases:
+        cases = sorted(p.parent.parent.name for p in runs_dir.glob("*/gmsh/dataset_hstar_3d.parquet"))
+    out = []
+    for case in cases:
+        case_dir = runs_dir / case
+        src = read_sigma_source(case_dir, "ref")["source"]
+        if not (case_dir / "gmsh" / "dataset_hstar_3d.parquet").exists():
+            print(f"⚠️  {case}: sin dataset_hstar_3d.parquet; se omite")
+        elif not (case_dir / "gmsh" / "node_coords_3d.parquet").exists():
+            print(f"⚠️  {case}: sin node_coords_3d.parquet (recalcula geometría); se omite")
+        elif src not in sources:
+            print(f"Info: {case}: sigma_ref de fuente '{src}' (no está en --sources); se omite")
+        else:
+            out.append(case)
+    return out
+
+
+def _load_case(case: str, runs_dir: Path, max_rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    cols = ["elem_id", "n0", "n1", "n2", "n3", "cx", "cy", "cz", "h_cbrtV", "sigma_vm_coarse", "sigma_vm_ref"]
+    df = read_columns(dataset_hstar_parquet(case, runs_dir), cols)
+    nodes = read_columns(node_coords_parquet(case, "", runs_dir), ["node_id", "x", "y", "z"])
+    feats = surrogate_features(df, nodes, df["sigma_vm_coarse"].to_numpy(dtype=float))
+    feats["target"] = np.log(
+        (np.abs(df["sigma_vm_ref"].to_numpy()) + _EPS) / (np.abs(df["sigma_vm_coarse"].to_numpy()) + _EPS)
+    )
+    feats["sigma_vm_coarse"] = df["sigma_vm_coarse"].to_numpy()
+    feats["sigma_vm_ref"] = df["sigma_vm_ref"].to_numpy()
+    feats["case"] = case
+    if len(feats) > max_rows:
+        feats = feats.iloc[np.sort(rng.choice(len(feats), size=max_rows, replace=False))]
+    return feats
+
+
+def _ref_seconds_per_melem(runs_dir: Path, cases: list[str]) -> float | None:
+    """Mediana del costo del solve ref (s por millón de elementos) en los casos donde sí se resolvió."""
+    rates = []
+    for case in cases:
+        info = read_sigma_source(runs_dir / case, "ref")
+        if info.get("source") == "calculix" and info.get("solved") and info.get("n_elems"):
+            rates.append(info["wall_s"] / info["n_elems"] * 1e6)
+    return float(np.median(rates)) if rates else None
+
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Entrena un surrogate de sigma_vm_ref (desde features de la solución coarse) con el corpus de casos resueltos."
+    )
+    ap.add_argument("--runs-dir", default="runs")
+    ap.add_argument("--cases", default="", help="Casos del corpus separados por coma (default: todos los de runs-dir con dataset)")
+    ap.add_argument(
+        "--sources",
+        default="calculix,transfer",
+        help="Fuentes de sigma_ref aceptadas en el corpus (sigma_source_ref_3d.json); 'n/d' = casos sin registro",
+    )
+    ap.add_argument("--max-rows-per-case", type=int, default=100_000)
+    ap.add_argument("--n_estimators", type=int, default=200)
+    ap.add_argument("--min_samples_leaf", type=int, default=5)
+    ap.add_argument("--n_folds", type=int, default=5, help="Folds por caso (GroupKFold); con menos casos, deja-uno-fuera")
+    ap.add_argument("--random_state", type=int, default=7)
+    args = ap.parse_args()
+
+    runs_dir = Path(args.runs_dir)
+    sources = {s.strip() for s in args.sources.split(",") if s.strip()}
+    cases = _corpus_cases(runs_dir, [c.strip() for c in args.cases.split(",") if c.strip()], sources)
+    if len(cases) < 2:
+        raise RuntimeError(f"El corpus necesita al menos 2 casos con sigma_ref ({sorted(sources)}); hay {len(cases)}: {cases}")
+
+    t0 = time.perf_counter()
+    rng = np.random.default_rng(args.random_state)
+    data = pd.concat([_load_case(c, runs_dir, args.max_rows_per_case, rng) for c in cases], ignore_index=True)
+    t_feats = time.perf_counter() - t0
+
+    X = data[SURROGATE_FEATURES].to_numpy()
+    y = data["target"].to_numpy()
+
+    def make_model() -> RandomForestRegressor:
+        return RandomForestRegressor(
+            n_estimators=args.n_estimators,
+            min_samples_leaf=args.min_samples_leaf,
+            max_features=0.6,
+            random_state=args.random_state,
+            n_jobs=-1,
+        )
+
+    # Validación dejando casos completos fuera: mide cómo generaliza a un caso nuevo
+    t0 = time.perf_counter()
+    err_by_case: dict[str, float] = {}
+    groups = data["case"].to_numpy()
+    for train, test in GroupKFold(n_splits=min(args.n_folds, len(cases))).split(X, y, groups):
+        model = make_model().fit(X[train], y[train])
+        held = data.iloc[test]
+        pred = (np.abs(held["sigma_vm_coarse"].to_numpy()) + _EPS) * np.exp(model.predict(X[test]))
+        rel = np.abs(pred - held["sigma_vm_ref"].to_numpy()) / (np.abs(held["sigma_vm_ref"].to_numpy()) + _EPS)
+        for case, e in pd.Series(rel).groupby(held["case"].to_numpy()).mean().items():
+            err_by_case[str(case)] = float(e)
+    val_err = max(err_by_case.values())
+    t_cv = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    model = make_model().fit(X, y)
+    t_fit = time.perf_counter() - t0
+
+    out = sigma_ref_surrogate_path(runs_dir)
+    joblib.dump({"model": model, "features": SURROGATE_FEATURES}, out)
+    meta = {
+        "trained_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "cases": cases,
+        "sources": sorted(sources),
+        "n_rows": int(len(data)),
+        "features": SURROGATE_FEATURES,
+        "val_err": val_err,  # peor caso dejado fuera: error relativo medio de sigma_ref
+        "val_err_by_case": err_by_case,
+        "ref_s_per_melem": _ref_seconds_per_melem(runs_dir, cases),
+        "train_s": t_feats + t_cv + t_fit,
+    }
+    meta_path = sigma_ref_surrogate_json(runs_dir)
+    meta_path.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+    print(f"OK: surrogate sigma_ref entrenado con {len(cases)} casos ({len(data)} filas)")
+    for case, e in sorted(err_by_case.items(), key=lambda kv: -kv[1]):
+        print(f"  {case:<16} err rel medio (fuera) = {e:.4f}")
+    print(f"val_err (peor caso) = {val_err:.4f}")
+    print(f"tiempo: features {t_feats:.2f} s | validación {t_cv:.2f} s | ajuste {t_fit:.2f} s")
+    print(f"OK: modelo guardado en: {out}")
+    print(f"OK: resumen en: {meta_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+# src3d/tune_ml_hstar_3d.py
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_squared_error, r2_score
+
+from src3d.compute_element_features_3d import FEATURE_SETS, attach_element_features
+from src3d.parquet_io_3d import read_columns
+from src3d.paths3d import (
+    cv_folds_path,
+    dataset_hstar_parquet,
+    ensure_case_dirs,
+    rf_model_path,
+    tune_results_csv,
+)
+
+PARAM_SPACE = {
+    "n_estimators": [50, 100, 200, 400],
+    "max_depth": [None, 8, 12, 16, 24],
+    "min_samples_leaf": [1, 2, 4, 8],
+    "max_features": [1.0, 0.6, 0.33],
+}
+
+# Estado por proceso del pool: X, y y folds se envían una sola vez (initializer)
+_X: np.ndarray | None = None
+_Y: np.ndarray | None = None
+_FOLDS: np.ndarray | None = None
+
+
+def spatial_block_folds(centers: np.ndarray, n_folds: int, blocks_per_axis: int, seed: int) -> np.ndarray:
+    """
+    Folds espacialmente bloqueados: divide el bounding box en una grilla de
+    blocks_per_axis^3 bloques y asigna bloques completos a cada fold, así
+    elementos vecinos no quedan repartidos entre train y test.
+    """
+    lo = centers.min(axis=0)
+    span = np.maximum(centers.max(axis=0) - lo, 1e-30)
+    cell = np.minimum((centers - lo) / span * blocks_per_axis, blocks_per_axis - 1).astype(np.int64)
+    block = (cell[:, 0] * blocks_per_axis + cell[:, 1]) * blocks_per_axis + cell[:, 2]
+
+    uniq, inv = np.unique(block, return_inverse=True)
+    if uniq.size < n_folds:
+        raise ValueError(
+            f"Solo hay {uniq.size} bloques no vacíos para {n_folds} folds. "
+            "Aumenta --blocks_per_axis o baja --n_folds."
+        )
+    # Bloques ordenados por tamaño y repartidos round-robin (tras barajar) para balancear folds
+    rng = np.random.default_rng(seed)
+    sizes = np.bincount(inv)
+    order = np.lexsort((rng.random(uniq.size), -sizes))
+    block_fold = np.empty(uniq.size, dtype=np.int64)
+    block_fold[order] = np.arange(uniq.size) % n_folds
+    return block_fold[inv]
+
+
+def load_or_make_folds(
+    case: str,
+    runs_dir: Path | str,
+    elem_id: np.ndarray,
+    centers: np.ndarray,
+    n_folds: int,
+    blocks_per_axis: int,
+    seed: int,
+) -> np.ndarray:
+    """Reutiliza los folds cacheados si corresponden a los mismos elementos y parámetros."""
+    path = cv_folds_path(case, runs_dir)
+    params = np.array([n_folds, blocks_per_axis, seed], dtype=np.int64)
+    if path.exists():
+        cached = np.load(path)
+        if np.array_equal(cached["params"], params) and np.array_equal(cached["elem_id"], elem_id):
+            print(f"OK: folds reutilizados desde {path}")
+            return cached["fold"]
+
+    fold = spatial_block_folds(centers, n_folds, blocks_per_axis, seed)
+    np.savez(path, elem_id=elem_id, fold=fold, params=params)
+    print(f"OK: folds espaciales guardados en {path}")
+    return fold
+
+
+def sample_candidates(n_iter: int, seed: int) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    seen: set[tuple] = set()
+    out: list[dict] = []
+    total = math.prod(len(v) for v in PARAM_SPACE.values())
+    while len(out) < min(n_iter, total):
+        cand = {k: v[rng.integers(len(v))] for k, v in PARAM_SPACE.items()}
+        key = tuple(cand.values())
+        if key not in seen:
+            seen.add(key)
+            out.append(cand)
+    return out
+
+
+def _init_worker(X: np.ndarray, y: np.ndarray, folds: np.ndarray) -> None:
+    global _X, _Y, _FOLDS
+    _X, _Y, _FOLDS = X, y, folds
+
+
+def _evaluate(task: tuple[int, dict, float, int]) -> dict:
+    """CV de un candidato con una fracción `resource` de las filas de entrenamiento."""
+    cand_idx, params, resource, seed = task
+    assert _X is not None and _Y is not None and _FOLDS is not None
+
+    rng = np.random.default_rng(seed)
+    mses, r2s, fit_s = [], [], []
+    for k in np.unique(_FOLDS):
+        train = np.flatnonzero(_FOLDS != k)
+        test = np.flatnonzero(_FOLDS == k)
+        if resource < 1.0:
+            train = rng.choice(train, size=max(1, int(resource * train.size)), replace=False)
+
+        model = RandomForestRegressor(random_state=seed, n_jobs=1, **params)
+        t0 = time.perf_counter()
+        model.fit(_X[train], _Y[train])
+        fit_s.append(time.perf_counter() - t0)
+
+        pred = model.predict(_X[test])
+        mses.append(mean_squared_error(_Y[test], pred))
+        r2s.append(r2_score(_Y[test], pred))
+
+    return {
+        "candidate": cand_idx,
+        **{k: ("None" if v is None else v) for k, v in params.items()},
+        "resource": resource,
+        "cv_mse": float(np.mean(mses)),
+        "cv_r2": float(np.mean(r2s)),
+        "fit_s": float(np.mean(fit_s)),
+    }
+
+
+def successive_halving(
+    candidates: list[dict],
+    X: np.ndarray,
+    y: np.ndarray,
+    folds: np.ndarray,
+    *,
+    eta: int,
+    workers: int,
+    seed: int,
+) -> pd.DataFrame:
+    """
+    Successive halving: cada ronda evalúa los candidatos vivos con una fracción
+    creciente de filas y conserva el mejor 1/eta. La última ronda usa el 100%.
+    """
+    n_rounds = max(1, math.ceil(math.log(len(candidates), eta)))
+    alive = list(range(len(candidates)))
+    rows: list[dict] = []
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(X, y, folds)) as pool:
+        for r in range(n_rounds):
+            resource = float(eta ** (r - (n_rounds - 1)))
+            tasks = [(i, candidates[i], resource, seed) for i in alive]
+            t0 = time.perf_counter()
+            res = list(pool.map(_evaluate, tasks))
+            for row in res:
+                row["round"] = r
+            rows.extend(res)
+            print(
+                f"ronda {r}: {len(alive)} candidatos, resource={resource:.3f}, "
+                f"{time.perf_counter() - t0:.2f} s"
+            )
+            if r < n_rounds - 1:
+                keep = max(1, len(alive) // eta)
+                alive = [row["candidate"] for row in sorted(res, key=lambda d: d["cv_mse"])[:keep]]
+
+    return pd.DataFrame(rows)
+
+
+def pick_winner(results: pd.DataFrame, rel_tol: float) -> pd.Series:
+    """Entre los candidatos de la última ronda, el de menor fit_s con cv_mse <= mejor*(1+rel_tol)."""
+    final = results[results["round"] == results["round"].max()]
+    best_mse = float(final["cv_mse"].min())
+    ok = final[final["cv_mse"] <= best_mse * (1.0 + rel_tol)]
+    return ok.sort_values(["fit_s", "cv_mse"]).iloc[0]
+
+
+def _params_from_row(row: pd.Series) -> dict:
+    params = {}
+    for k in PARAM_SPACE:
+        v = row[k]
+        if v == "None" or (isinstance(v, float) and math.isnan(v)):
+            params[k] = None
+        elif k == "max_features":
+            params[k] = float(v)
+        else:
+            params[k] = int(v)
+    return params
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Búsqueda de hiperparámetros (successive halving) con folds espaciales cacheados.")
+    ap.add_argument("--case", required=True)
+    ap.add_argument("--runs-dir", default="runs")
+    ap.add_argument("--feature_set", choices=sorted(FEATURE_SETS), default="base")
+    ap.add_argument("--n_iter", type=int, default=24, help="Candidatos aleatorios iniciales")
+    ap.add_argument("--eta", type=int, default=3, help="Factor de reducción por ronda")
+    ap.add_argument("--n_folds", type=int, default=5)
+    ap.add_argument("--blocks_per_axis", type=int, default=6)
+    ap.add_argument("--tol", type=float, default=0.05, help="Tolerancia relativa de MSE para elegir el modelo más rápido")
+    ap.add_argument("--workers", type=int, default=0, help="Procesos del pool (0 = n° de CPUs)")
+    ap.add_argument("--random_state", type=int, default=7)
+    args = ap.parse_args()
+
+    if args.eta < 2:
+        raise ValueError("eta debe ser >= 2.")
+
+    ensure_case_dirs(args.case, args.runs_dir)
+
+    feats = list(FEATURE_SETS[args.feature_set])
+    df = read_columns(
+        dataset_hstar_parquet(args.case, args.runs_dir), ["elem_id", "cx", "cy", "cz", "h_star"], optional=feats
+    )
+    df = attach_element_features(df, feats, args.case, args.runs_dir)
+    for c in feats + ["h_star"]:
+        if c not in df.columns:
+            raise ValueError(f"Falta columna: {c}")
+
+    X = df[feats].to_numpy(dtype=float)
+    y = df["h_star"].to_numpy(dtype=float)
+    folds = load_or_make_folds(
+        args.case,
+        args.runs_dir,
+        df["elem_id"].to_numpy(dtype=np.int64),
+        df[["cx", "cy", "cz"]].to_numpy(dtype=float),
+        args.n_folds,
+        args.blocks_per_axis,
+        args.random_state,
+    )
+
+    workers = args.workers or os.cpu_count() or 1
+    candidates = sample_candidates(args.n_iter, args.random_state)
+    print(f"Info: {len(candidates)} candidatos, {args.n_folds} folds espaciales, {workers} procesos")
+
+    results = successive_halving(
+        candidates, X, y, folds, eta=args.eta, workers=workers, seed=args.random_state
+    )
+    out_csv = tune_results_csv(args.case, args.runs_dir)
+    results.to_csv(out_csv, index=False)
+
+    winner = pick_winner(results, args.tol)
+    params = _params_from_row(winner)
+
+    model = RandomForestRegressor(random_state=args.random_state, n_jobs=-1, **params)
+    t0 = time.perf_counter()
+    model.fit(df[feats], y)
+    fit_s = time.perf_counter() - t0
+
+    out = rf_model_path(args.case, args.runs_dir)
+    joblib.dump({"model": model, "features": feats, "params": params}, out)
+
+    final = results[results["round"] == results["round"].max()].sort_values("cv_mse")
+    print("\nÚltima ronda (resource=1.0):")
+    print(final.drop(columns=["candidate", "round", "resource"]).to_string(index=False))
+    print(f"\nGanador (más rápido dentro de tol={args.tol:.0%} del mejor MSE): {params}")
+    print(f"CV MSE: {winner['cv_mse']:.6e} | CV R2: {winner['cv_r2']:.4f} | fit por fold: {winner['fit_s']:.3f} s")
+    print(f"Refit con todos los datos: {fit_s:.3f} s")
+    print(f"OK: resultados en: {out_csv}")
+    print(f"OK: modelo guardado en: {out}")
+
+
+if __name__ == "__main__":
+    main()
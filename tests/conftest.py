@@ -0,0 +1,36 @@
+# tests/conftest.py
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from benchmarks.bench_inp_reader import write_deck
+from benchmarks.synthetic_mesh import cube_tet_mesh
+from src3d.compute_element_geometry_3d import save_geometry, tet_geometry_frame
+
+REPO = Path(__file__).resolve().parents[1]
+N_TETS = 750
+
+
+@pytest.fixture
+def fem_case(tmp_path, monkeypatch):
+    """Caso con geometría coarse y mesh.inp en los workdirs ccx coarse/ref (mismos elem_id)."""
+    monkeypatch.chdir(REPO)
+    case = "sched"
+    nodes, geom = cube_tet_mesh(N_TETS)
+    df = tet_geometry_frame(
+        nodes["node_id"].to_numpy(),
+        nodes[["x", "y", "z"]].to_numpy(),
+        geom["elem_id"].to_numpy(),
+        geom[["n0", "n1", "n2", "n3"]].to_numpy(),
+    )
+    save_geometry(df, pd.DataFrame(nodes[["node_id", "x", "y", "z"]]), case, "", tmp_path)
+    for tag in ("coarse", "ref"):
+        workdir = tmp_path / case / "ccx" / tag
+        workdir.mkdir(parents=True)
+        write_deck(N_TETS, workdir / "mesh.inp")
+    # ~0.5 s por job con 1 thread: sin usar CPU, así el solapamiento se ve con un solo core
+    monkeypatch.setenv("FAKE_CCX_SECONDS_PER_MELEM", str(0.5 * 1e6 / len(df)))
+    return case, tmp_path
@@ -0,0 +1,89 @@
+# tests/test_ccx_scheduling.py
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from mesh_app.services.pipeline_steps_service import PipelineStepsService, split_threads
+from mesh_app.utils.subprocess_utils import run_cmds_parallel
+from src3d.fem.calculix_runner import run_info_path
+
+FAKE_CCX = "scripts/fake_ccx.py"
+
+
+@pytest.mark.parametrize(
+    "total, weights, expected",
+    [
+        (8, [1.0, 1.0], [4, 4]),
+        (7, [1.0, 1.0], [4, 3]),
+        (8, [1.0, 3.0], [2, 6]),
+        (10, [2.0, 1.0, 1.0], [5, 3, 2]),
+    ],
+)
+def test_split_threads_even_and_weighted(total, weights, expected):
+    assert split_threads(total, weights) == expected
+
+
+def test_split_threads_more_jobs_than_cores():
+    out = split_threads(2, [1.0, 1.0, 1.0, 1.0])
+    assert out == [1, 1, 1, 1]  # mínimo 1 por job aunque se pase del total
+
+
+def test_split_threads_zero_weight_gets_one_thread():
+    out = split_threads(8, [0.0, 1.0])
+    assert out[0] == 1
+    assert sum(out) == 8
+
+
+def test_split_threads_all_zero_weights_is_even():
+    assert split_threads(6, [0.0, 0.0]) == [3, 3]
+
+
+def test_run_cmds_parallel_reports_failures():
+    ok = [sys.executable, "-c", "pass"]
+    bad = [sys.executable, "-c", "raise SystemExit(3)"]
+    run_cmds_parallel([ok, ok])
+    with pytest.raises(RuntimeError, match=r"falló \(3\).*\(\+1 más\)"):
+        run_cmds_parallel([ok, bad, bad])
+
+
+def _run_fem(case: str, runs_dir: Path, threads: int, policy: str) -> dict[str, dict]:
+    steps = PipelineStepsService(python_exe=sys.executable, runs_dir=runs_dir)
+    steps.compute_sigma_fem(
+        case,
+        backend="calculix",
+        ccx_exe=FAKE_CCX,
+        ccx_run=True,
+        ccx_threads=threads,
+        ccx_policy=policy,
+        auto_fallback_if_missing=False,
+    )
+    return {
+        tag: json.loads(run_info_path(runs_dir / case / "ccx" / tag, "job").read_text(encoding="utf-8"))
+        for tag in ("coarse", "ref")
+    }
+
+
+def test_compute_sigma_fem_even_runs_jobs_concurrently(fem_case):
+    case, runs_dir = fem_case
+    runs = _run_fem(case, runs_dir, threads=4, policy="even")
+
+    assert [runs[t]["threads"] for t in ("coarse", "ref")] == [2, 2]
+    c, r = runs["coarse"], runs["ref"]
+    assert c["t_start"] < r["t_end"] and r["t_start"] < c["t_end"]
+    for tag in ("coarse", "ref"):
+        sigma = pd.read_parquet(runs_dir / case / "gmsh" / f"sigma_vm_{tag}_3d.parquet")
+        assert len(sigma) == len(pd.read_parquet(runs_dir / case / "gmsh" / "element_geometry_3d.parquet"))
+
+
+def test_compute_sigma_fem_sequential_does_not_overlap(fem_case):
+    case, runs_dir = fem_case
+    runs = _run_fem(case, runs_dir, threads=4, policy="sequential")
+
+    assert [runs[t]["threads"] for t in ("coarse", "ref")] == [4, 4]
+    c, r = runs["coarse"], runs["ref"]
+    assert c["t_end"] <= r["t_start"]
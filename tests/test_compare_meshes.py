@@ -0,0 +1,130 @@
+# tests/test_compare_meshes.py
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic_mesh import cube_tet_mesh
+from compare_meshes import EdgeKeyBuckets, FixedHistogram, QuantileSketch, unique_edge_keys, unique_edge_lengths
+
+_PAIRS = np.array([[0, 1], [0, 2], [0, 3], [1, 2], [1, 3], [2, 3]])
+
+
+def _mesh(n_tets: int) -> tuple[np.ndarray, np.ndarray]:
+    """Nodos e índices 0-based de tets, con los tets barajados (sin el orden espacial que favorece al sort)."""
+    nodes, geom = cube_tet_mesh(n_tets)
+    tets = geom[["n0", "n1", "n2", "n3"]].to_numpy() - 1
+    return nodes[["x", "y", "z"]].to_numpy(), tets[np.random.default_rng(1).permutation(len(tets))]
+
+
+def _unique_edges_reference(tets: np.ndarray) -> np.ndarray:
+    """Camino previo: las 6*M aristas como pares ordenados y np.unique(axis=0)."""
+    edges = np.sort(tets[:, _PAIRS].reshape(-1, 2), axis=1)
+    return np.unique(edges, axis=0)
+
+
+# memory_mb chico: muchos chunks de pocos tets y muchos buckets de rango de clave
+@pytest.mark.parametrize("memory_mb", [512.0, 0.05, 0.002, 0.0002])
+def test_unique_edge_keys_match_np_unique(memory_mb):
+    pts, tets = _mesh(3000)
+    n = len(pts)
+    buckets = unique_edge_keys(tets, n, memory_mb)
+    keys = np.concatenate(buckets)
+
+    expected = _unique_edges_reference(tets)
+    np.testing.assert_array_equal(np.column_stack(np.divmod(keys, n)), expected)
+    # rangos disjuntos y ordenados: concatenados ya están ordenados y sin repetidos
+    assert np.all(np.diff(keys) > 0)
+    if memory_mb < 1.0:
+        assert len(buckets) > 1
+
+    ref_len = np.linalg.norm(pts[expected[:, 0]] - pts[expected[:, 1]], axis=1)
+    np.testing.assert_allclose(unique_edge_lengths(pts, tets, memory_mb), ref_len)
+
+
+def test_edge_key_buckets_streaming_chunks_match_single_pass():
+    pts, tets = _mesh(2000)
+    acc = EdgeKeyBuckets(len(pts), len(tets), memory_mb=0.001)
+    for part in np.array_split(tets, 7):  # add() por chunk, como al leer el .msh por tramos
+        acc.add(part)
+    keys = np.concatenate(list(acc.buckets()))
+    np.testing.assert_array_equal(keys, np.concatenate(unique_edge_keys(tets, len(pts), 512.0)))
+
+
+def test_edge_keys_need_int64_room():
+    with pytest.raises(ValueError, match="n_nodes < 2\\*\\*31"):
+        EdgeKeyBuckets(2**31, 10)
+
+
+QS = [0.0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 0.999, 1.0]
+
+
+def _lognormal(n: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).lognormal(mean=-3.0, sigma=2.0, size=n)
+
+
+@pytest.mark.parametrize("alpha", [0.05, 0.01, 0.005])
+def test_sketch_quantiles_within_alpha(alpha):
+    x = _lognormal(200_000)
+    sketch = QuantileSketch(alpha).update(x)
+    for q in QS:
+        exact = np.quantile(x, q, method="lower")  # el sketch responde por el valor de rango floor(q*(n-1))
+        assert abs(sketch.quantile(q) - exact) <= alpha * exact * (1 + 1e-9), q
+    assert (sketch.n, sketch.min, sketch.max) == (x.size, x.min(), x.max())
+    assert sketch.mean == pytest.approx(x.mean(), rel=1e-12)
+
+
+def test_merged_sketch_equals_single_pass():
+    x = np.r_[_lognormal(50_000), np.zeros(1000)]
+    single = QuantileSketch(0.01).update(x)
+    # partes con rangos distintos: el merge tiene que crecer el arreglo de buckets por ambos lados
+    xs = np.sort(x)
+    parts = [xs[10_000:-10_000], xs[-10_000:], xs[:10_000]]
+    merged = QuantileSketch(0.01)
+    for part in parts:
+        merged.merge(QuantileSketch(0.01).update(part))
+
+    assert (merged.offset, merged.zero_count, merged.n) == (single.offset, single.zero_count, single.n)
+    np.testing.assert_array_equal(merged.counts, single.counts)
+    assert (merged.min, merged.max) == (single.min, single.max)
+    assert merged.total == pytest.approx(single.total, rel=1e-12)
+    assert [merged.quantile(q) for q in QS] == [single.quantile(q) for q in QS]
+
+
+def test_sketch_all_zero_and_mixed_zeros():
+    zeros = QuantileSketch().update(np.zeros(100))
+    assert zeros.counts.size == 0
+    assert [zeros.quantile(q) for q in (0.0, 0.5, 1.0)] == [0.0, 0.0, 0.0]
+    assert zeros.mean == 0.0
+
+    mixed = QuantileSketch().update(np.r_[np.zeros(30), np.full(70, 2.0)])
+    assert mixed.quantile(0.25) == 0.0
+    assert mixed.quantile(0.5) == pytest.approx(2.0, rel=mixed.alpha)
+
+
+def test_sketch_errors():
+    with pytest.raises(ValueError, match="empty sketch"):
+        QuantileSketch().quantile(0.5)
+    with pytest.raises(ValueError, match="empty sketch"):
+        QuantileSketch().update(np.empty(0)).quantile(0.5)
+    with pytest.raises(ValueError, match=">= 0"):
+        QuantileSketch().update(np.array([1.0, -1.0]))
+    with pytest.raises(ValueError, match="different alpha"):
+        QuantileSketch(0.01).merge(QuantileSketch(0.02))
+    with pytest.raises(ValueError, match="alpha"):
+        QuantileSketch(0.0)
+
+
+def test_fixed_histogram_merge_and_out_of_range():
+    x = np.r_[_lognormal(10_000), 1e-12, 1e12]
+    single = FixedHistogram.log(1e-9, 1e9, 100).update(x)
+    merged = FixedHistogram.log(1e-9, 1e9, 100)
+    for part in np.array_split(x, 5):
+        merged.merge(FixedHistogram.log(1e-9, 1e9, 100).update(part))
+
+    np.testing.assert_array_equal(merged.counts, single.counts)
+    assert single.counts.sum() == x.size
+    assert single.counts[0] == 1 and single.counts[-1] == 1  # fuera de los bordes: primer/último bin
+
+    with pytest.raises(ValueError, match="different bin edges"):
+        merged.merge(FixedHistogram.linear(0.0, 1.0, 10))
@@ -0,0 +1,31 @@
+# tests/test_export_background.py
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+from src3d.paths3d import background_csv_path, background_pos_path, ensure_case_dirs, h_pred_post_parquet
+
+
+def _export(case: str, runs_dir, *extra: str) -> str:
+    cmd = [sys.executable, "-m", "src3d.export_background_points_3d", "--case", case, "--runs-dir", str(runs_dir), *extra]
+    return subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+
+
+def test_no_csv_removes_csv_from_previous_run(tmp_path):
+    case = "bg"
+    ensure_case_dirs(case, tmp_path)
+    c = np.random.default_rng(0).uniform(size=(50, 3))
+    hp = pd.DataFrame({"elem_id": np.arange(1, 51), "cx": c[:, 0], "cy": c[:, 1], "cz": c[:, 2], "h_pred": 0.1, "h_post": 0.1})
+    hp.to_parquet(h_pred_post_parquet(case, tmp_path), index=False)
+
+    _export(case, tmp_path)
+    assert len(pd.read_csv(background_csv_path(case, tmp_path))) == 50
+
+    out = _export(case, tmp_path, "--no-csv")
+    assert not background_csv_path(case, tmp_path).exists()
+    assert "se borró el CSV anterior" in out
+    assert background_pos_path(case, tmp_path).exists()
@@ -0,0 +1,96 @@
+# tests/test_fem_cache.py
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from src3d.fem.result_cache import COUNTS_NAME, LOG_COLUMNS, LOG_NAME, FemResultCache
+
+
+def _solve_coarse(case: str, runs_dir: Path, cache_dir: Path, *extra: str) -> subprocess.CompletedProcess:
+    cmd = [
+        sys.executable, "-m", "src3d.solve_and_extract_sigma_vm_3d",
+        "--case", case,
+        "--tag", "coarse",
+        "--backend", "calculix",
+        "--ccx-exe", "scripts/fake_ccx.py",
+        "--ccx-run",
+        "--fem-cache-dir", str(cache_dir),
+        "--runs-dir", str(runs_dir),
+        *extra,
+    ]
+    return subprocess.run(cmd, capture_output=True, text=True, check=True)
+
+
+def _entries(cache_dir: Path) -> list[Path]:
+    return [p for p in cache_dir.iterdir() if p.is_dir() and not p.name.startswith(".")]
+
+
+def _write_stale_table(case: str, runs_dir: Path) -> Path:
+    geom = pd.read_parquet(runs_dir / case / "gmsh" / "element_geometry_3d.parquet", columns=["elem_id"])
+    stale = runs_dir / case / "ccx" / "coarse" / "sigma_vm.csv"
+    pd.DataFrame({"elem_id": geom["elem_id"], "sigma_vm": -1.0}).to_csv(stale, index=False)
+    old = time.time() - 3600
+    os.utime(stale, (old, old))
+    return stale
+
+
+def test_cgx_without_extraction_does_not_cache_stale_table(fem_case, tmp_path):
+    case, runs_dir = fem_case
+    cache_dir = tmp_path / "fem_cache"
+    _write_stale_table(case, runs_dir)
+
+    proc = _solve_coarse(case, runs_dir, cache_dir, "--sigma-extractor", "cgx", "--no-cgx-run")
+
+    assert "no se guarda en el cache FEM" in proc.stdout
+    assert _entries(cache_dir) == []
+
+
+def test_frd_miss_reextracts_and_caches_fresh_table(fem_case, tmp_path):
+    case, runs_dir = fem_case
+    cache_dir = tmp_path / "fem_cache"
+    stale = _write_stale_table(case, runs_dir)
+
+    _solve_coarse(case, runs_dir, cache_dir, "--sigma-extractor", "frd")
+
+    assert len(_entries(cache_dir)) == 1
+    cached = pd.read_parquet(_entries(cache_dir)[0] / "sigma_vm.parquet")
+    assert (cached["sigma_vm"] != -1.0).all()
+    assert (pd.read_csv(stale)["sigma_vm"] != -1.0).all()
+
+
+def _log_many(root: Path, tag: str, n: int) -> None:
+    cache = FemResultCache(root, 2**30)
+    for i in range(n):
+        cache.log("case", tag, f"{i:064x}", "miss" if i % 2 else "hit", 1.0, 0.5)
+
+
+def test_log_is_consistent_under_concurrent_writers(tmp_path):
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        list(pool.map(_log_many, [tmp_path, tmp_path], ["coarse", "ref"], [40, 40]))
+
+    lines = (tmp_path / "fem_cache_log.csv").read_text(encoding="utf-8").splitlines()
+    assert lines[0] == ",".join(LOG_COLUMNS)
+    assert lines.count(lines[0]) == 1
+    log = pd.read_csv(tmp_path / "fem_cache_log.csv")
+    assert len(log) == 80
+    assert log["tag"].value_counts().to_dict() == {"coarse": 40, "ref": 40}
+    counts = json.loads((tmp_path / COUNTS_NAME).read_text(encoding="utf-8"))
+    assert counts == log["status"].value_counts().to_dict() == {"hit": 40, "miss": 40}
+
+
+def test_log_counts_seeded_once_from_a_log_without_counters(tmp_path):
+    _log_many(tmp_path, "coarse", 5)
+    (tmp_path / COUNTS_NAME).unlink()  # cache de antes de los contadores: solo el CSV
+
+    cache = FemResultCache(tmp_path, 2**30)
+    assert cache.log("case", "ref", "f" * 64, "hit", 1.0, 0.5) == (4, 2)
+    (tmp_path / LOG_NAME).write_text(",".join(LOG_COLUMNS) + "\n", encoding="utf-8")  # ya no se relee
+    assert cache.log("case", "ref", "f" * 64, "miss", 1.0, 0.5) == (4, 3)
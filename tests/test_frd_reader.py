@@ -0,0 +1,106 @@
+# tests/test_frd_reader.py
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from scripts.fake_ccx import write_frd
+from src3d.fem.frd_reader import (
+    DISP_COMPONENTS,
+    STRESS_COMPONENTS,
+    read_frd_nodal_displacement,
+    read_frd_nodal_von_mises,
+    von_mises,
+)
+
+RNG = np.random.default_rng(0)
+NODE_IDS = np.array([3, 7, 8, 20, 21, 22], dtype=np.int64)
+XYZ = RNG.uniform(size=(len(NODE_IDS), 3))
+DISP = RNG.normal(scale=1e-3, size=(len(NODE_IDS), 3))
+STRESS = RNG.normal(scale=50.0, size=(len(NODE_IDS), 6))  # con negativos: columnas pegadas sin espacio
+
+
+def _result_header(name: str, comps: list[str], fmt: int, ctype: int) -> bytes:
+    n = len(NODE_IDS)
+    out = f"  100CL  101 1.00000E+00{n:>12d}{'':20s} 0{1:>5d}{'':10s}{fmt:>2d}\n"
+    out += f" -4  {name:<8s}{len(comps):>5d}    1\n"
+    for k, c in enumerate(comps):
+        exist = 1 if c == "ALL" else 0
+        out += f" -5  {c:<8s}{1:>5d}{ctype:>5d}{k + 1:>5d}{0:>5d}{exist:>5d}\n"
+    return out.encode()
+
+
+def _write_binary_frd(path, elements: list[tuple[int, int, list[int]]]) -> None:
+    """FRD binario (formato 2): nodos int32 + 3 float64, elementos int32, resultados int32 + float32."""
+    n = len(NODE_IDS)
+    node_rec = np.dtype([("id", "<i4"), ("xyz", "<f8", (3,))])
+    with path.open("wb") as f:
+        f.write(b"    1C\n    1UUSER\n")
+        f.write(f"    2C{n:>24d}{2:>37d}\n".encode())
+        nodes = np.empty(n, dtype=node_rec)
+        nodes["id"], nodes["xyz"] = NODE_IDS, XYZ
+        f.write(nodes.tobytes())
+        f.write(f"    3C{len(elements):>24d}{2:>37d}\n".encode())
+        for eid, etype, conn in elements:
+            f.write(np.array([eid, etype, 0, 1, *conn], dtype="<i4").tobytes())
+        f.write(b"    1PSTEP                1           1           1\n")
+        for name, comps, vals, ctype in (("DISP", DISP_COMPONENTS + ["ALL"], DISP, 2), ("STRESS", STRESS_COMPONENTS, STRESS, 4)):
+            f.write(_result_header(name, comps, 2, ctype))
+            rec = np.dtype([("id", "<i4"), ("v", "<f4", (vals.shape[1],))])
+            data = np.empty(n, dtype=rec)
+            data["id"], data["v"] = NODE_IDS, vals
+            f.write(data.tobytes())
+        f.write(b" 9999\n")
+
+
+TE4 = [(1, 3, [3, 7, 8, 20]), (2, 3, [7, 8, 20, 21])]
+TE10 = [(3, 6, [3, 7, 8, 20, 21, 22, 3, 7, 8, 20])]
+
+
+@pytest.mark.parametrize("elements", [TE4, TE4 * 3000, TE4 + TE10 + TE4], ids=["te4", "te4-many", "mixed"])
+def test_binary_frd_skips_elements_and_reads_results(tmp_path, elements):
+    frd = tmp_path / "job.frd"
+    _write_binary_frd(frd, elements)
+
+    vm = read_frd_nodal_von_mises(frd, chunk_rows=4)
+    np.testing.assert_array_equal(vm.node_ids, NODE_IDS)
+    np.testing.assert_allclose(vm.sigma_vm, von_mises(STRESS.astype(np.float32).astype(float)), rtol=1e-12)
+    assert (vm.n_stress_blocks, vm.step) == (1, 1)
+
+    ids, disp = read_frd_nodal_displacement(frd)
+    np.testing.assert_array_equal(ids, NODE_IDS)
+    np.testing.assert_allclose(disp, DISP.astype(np.float32))
+
+
+def test_ascii_frd_fixed_columns(tmp_path):
+    frd = tmp_path / "job.frd"
+    write_frd(frd, NODE_IDS, XYZ, DISP, STRESS)
+
+    vm = read_frd_nodal_von_mises(frd, chunk_rows=4)
+    np.testing.assert_array_equal(vm.node_ids, NODE_IDS)
+    # %12.5E: 6 cifras significativas
+    np.testing.assert_allclose(vm.sigma_vm, von_mises(STRESS), rtol=1e-4)
+    ids, disp = read_frd_nodal_displacement(frd)
+    np.testing.assert_allclose(disp, DISP, rtol=1e-5, atol=1e-12)
+
+
+def test_ascii_frd_short_node_ids(tmp_path):
+    frd = tmp_path / "job.frd"
+    with frd.open("wb") as f:
+        f.write(b"    1C\n")
+        f.write(_result_header("STRESS", STRESS_COMPONENTS, 0, 4))
+        np.savetxt(f, np.column_stack([NODE_IDS, STRESS]), fmt=" -1%5d" + "%12.5E" * 6)
+        f.write(b" -3\n 9999\n")
+
+    vm = read_frd_nodal_von_mises(frd)
+    np.testing.assert_array_equal(vm.node_ids, NODE_IDS)
+    np.testing.assert_allclose(vm.sigma_vm, von_mises(STRESS), rtol=1e-4)
+
+
+def test_unexpected_stress_components_raise(tmp_path):
+    frd = tmp_path / "job.frd"
+    write_frd(frd, NODE_IDS, XYZ, DISP, STRESS)
+    frd.write_bytes(frd.read_bytes().replace(b" -5  SXX     ", b" -5  EXX     "))
+
+    with pytest.raises(ValueError, match=r"componentes STRESS inesperadas: \['EXX'"):
+        read_frd_nodal_von_mises(frd)
@@ -0,0 +1,106 @@
+# tests/test_inp_reader.py
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from benchmarks.bench_inp_reader import read_inp_regex, write_deck
+from src3d.fem.inp_reader import read_inp
+
+NODES_INP = """\
+** nodos en un archivo aparte, como lo deja un preprocesador
+*NODE, NSET=NALL
+1, 0.0, 0.0, 0.0
+2, 1.0, 0.0, 0.0
+3, 0.0, 1.0, 0.0
+4, 0.0, 0.0, 1.0
+5, 1.0, 1.0, 1.0
+6, 0.5, 0.0, 0.0
+7, 0.5, 0.5, 0.0
+8, 0.0, 0.5, 0.0
+9, 0.0, 0.0, 0.5
+10, 0.5, 0.0, 0.5
+11, 0.0, 0.5, 0.5
+"""
+
+MAIN_INP = """\
+*HEADING
+ deck de prueba
+*INCLUDE, INPUT=nodes.inp
+*ELEMENT, TYPE=C3D4, ELSET=TETS
+1, 1, 2, 3, 4
+** un comentario en medio de un bloque de datos no lo corta
+2, 2, 3, 4, 5
+*ELEMENT, TYPE=C3D10, ELSET=QUAD
+3, 1, 2, 3, 4, 6, 7, 8,
+9, 10, 11
+*NSET, NSET=FIX, GENERATE
+1, 7, 3
+*ELSET, ELSET=ALL
+TETS, QUAD
+*ELSET, ELSET=EVEN, GENERATE
+2, 2
+*NSET, NSET=TOP
+5,
+ 4, 11
+*BOUNDARY
+FIX, 1, 3
+"""
+
+
+@pytest.fixture
+def deck(tmp_path):
+    (tmp_path / "nodes.inp").write_text(NODES_INP, encoding="utf-8")
+    path = tmp_path / "job.inp"
+    path.write_text(MAIN_INP, encoding="utf-8")
+    return path
+
+
+def test_include_nodes(deck):
+    mesh = read_inp(deck)
+    np.testing.assert_array_equal(mesh.node_ids, np.arange(1, 12))
+    np.testing.assert_allclose(mesh.node_xyz[4], [1.0, 1.0, 1.0])
+    np.testing.assert_allclose(mesh.node_xyz[9], [0.5, 0.0, 0.5])
+    np.testing.assert_array_equal(mesh.nsets["NALL"], np.arange(1, 12))
+
+
+def test_element_blocks_and_multiline_c3d10(deck):
+    mesh = read_inp(deck)
+    assert [(b.etype, b.elset) for b in mesh.blocks] == [("C3D4", "TETS"), ("C3D10", "QUAD")]
+    tets, quad = mesh.blocks
+    np.testing.assert_array_equal(tets.ids, [1, 2])
+    np.testing.assert_array_equal(tets.conn, [[1, 2, 3, 4], [2, 3, 4, 5]])
+    np.testing.assert_array_equal(quad.ids, [3])
+    np.testing.assert_array_equal(quad.conn, [[1, 2, 3, 4, 6, 7, 8, 9, 10, 11]])
+    assert mesh.element_counts() == {"C3D4": 2, "C3D10": 1}
+    np.testing.assert_array_equal(mesh.solid_element_ids(), [1, 2, 3])
+
+
+def test_sets_generate_names_and_continuation(deck):
+    mesh = read_inp(deck)
+    np.testing.assert_array_equal(mesh.nsets["FIX"], [1, 4, 7])
+    np.testing.assert_array_equal(mesh.nsets["TOP"], [5, 4, 11])
+    np.testing.assert_array_equal(mesh.elsets["EVEN"], [2])
+    np.testing.assert_array_equal(mesh.elsets["ALL"], [1, 2, 3])
+    np.testing.assert_array_equal(mesh.elsets["TETS"], [1, 2])
+
+
+def test_generated_deck_matches_regex_reader(tmp_path):
+    path = tmp_path / "mesh.inp"
+    n_nodes, n_elems = write_deck(3000, path)
+    mesh = read_inp(path)
+    nodes, elems = read_inp_regex(path)
+
+    assert (len(mesh.node_ids), mesh.solid_element_ids().size) == (n_nodes, n_elems)
+    np.testing.assert_array_equal(mesh.node_ids, nodes["node_id"])
+    np.testing.assert_allclose(mesh.node_xyz, nodes[["x", "y", "z"]].to_numpy())
+    np.testing.assert_array_equal(mesh.blocks[0].ids, elems["elem_id"])
+    np.testing.assert_array_equal(mesh.blocks[0].conn, elems[["n1", "n2", "n3", "n4"]].to_numpy())
+    np.testing.assert_array_equal(mesh.elsets["SOLID"], elems["elem_id"])
+
+
+def test_generate_line_needs_start_end_and_optional_step(tmp_path):
+    path = tmp_path / "bad.inp"
+    path.write_text("*NODE\n1, 0, 0, 0\n*NSET, NSET=X, GENERATE\n1, 5, 1, 2\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="GENERATE"):
+        read_inp(path)
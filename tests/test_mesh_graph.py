@@ -0,0 +1,43 @@
+# tests/test_mesh_graph.py
+from __future__ import annotations
+
+import numpy as np
+from scipy import sparse
+
+from src3d.mesh_graph_3d import limit_size_gradation
+
+
+def _path_graph(n: int) -> sparse.csr_matrix:
+    i = np.arange(n - 1)
+    rows, cols = np.r_[i, i + 1], np.r_[i + 1, i]
+    return sparse.csr_matrix((np.ones(rows.size, dtype=bool), (rows, cols)), shape=(n, n))
+
+
+def test_gradation_reaches_fixed_point_along_a_long_path():
+    n = 60
+    h = np.ones(n)
+    h[0] = 0.1
+    out, iters, converged = limit_size_gradation(_path_graph(n), h, ratio=1.0)
+
+    assert converged
+    assert iters == n  # el mínimo avanza un vecino por iteración, más la de verificación
+    np.testing.assert_allclose(out, 0.1)
+
+
+def test_gradation_reports_not_converged_when_max_iter_runs_out():
+    n = 60
+    h = np.ones(n)
+    h[0] = 0.1
+    centers = np.column_stack([np.arange(n, dtype=float), np.zeros(n), np.zeros(n)])
+    out, iters, converged = limit_size_gradation(_path_graph(n), h, lipschitz=0.0, centers=centers, max_iter=10)
+
+    assert not converged
+    assert iters == 10
+    assert out[-1] == 1.0  # la cota sigue violada lejos de la fuente
+
+
+def test_gradation_without_bounds_is_identity():
+    h = np.linspace(0.1, 1.0, 5)
+    out, iters, converged = limit_size_gradation(_path_graph(5), h)
+    assert (iters, converged) == (0, True)
+    np.testing.assert_array_equal(out, h)
@@ -0,0 +1,47 @@
+# tests/test_parquet_io.py
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src3d.parquet_io_3d import parquet_columns, parquet_num_rows, read_columns
+
+
+def _write(path, row_group_size=None):
+    df = pd.DataFrame({"elem_id": np.arange(1, 1001), "a": np.linspace(0.0, 1.0, 1000), "b": np.ones(1000)})
+    df.to_parquet(path, index=False, row_group_size=row_group_size)
+    return path
+
+
+@pytest.fixture
+def table(tmp_path):
+    # Un solo row group, como los Parquets del pipeline: Arrow podría entregar columnas sin copiar
+    return _write(tmp_path / "t.parquet")
+
+
+def test_projection_and_optional(table):
+    df = read_columns(table, ["elem_id"], optional=["b", "missing"])
+    assert list(df.columns) == ["elem_id", "b"]
+    assert parquet_columns(table) == ["elem_id", "a", "b"]
+    assert parquet_num_rows(table) == 1000
+
+
+def test_missing_required_column_raises(table):
+    with pytest.raises(ValueError, match=r"Faltan columnas \['c'\] en t.parquet"):
+        read_columns(table, ["elem_id", "c"])
+
+
+def test_result_is_writable(table):
+    df = read_columns(table, ["elem_id", "a"])
+    df.loc[0, "a"] = 5.0
+    df.loc[0, "elem_id"] = 7
+    df["a"] *= 2.0
+    assert df.loc[0, "a"] == 10.0 and df.loc[0, "elem_id"] == 7
+
+
+def test_filters_prune_rows(tmp_path):
+    table = _write(tmp_path / "t.parquet", row_group_size=100)
+    df = read_columns(table, ["elem_id", "a"], filters=[("a", ">=", 0.9)])
+    assert df["a"].min() >= 0.9
+    assert len(df) == int((np.linspace(0.0, 1.0, 1000) >= 0.9).sum())
@@ -0,0 +1,96 @@
+# tests/test_submodel.py
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.bench_inp_reader import write_deck
+from src3d.fem.inp_reader import read_inp
+from src3d.fem.submodel import map_region, select_region
+from src3d.paths3d import sigma_source_json
+from tests.conftest import N_TETS
+
+
+def _fan(n_hot: int) -> pd.DataFrame:
+    """n_hot tets que comparten el nodo 0, más una cadena de 3 tets que se cuelga de él."""
+    hot = [[0, 3 * i + 1, 3 * i + 2, 3 * i + 3] for i in range(n_hot)]
+    base = 3 * n_hot + 1
+    chain = [[0, base, base + 1, base + 2], [base, base + 1, base + 2, base + 3], [base + 3, base + 4, base + 5, base + 6]]
+    conn = np.array(hot + chain, dtype=np.int64)
+    return pd.DataFrame({"elem_id": np.arange(1, len(conn) + 1), "n0": conn[:, 0], "n1": conn[:, 1], "n2": conn[:, 2], "n3": conn[:, 3]})
+
+
+@pytest.mark.parametrize("n_hot", [10, 200, 256])
+def test_select_region_buffer_through_highly_shared_node(n_hot):
+    geom = _fan(n_hot)
+    sigma = np.r_[np.full(n_hot, 100.0), np.zeros(3)]
+    region = select_region(geom, sigma, quantile=0.5, layers=1)
+
+    assert len(region.core_ids) == n_hot
+    # una capa por nodo: entra el tet de la cadena que toca el nodo 0, no los siguientes
+    assert set(region.region_ids) == set(range(1, n_hot + 2))
+
+
+def _solve(case: str, runs_dir: Path, tag: str, *extra: str) -> subprocess.CompletedProcess:
+    cmd = [
+        sys.executable, "-m", "src3d.solve_and_extract_sigma_vm_3d",
+        "--case", case,
+        "--tag", tag,
+        "--ccx-exe", "scripts/fake_ccx.py",
+        "--ccx-run",
+        "--runs-dir", str(runs_dir),
+        *extra,
+    ]
+    return subprocess.run(cmd, capture_output=True, text=True, check=True)
+
+
+def _submodel_case(case: str, runs_dir: Path, n_ref: int) -> tuple[subprocess.CompletedProcess, dict]:
+    write_deck(n_ref, runs_dir / case / "ccx" / "ref" / "mesh.inp")
+    _solve(case, runs_dir, "coarse", "--backend", "calculix")
+    proc = _solve(case, runs_dir, "ref", "--backend", "submodel", "--submodel-quantile", "0.8", "--submodel-layers", "1")
+    return proc, json.loads(sigma_source_json(case, "ref", runs_dir).read_text(encoding="utf-8"))["submodel"]
+
+
+def test_submodel_maps_region_onto_finer_ref_mesh_by_geometry(fem_case):
+    case, runs_dir = fem_case
+    proc, info = _submodel_case(case, runs_dir, 8 * N_TETS)
+
+    assert "⚠️" not in proc.stdout
+    assert not info["same_mesh_as_coarse"]
+    # la región ref cubre ~el mismo volumen que la coarse: ~8x elementos, no los mismos ids
+    assert 6 * info["region_elems"] < info["ref_region_elems"] < 10 * info["region_elems"]
+
+    geom = pd.read_parquet(runs_dir / case / "gmsh" / "element_geometry_3d.parquet")
+    ref_mesh = read_inp(runs_dir / case / "ccx" / "ref" / "mesh.inp")
+    sub_mesh = read_inp(runs_dir / case / "ccx" / "ref" / "submodel_mesh.inp")
+    sub_ids = sub_mesh.solid_element_ids()
+    region = select_region(
+        geom,
+        pd.read_parquet(runs_dir / case / "gmsh" / "sigma_vm_coarse_3d.parquet")["sigma_vm"].to_numpy(),
+        quantile=0.8,
+        layers=1,
+    )
+    coarse_mesh = read_inp(runs_dir / case / "ccx" / "coarse" / "mesh.inp")
+    np.testing.assert_array_equal(np.sort(sub_ids), np.sort(map_region(ref_mesh, coarse_mesh, region.region_ids)))
+
+    sigma = pd.read_parquet(runs_dir / case / "gmsh" / "sigma_vm_ref_3d.parquet").set_index("elem_id")["sigma_vm"]
+    coarse = pd.read_parquet(runs_dir / case / "gmsh" / "sigma_vm_coarse_3d.parquet").set_index("elem_id")["sigma_vm"]
+    rest = np.setdiff1d(geom["elem_id"], region.core_ids)
+    assert len(sigma) == len(geom)
+    np.testing.assert_allclose(sigma.loc[rest], coarse.loc[rest])
+    assert not np.allclose(sigma.loc[region.core_ids], coarse.loc[region.core_ids])
+
+
+def test_submodel_warns_when_ref_mesh_is_the_coarse_mesh(fem_case):
+    case, runs_dir = fem_case
+    proc, info = _submodel_case(case, runs_dir, N_TETS)
+
+    assert "⚠️ La malla ref del submodelo" in proc.stdout
+    assert info["same_mesh_as_coarse"]
+    assert info["ref_region_elems"] == info["region_elems"]